@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+"""This module checks that very deep call chains are checked and inlined without running out of stack.
+
+It generates a program whose circuits each call the circuit before them once, main calling the last one,
+so folding main inlines every circuit down to the first one, each inside the one calling it.
+Checking and folding must go through without a RecursionError, under the default recursion limit,
+and leave main with the NOT each circuit returns, the AND of the first circuit and the four statements of its own.
+
+Example:
+    The check accepts an optional depth of the call chain (one hundred thousand by default)
+        $ python inlining.py 200000
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from asm.lexing.regex_lexer import RegexLexer
+from asm.parsing.stream_parser import StreamParser
+from asm.parsing.grammar import Grammar
+from asm.checking.checker import Checker
+
+
+DIRECTIVES = """{
+    "cvm/deterministic": {
+        "reg-count": 4,
+        "reg-prefix": "cr",
+        "gates": {
+            "not": [[0, 1], [1, 0]],
+            "and": [[1, 1, 1, 0], [0, 0, 0, 1]]
+        }
+    }
+}"""
+
+
+def make_source(depth: int):
+    """Create a program of <depth> circuits, each calling the circuit before it once."""
+    circuits = ["circuit c0(pr1, pr2) {\n    %pr1 = and(%pr1, %pr2);\n    return not(%pr1);\n}\n\n"]
+    for index in range(1, depth):
+        circuits.append((
+            "circuit c{0}(pr1, pr2) {{\n"
+            "    %pr1 = %c{1}(%pr1, %pr2);\n"
+            "    return not(%pr1);\n"
+            "}}\n\n"
+        ).format(index, index - 1))
+
+    main = "circuit main() {{\n    cr0 = 0b;\n    cr1 = 1b;\n    cr1 = %c{0}(cr0, cr1);\n    print(cr1);\n}}\n".format(depth - 1)
+    return "".join(circuits) + main
+
+
+def main(depth: int):
+    source = make_source(depth)
+    start = time.perf_counter()
+    program = StreamParser(RegexLexer(source).tokenize(), Grammar.parselets).parse()
+    parsing = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        Checker(program, DIRECTIVES).check()
+    except RecursionError:
+        raise AssertionError("Checking a call chain <" + str(depth) + "> circuits deep ran out of stack.")
+    checking = time.perf_counter() - start
+
+    statements = len(program.get_main().stmts)
+    if statements != depth + 4:
+        raise AssertionError("Folding a call chain <" + str(depth) + "> circuits deep left <" + str(statements) + "> statements in main instead of <" + str(depth + 4) + ">.")
+
+    print("Call chain depth      : {0:,}".format(depth))
+    print("Recursion limit       : {0:,}".format(sys.getrecursionlimit()))
+    print("Folded statements     : {0:,}".format(statements))
+    print("parsed in             : {0:.3f}s".format(parsing))
+    print("checked and folded in : {0:.3f}s".format(checking))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+"""This module measures how many megabytes of source per second the lexers turn into tokens and the memory the tokens take.
+
+It generates a program made of many circuits in the style of the examples, with comments, literals and circuit calls,
+then scans it with the lexer going through the source one character at a time, making a token object each,
+and with the lexer matching a single regular expression over the source as bytes into a stream of tokens held in arrays.
+Both must produce the same tokens.
+
+Example:
+    The benchmark accepts an optional source size in megabytes (two by default)
+        $ python lexing.py 8
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from common.token_type import TokenType
+from asm.lexing.lexer import Lexer
+from asm.lexing.regex_lexer import RegexLexer
+
+
+def make_source(size: int):
+    """Create a program of about <size> bytes made of circuits calling the circuit before them."""
+    circuits = []
+    length = 0
+    index = 0
+    while length < size:
+        circuit = (
+            "// Circuit number {0} calls the circuit before it\n"
+            "circuit c{0}(pr1, pr2, pr3) {{\n"
+            "    %pr1 = and(%pr1, %pr2);\n"
+            "    %pr3 = %c{1}(%pr1, %pr2, %pr3);\n"
+            "    %pr2 = not(%pr3);   // invert the result\n"
+            "    return and(%pr1, %pr2);\n"
+            "}}\n\n"
+        ).format(index + 1, index)
+        circuits.append(circuit)
+        length = length + len(circuit)
+        index = index + 1
+
+    main = "circuit main() {\n    cr0 = 0b;\n    cr1 = 1b;\n    cr1 = %c1(cr0, cr1, cr1);\n    print(cr1);\n}\n"
+    return "".join(circuits) + main
+
+
+def scan_objects(source: str):
+    """Returns the tokens of the given source scanned one character at a time, a token object each."""
+    lexer = Lexer(source)
+    tokens = []
+    while True:
+        token = lexer.lex()
+        tokens.append(token)
+        if token.token_type == TokenType.EOF:
+            return tokens
+
+
+def scan_stream(source: str):
+    """Returns the tokens of the given source scanned with a regular expression into a stream."""
+    return RegexLexer(source).tokenize()
+
+
+def measure(scan, source: str):
+    """Scan the whole source with the given function then return its tokens, the megabytes scanned per second
+    and the bytes allocated for the tokens that are still held once scanning is done."""
+    start = time.perf_counter()
+    tokens = scan(source)
+    elapsed = time.perf_counter() - start
+    del tokens
+
+    tracemalloc.start()
+    tokens = scan(source)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return tokens, len(source) / elapsed / 1000000, held
+
+
+def main(size: int):
+    source = make_source(size * 1000000)
+
+    objects, objects_speed, objects_memory = measure(scan_objects, source)
+    stream, stream_speed, stream_memory = measure(scan_stream, source)
+
+    if len(objects) != len(stream):
+        raise AssertionError("The lexers produced <" + str(len(objects)) + "> and <" + str(len(stream)) + "> tokens.")
+    for index, token in enumerate(objects):
+        other = stream.token(index)
+        if (token.token_type, token.lexeme, token.line, token.error) != (other.token_type, other.lexeme, other.line, other.error):
+            raise AssertionError("The lexers disagree on line <" + str(token.line) + ">: <" + str(token) + "> against <" + str(other) + ">.")
+
+    print("Source size           : {0:,} bytes".format(len(source)))
+    print("Tokens                : {0:,}".format(len(objects)))
+    print("character by character: {0:.2f} MB/s, {1:,} bytes of tokens ({2:.1f} bytes per token)".format(objects_speed, objects_memory, objects_memory / len(objects)))
+    print("regular expression    : {0:.2f} MB/s, {1:,} bytes of tokens ({2:.1f} bytes per token)".format(stream_speed, stream_memory, stream_memory / len(stream)))
+    print("speedup               : {0:.2f}x, {1:.1f}x less memory".format(stream_speed / objects_speed, objects_memory / stream_memory))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2)
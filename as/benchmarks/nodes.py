@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+"""This module measures the memory each node of the AST takes once a large program is folded.
+
+It generates a program whose circuits each call the circuit before them twice, so folding main copies the statements
+of the first circuit a number of times that doubles with each circuit. The nodes of the folded main circuit are then copied
+twice: once with the slotted classes of the AST, and once with classes that keep their attributes in a dictionary
+and their arguments in lists, as the AST did before it was slotted. The tokens are shared by both copies
+and measured on their own the same way. Both copies must print the same main circuit.
+
+Example:
+    The benchmark accepts an optional number of circuits (fourteen by default)
+        $ python nodes.py 16
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from common import ast
+from common.token import Token
+from asm.lexing.regex_lexer import RegexLexer
+from asm.parsing.stream_parser import StreamParser
+from asm.parsing.grammar import Grammar
+from asm.checking.checker import Checker
+
+
+DIRECTIVES = """{
+    "cvm/deterministic": {
+        "reg-count": 4,
+        "reg-prefix": "cr",
+        "gates": {
+            "not": [[0, 1], [1, 0]],
+            "and": [[1, 1, 1, 0], [0, 0, 0, 1]]
+        }
+    }
+}"""
+
+# The classes whose instances are copied, the tokens being copied on their own
+NODES = tuple(cls for cls in vars(ast).values() if isinstance(cls, type) and cls.__module__ == ast.__name__ and len(cls.__slots__) > 0)
+
+
+def make_source(depth: int):
+    """Create a program of <depth> circuits, each calling the circuit before it twice."""
+    circuits = ["circuit c0(pr1, pr2, pr3) {\n    %pr1 = and(%pr2, %pr3);\n    return not(%pr1);\n}\n\n"]
+    for index in range(1, depth):
+        circuits.append((
+            "circuit c{0}(pr1, pr2, pr3) {{\n"
+            "    %pr1 = and(%pr1, %pr2);\n"
+            "    %pr3 = %c{1}(%pr1, %pr2, %pr3);\n"
+            "    %pr2 = %c{1}(%pr3, %pr1, %pr2);\n"
+            "    return not(%pr2);\n"
+            "}}\n\n"
+        ).format(index, index - 1))
+
+    main = "circuit main() {{\n    cr0 = 0b;\n    cr1 = 1b;\n    cr1 = %c{0}(cr0, cr1, cr1);\n    print(cr1);\n}}\n".format(depth - 1)
+    return "".join(circuits) + main
+
+
+def fold(source: str):
+    """Parse and check the given source, returning its folded main circuit."""
+    program = StreamParser(RegexLexer(source).tokenize(), Grammar.parselets).parse()
+    Checker(program, DIRECTIVES).check()
+    return program.get_main()
+
+
+def unslotted(cls):
+    """Returns a class keeping its attributes in a dictionary that prints and iterates like the given class."""
+    methods = dict((name, getattr(cls, name)) for name in ("__repr__", "__str__", "__iter__", "__next__") if hasattr(cls, name))
+    return type(cls.__name__, (object,), methods)
+
+
+def copy(root, classes: tuple, layout: dict):
+    """Copy the objects reachable from the given root that are instances of the given classes and return the copy of the root.
+
+    Each copy is made as its object is gathered and the copies are linked to each other once all are made,
+    rather than copying recursively, since statements are linked to each other.
+
+    Args:
+        layout(dict): The class of the copy of each class, by class, the class itself if it isn't there.
+            Tuples are copied to lists grown one item at a time when the class of the copy isn't slotted, as the AST did.
+    """
+    copies = {}
+    stack = [root]
+    while len(stack) > 0:
+        node = stack.pop()
+        if id(node) in copies:
+            continue
+
+        # Each attribute is set as soon as the copy is made, as a constructor does, since an object whose attributes
+        # are set later on gets a dictionary of its own instead of sharing the keys of its class
+        new = object.__new__(layout.get(type(node), type(node)))
+        copies[id(node)] = (node, new)
+        for name in type(node).__slots__:
+            setattr(new, name, None)
+            value = getattr(node, name)
+            if isinstance(value, (tuple, list)):
+                stack.extend(item for item in value if type(item) in classes)
+            elif type(value) in classes:
+                stack.append(value)
+
+    def copied(value, listed: bool):
+        value = copies[id(value)][1] if id(value) in copies else value
+        if isinstance(value, (tuple, list)):
+            items = []
+            for item in value:
+                items.append(copies[id(item)][1] if id(item) in copies else item)
+            return items if listed == True or isinstance(value, list) else tuple(items)
+        return value
+
+    # Asking a copy for its dictionary would make one, so we tell the layouts apart by class
+    for node, new in copies.values():
+        listed = type(node) in layout
+        for name in type(node).__slots__:
+            setattr(new, name, copied(getattr(node, name), listed))
+
+    return copies[id(root)][1], len(copies)
+
+
+def measure(root, layout: dict):
+    """Returns the copy of the nodes reachable from the given root, the number of nodes copied and the bytes the copies take."""
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    new, count = copy(root, NODES, layout)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return new, count, end - start
+
+
+def measure_tokens(tokens: list, cls):
+    """Returns the bytes copies of the given tokens take as instances of the given class, leaving out the list holding them."""
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    copies = []
+    for token in tokens:
+        new = object.__new__(cls)
+        for name in Token.__slots__:
+            setattr(new, name, getattr(token, name))
+        copies.append(new)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return end - start - sys.getsizeof(copies)
+
+
+def tokens(main):
+    """Returns the tokens of the given circuit, each once."""
+    found = {}
+    seen = set([id(main)])
+    stack = [main]
+    while len(stack) > 0:
+        node = stack.pop()
+        for name in type(node).__slots__:
+            value = getattr(node, name)
+            for item in (value if isinstance(value, (tuple, list)) else [value]):
+                if isinstance(item, Token):
+                    found[id(item)] = item
+                elif type(item) in NODES and id(item) not in seen:
+                    seen.add(id(item))
+                    stack.append(item)
+
+    return list(found.values())
+
+
+def main(depth: int):
+    source = make_source(depth)
+    start = time.perf_counter()
+    folded = fold(source)
+    elapsed = time.perf_counter() - start
+
+    plain = dict((cls, unslotted(cls)) for cls in NODES)
+    slotted_main, node_count, slotted_bytes = measure(folded, {})
+    plain_main, _, plain_bytes = measure(folded, plain)
+    if repr(slotted_main) != repr(plain_main):
+        raise AssertionError("The copies print different main circuits.")
+
+    held = tokens(folded)
+    token_count = len(held)
+    slotted_token_bytes = measure_tokens(held, Token)
+    plain_token_bytes = measure_tokens(held, unslotted(Token))
+
+    print("Folded statements     : {0:,} in {1:.3f}s".format(len(folded.stmts), elapsed))
+    print("Nodes                 : {0:,}".format(node_count))
+    print("dictionary nodes      : {0:,} bytes ({1:.1f} bytes per node)".format(plain_bytes, plain_bytes / node_count))
+    print("slotted nodes         : {0:,} bytes ({1:.1f} bytes per node)".format(slotted_bytes, slotted_bytes / node_count))
+    print("Tokens                : {0:,}".format(token_count))
+    print("dictionary tokens     : {0:,} bytes ({1:.1f} bytes per token)".format(plain_token_bytes, plain_token_bytes / token_count))
+    print("slotted tokens        : {0:,} bytes ({1:.1f} bytes per token)".format(slotted_token_bytes, slotted_token_bytes / token_count))
+    print("memory                : {0:.1f}x less".format((plain_bytes + plain_token_bytes) / (slotted_bytes + slotted_token_bytes)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 14)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+"""This module measures the peak memory and the time it takes to parse and check a large program.
+
+It writes a program made of many circuits in the style of the examples to a temporary file, each circuit calling
+the circuit before it, with a main circuit calling the first ones. The program is assembled once by reading the whole file,
+parsing it into a program then checking the program, and once by reading the file in chunks and checking each circuit
+as soon as it is parsed. Both must fold the same main circuit.
+
+Example:
+    The benchmark accepts an optional program size in megabytes (two by default)
+        $ python streaming.py 8
+"""
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from common.ast import Program
+from common.token_stream import TokenRing
+from asm.lexing.regex_lexer import RegexLexer
+from asm.parsing.stream_parser import StreamParser
+from asm.parsing.grammar import Grammar
+from asm.checking.checker import Checker
+
+
+DIRECTIVES = """{
+    "cvm/deterministic": {
+        "reg-count": 4,
+        "reg-prefix": "cr",
+        "gates": {
+            "not": [[0, 1], [1, 0]],
+            "and": [[1, 1, 1, 0], [0, 0, 0, 1]]
+        }
+    }
+}"""
+
+
+def write_program(program_file, size: int):
+    """Write a program of about <size> bytes made of circuits calling the circuit before them."""
+    program_file.write("circuit c0(pr1, pr2, pr3) {\n    %pr1 = and(%pr2, %pr3);\n    return not(%pr1);\n}\n\n")
+    length = 0
+    index = 1
+    while length < size:
+        circuit = (
+            "// Circuit number {0} calls the circuit before it\n"
+            "circuit c{0}(pr1, pr2, pr3) {{\n"
+            "    %pr1 = and(%pr1, %pr2);\n"
+            "    %pr3 = %c{1}(%pr1, %pr2, %pr3);\n"
+            "    %pr2 = not(%pr3);   // invert the result\n"
+            "    return and(%pr1, %pr2);\n"
+            "}}\n\n"
+        ).format(index, index - 1)
+        program_file.write(circuit)
+        length = length + len(circuit)
+        index = index + 1
+
+    program_file.write("circuit main() {\n    cr0 = 0b;\n    cr1 = 1b;\n    cr1 = %c2(cr0, cr1, cr1);\n    print(cr1);\n}\n")
+
+
+def assemble_whole(program_path: str):
+    """Read the whole program, parse it then check it."""
+    with open(program_path, 'r', encoding = "utf-8") as program_file:
+        source = program_file.read()
+
+    program = StreamParser(RegexLexer(source).tokenize(), Grammar.parselets).parse()
+    Checker(program, DIRECTIVES).check()
+    return program
+
+
+def assemble_streaming(program_path: str):
+    """Read the program in chunks, checking each circuit as soon as it is parsed."""
+    program = Program()
+    with open(program_path, 'rb') as program_file:
+        parser = StreamParser(TokenRing(RegexLexer(program_file)), Grammar.parselets)
+        Checker(program, DIRECTIVES).check_stream(parser.declarations())
+    return program
+
+
+def measure(assemble, program_path: str):
+    """Assemble the program with the given function then return the folded program, the time it took and the peak memory."""
+    start = time.perf_counter()
+    assemble(program_path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    program = assemble(program_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return program, elapsed, peak
+
+
+def main(size: int):
+    with tempfile.NamedTemporaryFile('w', suffix = ".al", delete = False) as program_file:
+        write_program(program_file, size * 1000000)
+        program_path = program_file.name
+
+    program_size = os.path.getsize(program_path)
+    try:
+        whole, whole_time, whole_peak = measure(assemble_whole, program_path)
+        streaming, streaming_time, streaming_peak = measure(assemble_streaming, program_path)
+    finally:
+        os.remove(program_path)
+
+    if repr(whole) != repr(streaming):
+        raise AssertionError("Streaming folded a different main circuit.")
+
+    print("Program size          : {0:,} bytes".format(program_size))
+    print("whole program         : {0:.3f}s, peak memory {1:,} bytes".format(whole_time, whole_peak))
+    print("streaming             : {0:.3f}s, peak memory {1:,} bytes".format(streaming_time, streaming_peak))
+    print("memory                : {0:.1f}x less".format(whole_peak / streaming_peak))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2)
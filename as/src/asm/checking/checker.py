@@ -12,28 +12,45 @@ Email           : ntwali.bashige@gmail.com
 import json
 
 from common.ast import *
+from common.gate import Gate
+from common.token import Token
+from common.token_type import TokenType
 from asm.checking.exceptions import CheckError
+from asm.checking.template import Template
 
 class Checker(object):
-    """
+    """Checks a program and folds its main circuit.
+
+    Circuits and parameters are told apart by the symbol of their token, the id their name was interned to when it was lexed,
+    so the tables of circuits being checked, of templates and of parameter slots are keyed by integers rather than names.
     """
     program         : Program       = None
     _special_gates  : list          = []
     _circuits       : set           = set([])
     _circuit        : list          = []
+    _slots          : list          = []
+    _frames         : list          = []
+    _templates      : dict          = {}
+    _waiting        : dict          = {}
 
     directives      : dict          = {}
+    collapser                       = None
     _reg_count      : dict          = {}
     _reg_prefix     : dict          = {}
     _gates          : dict          = {}
     _all_prefix     : set           = set([])
 
 
-    def __init__(self, program: Program, directives: str):
+    def __init__(self, program: Program, directives: str, collapser = None):
         self.program = program
+        self.collapser = collapser
         self._special_gates = ['print']
         self._circuits = set([])
         self._circuit = []
+        self._slots = []
+        self._frames = []
+        self._templates = {}
+        self._waiting = {}
 
         self.directives = json.loads(directives)
         self._reg_count = {}
@@ -52,6 +69,68 @@ class Checker(object):
         self._checkProgram()
 
 
+    def check_stream(self, declarations):
+        """Check the declarations of a program as they are generated, as by <Parser.declarations>, then check the program.
+
+        Each circuit is checked into a template as soon as the circuits it calls have templates and its statements are dropped,
+        since the template is all that the circuits declared after it need. A circuit calling a circuit that wasn't declared yet
+        waits for it, and the circuits waiting for a circuit are checked once it has its template. So the statements held
+        at any time are those of the circuit being parsed and of the circuits still waiting, usually none.
+
+        An error found in a circuit isn't reported right away: the circuit keeps its statements and, like the circuits
+        calling it, never gets a template. Once all declarations are checked, main is checked as <check> does,
+        which checks the circuits main depends on that don't have a template and reports their errors in the same order.
+        Errors in circuits main doesn't depend on are never reported, as with <check>.
+        """
+        for decl in declarations:
+            # If the current declaration is a circuit declaration and its name is <main>, we set it as the main entry point
+            if isinstance(decl, CircuitDeclaration) and decl.token.lexeme == "main":
+                self.program.set_main("main")
+
+            self.program.add_declaration(decl)
+            self._checkDeclaration(decl)
+
+        self.check()
+
+
+    def _checkDeclaration(self, circuit: CircuitDeclaration):
+        """Check the given circuit, then the circuits waiting for it, as soon as the circuits each calls have templates."""
+        ready = [circuit]
+        while len(ready) > 0:
+            circuit = ready.pop()
+            missing = self._missingCircuit(circuit)
+            if missing is not None:
+                self._waiting.setdefault(missing, []).append(circuit)
+                continue
+
+            try:
+                self._checkCircuitDeclaration(circuit)
+            except CheckError:
+                # The error is reported when checking main if main depends on the circuit
+                self._circuits = set([])
+                self._circuit = []
+                self._slots = []
+                self._frames = []
+                continue
+
+            # The template holds all the circuits declared later need so we drop the statements
+            circuit.stmts = CircuitStatements()
+            ready.extend(self._waiting.pop(circuit.token.symbol, []))
+
+
+    def _missingCircuit(self, circuit: CircuitDeclaration):
+        """Returns the symbol of a circuit the given circuit calls that doesn't have a template yet, None if there is none."""
+        for stmt in list(circuit.stmts):
+            expr = stmt.expr
+            if isinstance(expr, AssignmentExpression):
+                expr = expr.rval
+
+            if isinstance(expr, CircuitExpression) and expr.token.symbol not in self._templates:
+                return expr.token.symbol
+
+        return None
+
+
     def _checkDirectives(self):
         """
         """
@@ -120,9 +199,42 @@ class Checker(object):
 
 
         # Checking gates:
-        #   We make sure that they all 
+        #   We make sure that they all have a valid matrix and, this being a deterministic virtual machine, that each is deterministic
+        if "gates" not in directives.keys():
+            raise CheckError("[Checking Error] The gates for <" + vm_id + "> are missing, please provide them.")
+
+        gates = directives["gates"]
+        if isinstance(gates, dict) == False:
+            raise CheckError("[Checking Error] The gates for <" + vm_id + "> must be given as an object mapping gate names to their matrices.")
 
+        for name, matrix in gates.items():
+            if name in self._gates or name in self._special_gates:
+                raise CheckError("[Checking Error] The gate <" + name + "> for <" + vm_id + "> is already declared.")
 
+            try:
+                gate = Gate(name, matrix)
+            except ValueError as error:
+                raise CheckError("[Checking Error] " + str(error))
+
+            if gate.table is None:
+                raise CheckError("[Checking Error] The gate <" + name + "> for <" + vm_id + "> must be deterministic: each column of its matrix must hold a single 1.")
+
+            self._gates[name] = gate
+
+
+    def get_gates(self):
+        """Returns the dictionary that maps the name of each gate to the gate itself."""
+        return self._gates
+
+
+    def get_reg_count(self, vm_id: str = "cvm/deterministic"):
+        """Returns the number of registers the given virtual machine is configured with."""
+        return self._reg_count[vm_id]
+
+
+    def get_reg_prefix(self, vm_id: str = "cvm/deterministic"):
+        """Returns the prefix of the names of the registers of the given virtual machine."""
+        return self._reg_prefix[vm_id]
 
 
     def _checkProgram(self):
@@ -145,56 +257,132 @@ class Checker(object):
         if len(params) > 0:
             raise CheckError("[Checking Error] The main circuit cannot accept any arguments.")
 
-        # We check main circuit
-        self._checkCircuitDeclaration(main)
+        # We check main circuit, which folds each circuit it depends on into a template
+        template = self._checkCircuitDeclaration(main)
+
+        # The circuits that can be are collapsed into gates before any call to them is folded
+        if self.collapser is not None:
+            self.collapser.collapse(self._reachable(template), self._gates)
+
+        # We instantiate the templates to get the statements of main with all circuits folded into it
+        stmts = []
+        self._instantiate(template, [], stmts)
+
+        main.stmts = CircuitStatements()
+        for stmt in stmts:
+            main.add_statement(stmt)
+
+
+    def _reachable(self, template: Template):
+        """Returns the templates the given template depends on, directly or indirectly, and itself, by name in the order they were made."""
+        symbols = set([template.circuit.token.symbol])
+        stack = [template]
+        while len(stack) > 0:
+            template = stack.pop()
+            entries = template.stmts if template.result is None else template.stmts + [template.result]
+            for entry in entries:
+                if entry[0] == Template.CALL and entry[3].circuit.token.symbol not in symbols:
+                    symbols.add(entry[3].circuit.token.symbol)
+                    stack.append(entry[3])
+
+        return dict((template.circuit.token.lexeme, template) for symbol, template in self._templates.items() if symbol in symbols)
 
 
     def _checkCircuitDeclaration(self, circuit: CircuitDeclaration):
+        """Check the given circuit and return its template.
+
+        The circuits called by the given circuit are checked first so each circuit is checked and folded
+        into a template only once, in call graph order, no matter how many times it is called.
+
+        Rather than recursing into the circuits a statement calls, which would exhaust the Python stack
+        on deeply nested circuits, we keep a stack of the circuits being checked along with the position
+        of the statement being checked in each. When a statement calls a circuit that doesn't have a template yet,
+        that circuit is pushed and the statement is checked again once the circuit is popped with its template.
         """
-        """
+        symbol = circuit.token.symbol
+        if symbol in self._templates:
+            return self._templates[symbol]
+
+        self._pushCircuit(circuit)
+        while len(self._frames) > 0:
+            template, stmts, index = self._frames[-1]
+            if index == len(stmts):
+                self._popCircuit()
+                continue
+
+            stmt = stmts[index]
+            if template.result is not None:
+                raise CheckError("[Checking Error] A return statement must be the last statement of a circuit. Circuit <" + template.circuit.token.lexeme + "> has statements after its return statement on line <" + str(stmt.token.line) + ">.")
+
+            # If the statement calls a circuit that wasn't checked yet, we check that circuit first
+            callee = self._pendingCircuit(stmt)
+            if callee is not None:
+                self._pushCircuit(callee)
+                continue
+
+            self._checkStatement(stmt, template)
+            self._frames[-1][2] = index + 1
+
+        return self._templates[symbol]
+
+
+    def _pushCircuit(self, circuit: CircuitDeclaration):
+        """Push the given circuit on the stack of circuits being checked."""
         # If it was not being folded yet, it is being folded now so we add it
-        self._circuits.add(circuit.token.lexeme)
+        self._circuits.add(circuit.token.symbol)
 
-        # Push the current circuit to the circuit stack
+        # Push the current circuit to the circuit stack along with the position of each of its parameters
         self._circuit.append(circuit)
+        self._slots.append(dict((param.token.symbol, index) for index, param in enumerate(circuit.params)))
 
-        # Check one statement. For now, only expressions statements are available
-        stmts = circuit.stmts
+        # Check one statement at a time. For now, only expressions statements are available
+        stmts = list(circuit.stmts)
         if len(stmts) == 0:
             raise CheckError("[Checking Error] A circuit declaration cannot be empty. Circuit declared on line <" + str(circuit.token.line) + "> is empty.")
 
-        for stmt in stmts:
-            new_circuit = self._checkStatement(stmt)
-            if new_circuit is not None:
-                # We begin by checking if the current statement is an assignment expression statement
-                #   If that is the case, we make sure that the new circuit ends with a return statement
-                if (isinstance(stmt, ExpressionStatement) and isinstance(stmt.expr, AssignmentExpression)) or isinstance(stmt, ReturnStatement):
-                    if isinstance(new_circuit.stmts.last, ReturnStatement) == False:
-                        if isinstance(stmt, ExpressionStatement):
-                            raise CheckError("[Checking Error] The circuit that appears as rval to the assignment expression must return an expression. Line <" + str(stmt.expr.token.line) + ">.")
-                        elif isinstance(stmt, ReturnStatement):
-                            raise CheckError("[Checking Error] The circuit that is to be returned from the current return statement must return an expression. Line <" + str(stmt.expr.token.line) + ">.")
-                
-                # We proceed to insert the folded circuit into the current circuit
-                self._checkCircuitDeclaration(new_circuit)
-                circuit.stmts.insert(new_circuit.stmts)
+        self._frames.append([Template(circuit), stmts, 0])
+
+
+    def _popCircuit(self):
+        """Pop the circuit on top of the stack of circuits being checked and save its template."""
+        template = self._frames.pop()[0]
 
         # Pop the circuit from the circuit stack as we are done here
-        self._circuit.pop()
+        circuit = self._circuit.pop()
+        self._slots.pop()
 
         # We are done folding the circuit, we remove it from the list of circuits being folded
-        self._circuits.remove(circuit.token.lexeme)
+        self._circuits.remove(circuit.token.symbol)
+
+        self._templates[circuit.token.symbol] = template
+
+
+    def _pendingCircuit(self, statement: Statement):
+        """Returns the circuit the given statement calls if it doesn't have a template yet, None otherwise."""
+        expr = statement.expr
+        if isinstance(statement, ExpressionStatement) and isinstance(expr, AssignmentExpression):
+            expr = expr.rval
+
+        if isinstance(expr, CircuitExpression) == False:
+            return None
+
+        circuit = self._resolveCircuit(expr)
+        if circuit.token.symbol in self._templates:
+            return None
 
+        return circuit
 
-    def _checkStatement(self, statement: Statement):
+
+    def _checkStatement(self, statement: Statement, template: Template):
         """
         """
         if isinstance(statement, ReturnStatement):
-            return self._checkReturnStatement(statement)
+            template.result = self._checkReturnStatement(statement)
 
         elif isinstance(statement, ExpressionStatement):
-            expr = statement.expr
-            return self._checkExpression(expr)
+            entry = self._checkExpression(statement.expr)
+            if entry is not None:
+                template.add_entry(entry)
 
         else:
             raise CheckError("[Checking Error] Only expression statements are supported at the moment but a different statement was found on line <" + str(statement.token.line) + ">.")
@@ -207,20 +395,27 @@ class Checker(object):
 
         # We can't return from main
         if self._circuit[-1].token.lexeme == "main":
-            raise CheckError("[Checking Error] A return statement is not allowed inside the main circuit. Line <" +  + str(statement.token.line) + ">.")
+            raise CheckError("[Checking Error] A return statement is not allowed inside the main circuit. Line <" + str(statement.token.line) + ">.")
 
         # Only register, gate and circuit expressions can be return
-        if isinstance(expr, (RegisterExpression, GateExpression, CircuitExpression)) == False:
+        if isinstance(expr, (RegisterExpression, ParameterExpression, GateExpression, CircuitExpression)) == False:
             raise CheckError("[Checking Error] Only register (parameters) and gate (circuits) expressions can be returned from a circuit. Line <" + str(statement.token.line) + ">.")
 
-        # If the returned expression is a circuit expression, we fold it
+        # If the returned expression is a circuit expression, we make sure that circuit returns an expression in turn
         if isinstance(expr, CircuitExpression):
-            return self._checkCircuitExpression(expr)
+            entry = self._checkCircuitExpression(expr)
+            if entry[3].result is None:
+                raise CheckError("[Checking Error] The circuit that is to be returned from the current return statement must return an expression. Line <" + str(statement.token.line) + ">.")
+
+            return entry
+
+        elif isinstance(expr, GateExpression):
+            return self._checkGateExpression(expr)
 
         else:
-            return None
+            return (Template.MOVE, None, None, self._checkOperand(expr))
 
-        # Only deterministic registers and gate values can be returned from
+        # Only deterministic registers and gate values can be return from
         # ...
 
 
@@ -237,16 +432,9 @@ class Checker(object):
             return self._checkGateExpression(expression)
 
         elif isinstance(expression, ParameterExpression):
-            return self._checkParameterExpression(expression)
-
-        elif isinstance(expression, RegisterExpression):
-            return self._checkRegisterExpression(expression)
-
-        elif isinstance(expression, LiteralExpression):
-            return self._checkLiteralExpression(expression)
-
-        else:
-            raise CheckError("[Checking Error] Unexpected expression found on line <" + expression.token.line + ">.")
+            # A parameter on its own does nothing so we check it but don't keep it
+            self._checkParameterExpression(expression)
+            return None
 
 
     def _checkAssignmentExpression(self, expression: AssignmentExpression):
@@ -255,16 +443,16 @@ class Checker(object):
         lval = expression.lval
         rval = expression.rval
 
-        # We require that the lval always be a register expression
-        if isinstance(lval, RegisterExpression) == False:
+        # We require that the lval always be a register expression, which a parameter will be once folded
+        if isinstance(lval, (RegisterExpression, ParameterExpression)) == False:
             raise CheckError("[Checking Error] The lval of an assignment expression must always be a register expression.")
 
         # We require that rval be one of:
         #   - circuit expression
         #   - gate expression
-        #   - register expression
+        #   - register expression, which a parameter will be once folded
         #   - literal expression
-        if isinstance(rval, (CircuitExpression, GateExpression, RegisterExpression, LiteralExpression)) == False:
+        if isinstance(rval, (CircuitExpression, GateExpression, RegisterExpression, ParameterExpression, LiteralExpression)) == False:
             raise CheckError("[Checking Error] The rval of an assignment expression must be either a gate expression, a register expression or a literal expression. The offending expression is on line <" + str(rval.token.line) + ">.")
 
         # If the rval is a gate expression, we make sure it is not one of from a select set of built in instructions whose results are not movable (they don't return values)
@@ -272,12 +460,26 @@ class Checker(object):
         if isinstance(rval, GateExpression) and rval.token.lexeme.lower() in self._special_gates:
             raise CheckError("[Checking Error] The <" + rval.token.lexeme.lower() + "> instruction cannot be an rval of assignment expression on line <" + str(rval.token.line) + ">.")
 
-        # If the rval is a circuit expression, we make sure to fold it and return the folded circuit
+        lval_operand = self._checkOperand(lval)
+
+        # If the rval is a circuit expression, we make sure the circuit returns an expression to assign
         if isinstance(rval, CircuitExpression):
-            return self._checkCircuitExpression(rval)
+            entry = self._checkCircuitExpression(rval)
+            if entry[3].result is None:
+                raise CheckError("[Checking Error] The circuit that appears as rval to the assignment expression must return an expression. Line <" + str(expression.token.line) + ">.")
+
+            return (Template.CALL, expression.token, lval_operand, entry[3], entry[4], entry[5])
+
+        elif isinstance(rval, GateExpression):
+            entry = self._checkGateExpression(rval)
+            return (Template.GATE, expression.token, lval_operand, entry[3], entry[4])
+
+        elif isinstance(rval, LiteralExpression):
+            self._checkLiteralExpression(rval)
+            return (Template.LITERAL, expression.token, lval_operand, rval.token)
 
         else:
-            return None
+            return (Template.MOVE, expression.token, lval_operand, self._checkOperand(rval))
 
         # We make sure that the lval and rval are of the same kind as in classical-classical
         #   ... Since we are not given the directive data yet, we eschew this step for the moment
@@ -286,59 +488,71 @@ class Checker(object):
     def _checkCircuitExpression(self, expression: CircuitExpression):
         """
         """
-        # We make sure that each argument passed to the circuit is a register expression
+        # The circuit has been checked before the statement calling it so its template is ready
+        #   The arguments become the operands the template will be instantiated with
+        circuit = self._resolveCircuit(expression)
+        template = self._templates[circuit.token.symbol]
+        return (Template.CALL, None, None, template, [self._checkOperand(arg) for arg in expression.args], expression.token)
+
+
+    def _resolveCircuit(self, expression: CircuitExpression):
+        """Returns the declaration of the circuit called by the given circuit expression."""
+        # We make sure that each argument passed to the circuit is a register expression, which a parameter will be once folded
         args = expression.args
         for arg in args:
-            if isinstance(arg, RegisterExpression) == False:
+            if isinstance(arg, (RegisterExpression, ParameterExpression)) == False:
                 raise CheckError("[Checking Error] Expected a register as argument to a circuit on line <" + str(arg.token.line) + ">.")
 
-        # We validate the declaration
-        #   We make sure that there exist a circuit by the given name and arity
-        #   We make the appropriate replacements of paramaters by the given arguments
-        #   Then we call the circuit declaration validator to validate the correctly formed circuit declaration
+        # We make sure that there exist a circuit by the given name and arity
         try:
             circuit = self.program.get_declaration(expression.token.lexeme, len(args))
-
-            # Start the folding process
-            new_circuit = self._foldCircuit(expression, circuit)
-
-            # We return the new circuit so its statements may be integrated into the parent circuit
-            return new_circuit
         except KeyError:
             raise CheckError("[Checking Error] Failed to find a circuit by the name <" + expression.token.lexeme + "> that accepts <" + str(len(args)) + "> arguments. Circuit invoked on line <" + str(expression.token.line) + ">.")
 
+        # We make sure that the given circuit is not already being folded to avoid recursive calls which is not allowed for circuits
+        if circuit.token.symbol in self._circuits:
+            raise CheckError("[Checking Error] Circuit <" + circuit.token.lexeme + "> declared on line <" + str(circuit.token.line) + "> cannot be called within <" + self._circuit[-1].token.lexeme + "> on line <" + str(expression.token.line) + "> because it will lead to recursive circuits which is not allowed.")
+
+        return circuit
+
 
     def _checkGateExpression(self, expression: GateExpression):
         """
         """
-        # We make sure that each argument passed to the gate is a register expression
+        # We make sure that each argument passed to the gate is a register expression, which a parameter will be once folded
         args = expression.args
         for arg in args:
-            if isinstance(arg, RegisterExpression) == False:
-                raise CheckError("[Checking Error] Expected a register as argument to a gate on line <" + arg.token.line + ">.")
+            if isinstance(arg, (RegisterExpression, ParameterExpression)) == False:
+                raise CheckError("[Checking Error] Expected a register as argument to a gate on line <" + str(arg.token.line) + ">.")
 
         # Make sure that there exists a gate by the given name and arity
 
-        # We return None as checking gate expressions doesn't result in a new circuit
-        return None
+        return (Template.GATE, None, None, expression.token, [self._checkOperand(arg) for arg in args])
+
+
+    def _checkOperand(self, expression: Expression):
+        """Returns the operand a register or parameter expression becomes in a template."""
+        if isinstance(expression, ParameterExpression):
+            return self._checkParameterExpression(expression)
+
+        return self._checkRegisterExpression(expression)
 
 
     def _checkParameterExpression(self, expression: ParameterExpression):
-        """
-        """
-        # Parameter expression cannot occur inside the main circuit
+        """Returns the position of the given parameter in the circuit being checked."""
+        # Parameter expression cannot occur inside the main circuit, which has no parameters
+        slots = self._slots[-1]
+        if expression.token.symbol not in slots:
+            raise CheckError("[Checking Error] Parameter <" + expression.token.lexeme + "> on line <" + str(expression.token.line) + "> could not be transformed into a register since it is not a valid parameter of the current circuit <" + self._circuit[-1].token.lexeme + ">.")
 
-        # We return None as checking parameter expressions doesn't result in a new circuit
-        return None
+        return slots[expression.token.symbol]
 
 
     def _checkRegisterExpression(self, expression: RegisterExpression):
-        """
-        """
+        """Returns the token of the given register."""
         # Make sure the register used is within the register count that will be allocated by the VM.
 
-        # We return None as checking register expressions doesn't result in a new circuit
-        return None
+        return expression.token
 
 
     def _checkLiteralExpression(self, expression: LiteralExpression):
@@ -352,130 +566,108 @@ class Checker(object):
         return None
 
 
-    def _foldCircuit(self, circuit_expression: CircuitExpression, circuit: CircuitDeclaration):
-        """Find all paramaters in the given circuit and replace them with the given arguments.
-        Return a new circuit that doesn't have any parameters but only valid statements.
-        """
-        # We begin by making sure that the given circuit is not already being folded to avoid recursive calls which is not allowed for circuits
-        if circuit.token.lexeme in self._circuits:
-            raise CheckError("[Checking Error] Circuit <" + circuit.token.lexeme + "> declared on line <" + str(circuit.token.line) + "> cannot be called within <" + self._circuit[-1].token.lexeme + "> on line <" + str(circuit_expression.token.line) + "> because it will lead to recursive circuits which is not allowed.")
-
-        # We create a new circuit declaration with all parameters replaced by arguments
-        new_circuit = CircuitDeclaration(circuit.token)
-        stmts = circuit.stmts
-        for stmt in stmts:
-            new_circuit.add_statement(self._foldStatement(stmt, circuit_expression, circuit))
-
-        # We have the new circuit, we return it
-        return new_circuit
-
-
-    def _foldStatement(self, statement: Statement, circuit_expression: CircuitExpression, circuit: CircuitDeclaration):
-        """
-        """
-        if isinstance(statement, ReturnStatement):
-            return ReturnStatement(statement.token, self._foldExpression(statement.expr, circuit_expression, circuit))
-
-        elif isinstance(statement, ExpressionStatement):
-            return ExpressionStatement(self._foldExpression(statement.expr, circuit_expression, circuit))
-
-        else:
-            raise CheckError("[Checking Error] Only expression statements are supported at the moment but a different statement was found on line <" + str(statement.token.line) + ">.")
-
-
-    def _foldExpression(self, expression: Expression, circuit_expression: CircuitExpression, circuit: CircuitDeclaration):
-        """
-        """
-        if isinstance(expression, AssignmentExpression):
-            return self._foldAssignmentExpression(expression, circuit_expression, circuit)
-
-        elif isinstance(expression, CircuitExpression):
-            return self._foldCircuitExpression(expression, circuit_expression, circuit)
-
-        elif isinstance(expression, GateExpression):
-            return self._foldGateExpression(expression, circuit_expression, circuit)
-
-        elif isinstance(expression, ParameterExpression):
-            return self._foldParameterExpression(expression, circuit_expression, circuit)
-
-        elif isinstance(expression, RegisterExpression):
-            # Should we disallow the use of the register expressions inside the a subcircuit?
-            #   This would eliminate errors where a register is used inadvently but also prevent concise code.
-            #   I think it might be best to just allow it and let users write better code themselves.
-            return self._foldRegisterExpression(expression, circuit_expression)
-
-        elif isinstance(expression, LiteralExpression):
-            return self._foldLiteralExpression(expression, circuit_expression)
-
-        else:
-            raise CheckError("[Checking Error] Unexpected expression found on line <" + expression.token.line + ">.")
-
-
-    def _foldAssignmentExpression(self, expression: AssignmentExpression, circuit_expression: CircuitExpression, circuit: CircuitDeclaration):
-        """
-        """
-        # Build a new assignment expression
-        new_lval = self._foldExpression(expression.lval, circuit_expression, circuit)
-        new_rval = self._foldExpression(expression.rval, circuit_expression, circuit)
-        new_expression = AssignmentExpression(expression.token, new_lval, new_rval)
-
-        # Assuming all went well, we return the new assignment
-        return new_expression
-
-
-    def _foldCircuitExpression(self, expression: CircuitExpression, circuit_expression: CircuitExpression, circuit: CircuitDeclaration):
-        """
-        """
-        # Build the new circuit expression
-        new_expression = CircuitExpression(expression.token)
-        args = expression.args
-        for arg in args:
-            new_expression.add_argument(self._foldExpression(arg, circuit_expression, circuit))
-
-        # All went well, we return
-        return new_expression
-
-
-    def _foldGateExpression(self, expression: GateExpression, circuit_expression: CircuitExpression, circuit: CircuitDeclaration):
-        """
-        """
-        # Build the new gate expression
-        new_expression = GateExpression(expression.token)
-        args = expression.args
-        for arg in args:
-            new_expression.add_argument(self._foldExpression(arg, circuit_expression, circuit))
-
-        # All went well, we return
-        return new_expression
+    def _instantiate(self, template: Template, args: list, stmts: list):
+        """Append the statements of the given template instantiated with the given arguments to the given list
+        and return the expression the template returns, None if it doesn't return anything.
+
+        Like checking, instantiation keeps its own stack of the templates being instantiated rather than recursing
+        into the templates of the circuits called. Each frame holds a template, its arguments and the position
+        of the entry being instantiated, the expression returned by the template coming last.
+
+        Args:
+            template(Template): The template to instantiate.
+            args(list): The tokens of the registers passed as arguments, in the order of the parameters.
+            stmts(list): The list of statements the statements of the template are appended to.
+        """
+        stack = [[template, args, 0]]
+        value = None
+        returned = False
+        while True:
+            template, args, index = stack[-1]
+            count = len(template.stmts)
+            if index == count and template.result is None or index > count:
+                if template.result is None:
+                    value = None
+
+                # The value returned by the template goes to the entry that called it
+                stack.pop()
+                if len(stack) == 0:
+                    return value
+
+                returned = True
+                continue
+
+            entry = template.stmts[index] if index < count else template.result
+            if returned == True:
+                returned = False
+            elif entry[0] == Template.CALL:
+                operands = [args[operand] if isinstance(operand, int) else operand for operand in entry[4]]
+                collapsed = self._collapse(entry, args, operands, index == count, stmts)
+                if collapsed is None:
+                    stack.append([entry[3], operands, 0])
+                    continue
+
+                # The call was assembled into a single gate application so there's no template to instantiate
+                value = collapsed[0]
+                stack[-1][2] = index + 1
+                continue
+            else:
+                value = self._instantiateValue(entry, args)
+
+            stack[-1][2] = index + 1
+            if index == count:
+                continue
+
+            lval = entry[2]
+            if lval is not None:
+                lval_token = args[lval] if isinstance(lval, int) else lval
+                stmts.append(ExpressionStatement(AssignmentExpression(entry[1], RegisterExpression(lval_token), value)))
+
+            # Without an lval, the value returned by a called circuit is discarded
+            elif entry[0] == Template.GATE:
+                stmts.append(ExpressionStatement(value))
+
+
+    def _collapse(self, entry: tuple, args: list, operands: list, returned: bool, stmts: list):
+        """Returns the gate expression and the tokens of the registers it assigns if the given call could be assembled
+        into a single application of the gate its circuit was collapsed into, None otherwise.
+
+        Unless the call is returned, the statement assigning the outputs of the gate is appended to the given list.
+        """
+        if self.collapser is None:
+            return None
 
+        lval = entry[2]
+        lval_token = None if lval is None else (args[lval] if isinstance(lval, int) else lval)
+        collapsed = self.collapser.call(entry[3], operands, lval_token, returned or lval is not None, entry[5])
+        if collapsed is None:
+            return None
 
-    def _foldParameterExpression(self, expression: ParameterExpression, circuit_expression: CircuitExpression, circuit: CircuitDeclaration):
-        """
-        """
-        # We have a parameter expression, we find its index in the circuit currently being checked
-        param_index = 0
-        try:
-            param_index = circuit.params.index(expression)
-        except ValueError:
-            raise CheckError("[Checking Error] Parameter <" + expression.token.lexeme + "> on line <" + str(expression.token.line) + "> could not be transformed into a register since it is not a valid parameter of the current circuit <" + circuit.token.lexeme + ">.")
+        gate_expr, targets = collapsed
+        if returned == True:
+            return collapsed
 
-        # We use the index on the arguments given to the circuit expression to find the register to use
-        reg = circuit_expression.args[param_index]
+        # The assignment token is that of the call when the circuit was called for its side effects
+        token = entry[1]
+        if token is None:
+            token = Token(TokenType.EQUAL, "=", entry[5].line, "")
 
-        # We create a new register expression out of the parameter expression
-        new_expression = RegisterExpression(reg.token)
+        if len(targets) == 1:
+            stmts.append(ExpressionStatement(AssignmentExpression(token, RegisterExpression(targets[0]), gate_expr)))
+        elif len(targets) > 1:
+            stmts.append(ExpressionStatement(MultipleAssignmentExpression(token, [RegisterExpression(target) for target in targets], gate_expr)))
 
-        # All went well, we bail out
-        return new_expression
+        return collapsed
 
 
-    def _foldRegisterExpression(self, expression: RegisterExpression, circuit_expression: CircuitExpression):
-        """
-        """
-        return expression
+    def _instantiateValue(self, entry: tuple, args: list):
+        """Returns the expression for the value of the given entry, which doesn't call a circuit, instantiated with the given arguments."""
+        kind = entry[0]
+        if kind == Template.LITERAL:
+            return LiteralExpression(entry[3])
 
+        if kind == Template.MOVE:
+            operand = entry[3]
+            return RegisterExpression(args[operand] if isinstance(operand, int) else operand)
 
-    def _foldLiteralExpression(self, expression: LiteralExpression, circuit_expression: CircuitExpression):
-        """
-        """
-        return expression
+        return GateExpression(entry[3], tuple(RegisterExpression(args[operand] if isinstance(operand, int) else operand) for operand in entry[4]))
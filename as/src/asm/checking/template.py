@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from common.ast import CircuitDeclaration
+
+class Template(object):
+    """A circuit checked once and ready to be instantiated at each of its call sites.
+
+    The statements of a template are entries whose register operands are either the token of a register
+    or the integer position of a parameter, so instantiating a template only takes the tokens of the arguments
+    in a flat list: the operand at position <i> becomes the register passed as argument <i>.
+    Calls to other circuits are kept as entries pointing to the template of the callee
+    so that each circuit is folded once no matter how many times it is called.
+
+    An entry is a tuple <(kind, assignment token, lval operand, ...)> where the assignment token and lval operand
+    are None for statements that don't assign a register. The remaining fields depend on the kind:
+        - GATE:     the token of the gate and the list of operands it is applied to
+        - MOVE:     the operand moved
+        - LITERAL:  the token of the literal moved
+        - CALL:     the template of the callee, the list of operands it is called with and the token of the call
+
+    Attributes:
+        circuit(CircuitDeclaration): The circuit the template was made from.
+        stmts(list): The entries for the statements of the circuit.
+        result(tuple): The entry for the expression the circuit returns, None if the circuit doesn't return anything.
+    """
+    GATE        = 0
+    MOVE        = 1
+    LITERAL     = 2
+    CALL        = 3
+
+    circuit     : CircuitDeclaration    = None
+    stmts       : list                  = []
+    result      : tuple                 = None
+
+    def __init__(self, circuit: CircuitDeclaration):
+        self.circuit = circuit
+        self.stmts = []
+        self.result = None
+
+
+    def add_entry(self, entry: tuple):
+        """Add the entry of a statement to the template."""
+        self.stmts.append(entry)
+
+
+    def __repr__(self):
+        return "template {0!s}/{1!s}".format(self.circuit.token.lexeme, len(self.circuit.params))
+
+    __str__ = __repr__
@@ -11,6 +11,7 @@ Email           : ntwali.bashige@gmail.com
 
 from asm.lexing.exceptions import LexError
 from common.token_type import TokenType
+from common.symbols import SymbolTable
 from common.token import Token
 
 class Lexer(object):
@@ -22,13 +23,15 @@ class Lexer(object):
     start       : int       = 0
     current     : int       = 0
     line        : int       = 1
+    symbols     : SymbolTable   = None
 
     _length     : int       = 0
     _keywords   : dict      = {}
     _gates      : dict      = {}
 
-    def __init__(self, source: str):
+    def __init__(self, source: str, symbols: SymbolTable = None):
         self.source = source
+        self.symbols = SymbolTable() if symbols is None else symbols
         self._length = len(source)
         self._keywords = {
             "circuit": TokenType.CIRCUIT,
@@ -178,7 +181,9 @@ class Lexer(object):
             try:
                 return self._makeToken(self._gates[alpha])
             except KeyError:
-                return self._makeToken(TokenType.IDENTIFIER)
+                # Every identifier is interned so its tokens share one id and one string
+                symbol = self.symbols.intern(alpha)
+                return Token(TokenType.IDENTIFIER, self.symbols.name(symbol), self.line, "", symbol)
 
 
     def _isNumeric(self):
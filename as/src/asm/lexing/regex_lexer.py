@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import re
+from array import array
+
+from common.token_type import TokenType
+from common.token_stream import TokenStream
+from common.symbols import SymbolTable
+
+class RegexLexer(object):
+    """Scans the given source for tokens to be passed to the parser, one regular expression match per token.
+
+    It produces the same tokens as <Lexer>, with the same lines and errors, but instead of going through the source
+    one character at a time it matches a single compiled regular expression over the source encoded as bytes.
+    Each alternative of the expression is a named group telling what kind of token it matched and the expression
+    matches every byte, so consecutive matches cover the whole source.
+
+    The whitespace and comments before a token are matched with it and skipped, so they are the only place to count new lines.
+    Sources are expected to be ASCII: a character outside of ASCII is matched whole and reported as an unexpected token,
+    even a letter that <Lexer> would take as the start of an identifier.
+
+    The tokens are scanned into a <TokenStream> which keeps them in arrays, without making an object per token.
+    The stream is handed to the parser whole, or token by token like <Lexer> does.
+
+    Identifiers are interned in the symbol table of the lexer as they are scanned, and each token of the stream keeps
+    the id of its identifier, so the identifiers of the tokens the parser keeps share their string instead of being decoded again.
+
+    The source can also be a file opened in binary mode, which is then read in chunks as tokens are asked for,
+    for instance by a <TokenRing>, so that only the chunk being scanned is held rather than the whole source.
+    A match reaching the end of a chunk may go on in the next chunk, such as an identifier or a comment cut in two,
+    so it is scanned again once the next chunk is appended to the rest of the current one.
+
+    Attributes:
+        source(bytes): The source encoded as UTF-8, empty if the source is read from a file.
+        chunk_size(int): The number of bytes read from the file at once.
+        line(int): The line of the last token returned.
+        symbols(SymbolTable): The identifiers scanned, which may be shared with other lexers.
+    """
+    source      : bytes     = b""
+    chunk_size  : int       = 65536
+    line        : int       = 1
+    symbols     : SymbolTable   = None
+
+    _file                   = None
+    _buffer     : bytes         = b""
+    _offset     : int           = 0
+    _line       : int           = 1
+    _done       : bool          = False
+    _stream     : TokenStream   = None
+    _position   : int           = 0
+    _keywords   : dict          = {}
+    _punctuation: dict          = {}
+    _ids        : dict          = {}
+    _errors     : dict          = {}
+
+    _pattern                = re.compile(rb"""
+        (?:[ \t\r\n\x0b\x0c\x1c-\x1f]+|//[^\n]*)*
+        (?:
+              (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+            | (?P<symbol>[(){}=:;,%])
+            | (?P<binary>[0-9]+b)
+            | (?P<number>[0-9]+)
+            | (?P<bracket>[\[\]])
+            | (?P<slash>/)
+            | (?P<other>[\xc0-\xff][\x80-\xbf]*|[\x00-\xff])
+            | (?P<end>\Z)
+        )
+    """, re.VERBOSE)
+
+    def __init__(self, source, chunk_size: int = 65536, symbols: SymbolTable = None):
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+
+        if isinstance(source, bytes):
+            self.source = source
+            self._file = None
+        else:
+            self.source = b""
+            self._file = source
+
+        self.chunk_size = chunk_size
+        self.line = 1
+        self.symbols = SymbolTable() if symbols is None else symbols
+
+        self._buffer = self.source
+        self._offset = 0
+        self._line = 1
+        self._done = False
+        self._stream = None
+        self._position = 0
+        self._keywords = {
+            b"circuit"  : TokenType.CIRCUIT,
+            b"return"   : TokenType.RETURN,
+        }
+        # Ids of the identifiers by their bytes, which saves decoding an identifier seen before
+        self._ids = {}
+        self._punctuation = {
+            ord("(")    : TokenType.LEFT_PAREN,
+            ord(")")    : TokenType.RIGHT_PAREN,
+            ord("{")    : TokenType.LEFT_BRACE,
+            ord("}")    : TokenType.RIGHT_BRACE,
+            ord("=")    : TokenType.EQUAL,
+            ord(":")    : TokenType.COLON,
+            ord(";")    : TokenType.SEMI_COLON,
+            ord(",")    : TokenType.COMMA,
+            ord("%")    : TokenType.PERCENT,
+        }
+        self._errors = {
+            "number"    : "Expected the letter 'b' after the binary number.",
+            "bracket"   : "Indexing is not currently supported.",
+            "slash"     : "Expected a second slash '/' to indicate a comment.",
+            "other"     : "Unexpected token.",
+        }
+
+
+    def lex(self):
+        """Returns the next token of the source, the end of file token once the whole source was scanned."""
+        stream = self.tokenize()
+        token = stream.token(self._position)
+        if self._position < len(stream):
+            self._position = self._position + 1
+
+        self.line = token.line
+        return token
+
+
+    def tokenize(self):
+        """Scan the whole source and return its tokens as a stream, scanning it only the first time.
+
+        A source read from a file is read whole first since the offsets of the tokens in the stream are offsets in the source.
+        """
+        if self._stream is not None:
+            return self._stream
+
+        if self._file is not None:
+            self.source = self._buffer[self._offset :] + self._file.read()
+            self._buffer = self.source
+            self._offset = 0
+            self._file = None
+
+        self._stream = TokenStream(self.source, self.symbols)
+        while self._done == False:
+            self.scan(self._stream, self.chunk_size)
+
+        return self._stream
+
+
+    def scan(self, tokens, count: int):
+        """Append at most the given number of tokens to the given stream or ring, the end of file token being the last.
+
+        The tokens are gathered in arrays and appended together, each time the chunk being scanned changes and at the end.
+
+        Args:
+            tokens(TokenStream|TokenRing): The tokens to append to.
+            count(int): The maximum number of tokens to scan.
+        """
+        buffer = self._buffer
+        offset = self._offset
+        line = self._line
+        match = self._pattern.match
+        keywords = self._keywords
+        punctuation = self._punctuation
+        ids = self._ids
+
+        # Groups are told apart by number, which is cheaper to get from a match than their name
+        groups = self._pattern.groupindex
+        identifier = groups["identifier"]
+        punctuation_group = groups["symbol"]
+        binary = groups["binary"]
+        end = groups["end"]
+
+        types, starts, ends, lines, symbols, errors = array('B'), array('I'), array('I'), array('I'), array('i'), {}
+        scanned = 0
+        while scanned < count and self._done == False:
+            token = match(buffer, offset)
+            index = token.lastindex
+            first, last = token.span(index)
+
+            # The token may go on in the next chunk so we scan it again with the next chunk appended
+            if last == len(buffer) and self._file is not None:
+                tokens.extend(buffer, types, starts, ends, lines, symbols, errors)
+                types, starts, ends, lines, symbols, errors = array('B'), array('I'), array('I'), array('I'), array('i'), {}
+
+                chunk = self._file.read(self.chunk_size)
+                if len(chunk) == 0:
+                    self._file = None
+                buffer = buffer[offset :] + chunk
+                offset = 0
+                continue
+
+            # New lines can only be found in the whitespace and comments skipped before the token
+            if first != offset:
+                line = line + buffer.count(b"\n", offset, first)
+            offset = last
+
+            symbol = -1
+            if index == identifier:
+                # Only identifiers as long as a keyword are looked up
+                name = buffer[first : last]
+                token_type = TokenType.IDENTIFIER
+                if last - first == 6 or last - first == 7:
+                    token_type = keywords.get(name, TokenType.IDENTIFIER)
+
+                if token_type == TokenType.IDENTIFIER:
+                    symbol = ids.get(name, -1)
+                    if symbol == -1:
+                        symbol = self.symbols.intern(name.decode("ascii"))
+                        ids[name] = symbol
+            elif index == punctuation_group:
+                token_type = punctuation[buffer[first]]
+            elif index == binary:
+                token_type = TokenType.CBINARY
+            elif index == end:
+                token_type = TokenType.EOF
+                self._done = True
+            else:
+                token_type = TokenType.ERROR
+                errors[len(types)] = self._errors[token.lastgroup]
+
+            types.append(token_type)
+            starts.append(first)
+            ends.append(last)
+            lines.append(line)
+            symbols.append(symbol)
+            scanned = scanned + 1
+
+        tokens.extend(buffer, types, starts, ends, lines, symbols, errors)
+        self._buffer = buffer
+        self._offset = offset
+        self._line = line
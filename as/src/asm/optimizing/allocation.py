@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from asm.optimizing.ssa import Function, Instruction
+
+class RegisterAllocator(object):
+    """Maps the values of the main circuit onto as few registers as possible.
+
+    Since circuits are folded by substituting the registers of the caller for the parameters,
+    every intermediate value lives in a register the user named and sized <reg-count> for.
+    We instead treat each definition, from the instruction that assigns it to its last use, as a virtual register.
+    The main circuit being straight-line code, the lifetime of each definition is an interval of instructions
+    and a linear scan over those intervals, sorted by start, maps them onto the lowest free registers.
+
+    Initial values that are read are the inputs of the program and keep their register.
+    Unless told otherwise, the final value of every register is observed: the last value assigned to a register
+    keeps that register and registers the program doesn't use are left alone.
+
+    Attributes:
+        function(Function): The main circuit, with all the other circuits folded into it, in static single assignment form.
+        prefix(str): The prefix of the names of the registers.
+        final_state(bool): Whether the final value of every register is observed.
+        reg_count(int): The number of registers the program needs once allocated.
+    """
+    function        : Function      = None
+    prefix          : str           = ""
+    final_state     : bool          = True
+    reg_count       : int           = 0
+
+    def __init__(self, function: Function, prefix: str, final_state: bool = True):
+        self.function = function
+        self.prefix = prefix
+        self.final_state = final_state
+        self.reg_count = 0
+
+
+    def allocate(self):
+        """Allocate the registers of the main circuit and return the number of registers the program needs.
+
+        Raises:
+            ValueError: If a register is not named after the register prefix.
+        """
+        function = self.function
+        length = len(function.instructions)
+
+        # Each interval is [start, end, register] for a definition, the register being known upfront for inputs and outputs
+        #   Instruction <i> reads its operands at time 2i and writes its results at time 2i + 1
+        intervals = {}
+        for definition in function.definitions():
+            # Registers the program no longer mentions are left alone
+            if definition.instruction is None and len(definition.uses) == 0:
+                continue
+
+            start = -1 if definition.instruction is None else 2 * definition.instruction.position + 1
+            end = max([start] + [2 * use.position for use in definition.uses])
+            register = self._index(definition.register) if definition.instruction is None else None
+            intervals[definition] = [start, end, register]
+
+        if self.final_state == True:
+            for definition in function.outputs.values():
+                if definition in intervals:
+                    intervals[definition][1] = 2 * length
+                    intervals[definition][2] = self._index(definition.register)
+
+        self._scan(intervals)
+
+        # Rename the registers, dropping the moves of a register into itself
+        for definition, interval in intervals.items():
+            function.rename(definition, self.prefix + str(interval[2]))
+        function.relink()
+
+        for instruction in function.instructions:
+            if instruction.kind == Instruction.MOVE and instruction.operands[0].symbol == instruction.results[0].symbol:
+                function.forward(instruction.results[0], instruction.operands[0])
+
+        function.compact()
+
+        self.reg_count = max([interval[2] + 1 for interval in intervals.values()] + [0])
+        return self.reg_count
+
+
+    def _scan(self, intervals: dict):
+        """Assign a register to each interval that doesn't have one yet.
+
+        Two intervals may share a register when they don't overlap, so the value an instruction reads for the last time
+        and the one it writes may share a register. An interval that starts with a move is first offered the register
+        it moves from so that the move disappears.
+        """
+        # The intervals whose register is known upfront, by register
+        fixed = {}
+        for interval in intervals.values():
+            if interval[2] is not None:
+                fixed.setdefault(interval[2], []).append(interval)
+
+        # The end of the last interval given to each register
+        ends = {}
+        for definition, interval in sorted([item for item in intervals.items() if item[1][2] is None], key = lambda item: item[1][0]):
+            start, end = interval[0], interval[1]
+            hint = None
+            if definition.instruction.kind == Instruction.MOVE:
+                hint = intervals[definition.instruction.operands[0]][2]
+
+            for register in self._candidates(hint, fixed):
+                if ends.get(register, -2) >= start:
+                    continue
+
+                if any(other[0] <= end and start <= other[1] for other in fixed.get(register, [])):
+                    continue
+
+                interval[2] = register
+                ends[register] = end
+                break
+
+
+    def _candidates(self, hint: int, fixed: dict):
+        """Yields the registers an interval may be given, in order of preference.
+
+        When the final state is observed, a register the program doesn't use must keep its value until the end
+        so the gaps between the values of the registers it does use are tried before any new register.
+        """
+        if hint is not None:
+            yield hint
+
+        register = 0
+        if self.final_state == True and len(fixed) > 0:
+            for register in sorted(fixed):
+                yield register
+
+            register = max(fixed) + 1
+
+        while True:
+            yield register
+            register = register + 1
+
+
+    def _index(self, name: str):
+        """Returns the index of the given register.
+
+        Raises:
+            ValueError: If the register is not named after the register prefix.
+        """
+        index = name[len(self.prefix):]
+        if name.startswith(self.prefix) == False or index.isdigit() == False:
+            raise ValueError("The register <" + name + "> is not named after the register prefix <" + self.prefix + ">.")
+
+        return int(index)
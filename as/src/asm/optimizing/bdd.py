@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import sys
+
+from common.gate import Gate
+
+class BDD(object):
+    """A manager of reduced ordered binary decision diagrams, the canonical representation of boolean functions we use
+    to reason about the values registers hold without enumerating all the values of the registers they depend on.
+
+    A node tests a variable and continues to its low child if the variable is 0 or to its high child if it is 1,
+    the variables being tested in the order in which they were created. Nodes 0 and 1 are the constant functions.
+    A node is only created when its children differ and the unique table returns the existing node with the same
+    variable and children, so two functions are equal if and only if they are the same node.
+    Every operation is an if-then-else whose results are kept in the operation cache.
+
+    Attributes:
+        variables(int): The number of variables created.
+    """
+    FALSE           = 0
+    TRUE            = 1
+
+    variables       : int           = 0
+
+    _levels         : list          = []
+    _lows           : list          = []
+    _highs          : list          = []
+    _unique         : dict          = {}
+    _cache          : dict          = {}
+
+    def __init__(self):
+        self.variables = 0
+
+        # The constants test no variable so they come after every variable in the order
+        self._levels = [sys.maxsize, sys.maxsize]
+        self._lows = [BDD.FALSE, BDD.TRUE]
+        self._highs = [BDD.FALSE, BDD.TRUE]
+        self._unique = {}
+        self._cache = {}
+
+
+    def variable(self):
+        """Returns the node of a new variable, tested after all the variables created before it."""
+        self.variables = self.variables + 1
+        return self._node(self.variables - 1, BDD.FALSE, BDD.TRUE)
+
+
+    def constant(self, value: int):
+        """Returns the node of the constant function with the given bit."""
+        return BDD.TRUE if value == 1 else BDD.FALSE
+
+
+    def negate(self, f: int):
+        """Returns the node of the negation of the given function."""
+        return self.ite(f, BDD.FALSE, BDD.TRUE)
+
+
+    def conjoin(self, f: int, g: int):
+        """Returns the node of the conjunction of the given functions."""
+        return self.ite(f, g, BDD.FALSE)
+
+
+    def disjoin(self, f: int, g: int):
+        """Returns the node of the disjunction of the given functions."""
+        return self.ite(f, BDD.TRUE, g)
+
+
+    def differ(self, f: int, g: int):
+        """Returns the node of the exclusive disjunction of the given functions, 1 wherever they differ."""
+        return self.ite(f, self.negate(g), g)
+
+
+    def ite(self, f: int, g: int, h: int):
+        """Returns the node of the function that is <g> where <f> is 1 and <h> where <f> is 0.
+
+        Diagrams are as deep as the variables they test, so rather than recursing on the cofactors
+        we keep the if-then-else still to evaluate on a stack, each followed by its cofactors,
+        and the nodes computed on another, where a split finds the nodes of its two cofactors on top.
+        """
+        nodes = []
+        # Each entry is an if-then-else and the level it is split on, None until its cofactors were pushed
+        pending = [(f, g, h, None)]
+        while len(pending) > 0:
+            f, g, h, level = pending.pop()
+            if level is not None:
+                high = nodes.pop()
+                low = nodes.pop()
+                node = self._node(level, low, high)
+                self._cache[(f, g, h)] = node
+                nodes.append(node)
+                continue
+
+            node = self._terminal(f, g, h)
+            if node is not None:
+                nodes.append(node)
+                continue
+
+            # We split the three functions on the first variable any of them tests
+            level = min(self._levels[f], self._levels[g], self._levels[h])
+            f0, f1 = self._cofactors(f, level)
+            g0, g1 = self._cofactors(g, level)
+            h0, h1 = self._cofactors(h, level)
+            pending.append((f, g, h, level))
+            pending.append((f1, g1, h1, None))
+            pending.append((f0, g0, h0, None))
+
+        return nodes[0]
+
+
+    def apply(self, gate: Gate, args: list):
+        """Returns the nodes of the outputs of the given deterministic gate applied to the given nodes, in order.
+
+        Each output is the disjunction, over the packed inputs for which the output is 1, of the conjunction of the arguments
+        or their negations. We build it as a tree of if-then-else on the arguments, the first argument at the root.
+        """
+        return [self._tabulate(gate.table, gate.inputs, gate.outputs - 1 - output, args) for output in range(gate.outputs)]
+
+
+    def evaluate(self, f: int, values: list):
+        """Returns the bit the given function takes when each variable takes the bit at its position in the given values."""
+        while f > BDD.TRUE:
+            f = self._highs[f] if values[self._levels[f]] == 1 else self._lows[f]
+
+        return f
+
+
+    def witness(self, f: int):
+        """Returns the bit of each variable, in a list, for which the given function is 1 or None if the function is always 0.
+
+        Since every node other than 0 leads to 1, we can follow any child that isn't 0.
+        """
+        if f == BDD.FALSE:
+            return None
+
+        values = [0] * self.variables
+        while f > BDD.TRUE:
+            if self._lows[f] != BDD.FALSE:
+                f = self._lows[f]
+            else:
+                values[self._levels[f]] = 1
+                f = self._highs[f]
+
+        return values
+
+
+    def size(self, f: int):
+        """Returns the number of nodes of the given function, constants included."""
+        seen = set([])
+        pending = [f]
+        while len(pending) > 0:
+            node = pending.pop()
+            if node in seen:
+                continue
+
+            seen.add(node)
+            if node > BDD.TRUE:
+                pending.append(self._lows[node])
+                pending.append(self._highs[node])
+
+        return len(seen)
+
+
+    def _node(self, level: int, low: int, high: int):
+        """Returns the node testing the variable at the given level with the given children, creating it if it doesn't exist."""
+        if low == high:
+            return low
+
+        key = (level, low, high)
+        if key not in self._unique:
+            self._unique[key] = len(self._levels)
+            self._levels.append(level)
+            self._lows.append(low)
+            self._highs.append(high)
+
+        return self._unique[key]
+
+
+    def _cofactors(self, f: int, level: int):
+        """Returns the given function with the variable at the given level set to 0 then to 1."""
+        if self._levels[f] != level:
+            return f, f
+
+        return self._lows[f], self._highs[f]
+
+
+    def _terminal(self, f: int, g: int, h: int):
+        """Returns the node of the given if-then-else if it is known without splitting it, None otherwise."""
+        if f == BDD.TRUE:
+            return g
+        if f == BDD.FALSE:
+            return h
+        if g == h:
+            return g
+        if g == BDD.TRUE and h == BDD.FALSE:
+            return f
+
+        return self._cache.get((f, g, h))
+
+
+    def _tabulate(self, table: tuple, inputs: int, bit: int, args: list):
+        """Returns the node of the given bit of the outputs of the truth table.
+
+        We start from the constant of each packed input and, from the last input to the first, merge the nodes
+        of each pair of prefixes differing only in that input with an if-then-else on its argument.
+        """
+        nodes = [self.constant((output >> bit) & 1) for output in table[:1 << inputs]]
+        for position in range(inputs - 1, -1, -1):
+            nodes = [self.ite(args[position], nodes[prefix + 1], nodes[prefix]) for prefix in range(0, len(nodes), 2)]
+
+        return nodes[0]
+
+
+    def __len__(self):
+        return len(self._levels)
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from common.ast import *
+from common.gate import Gate
+from common.token import Token
+from common.token_type import TokenType
+from asm.checking.template import Template
+
+class Collapser(object):
+    """Collapses the circuits with few inputs into gates whose truth tables are computed when the program is assembled.
+
+    A circuit with k parameters computes, for each of the 2^k values of its arguments, the new values of the arguments it writes
+    and the value it returns. We evaluate each circuit over all those values at once: the value of a register becomes
+    a mask of 2^k bits, bit <v> holding the value of the register when the arguments packed with the first as most significant bit equal <v>.
+    Gates are then applied to masks with bitwise operations, one minterm of their truth table at a time.
+
+    Each call to a collapsed circuit is then assembled into a single application of a gate with the computed truth table,
+    the outputs being the arguments the circuit writes followed by the register its returned value is assigned to.
+    This only works when the circuit doesn't read or write registers other than its arguments and doesn't print.
+    When the same register is passed as many arguments, a write to one argument is seen by the others
+    so the circuit is evaluated again as a function of the distinct registers it is passed.
+
+    Attributes:
+        max_inputs(int): The maximum number of parameters of a collapsed circuit.
+        circuits(int): The number of circuits collapsed.
+        calls(int): The number of calls assembled into a single gate application.
+        gates(int): The number of gates created.
+    """
+    max_inputs      : int           = 12
+    circuits        : int           = 0
+    calls           : int           = 0
+    gates           : int           = 0
+
+    _gates          : dict          = {}
+    _functions      : dict          = {}
+    _variants       : dict          = {}
+    _collapsed      : set           = set([])
+
+    def __init__(self, max_inputs: int = 12):
+        self.max_inputs = max_inputs
+        self.circuits = 0
+        self.calls = 0
+        self.gates = 0
+
+        self._gates = {}
+        self._functions = {}
+        self._variants = {}
+        self._collapsed = set([])
+
+
+    def collapse(self, templates: dict, gates: dict):
+        """Evaluate the circuits of the given templates that can be collapsed.
+
+        Args:
+            templates(dict): The templates of the circuits by name, each circuit coming after the circuits it calls.
+            gates(dict): The gates of the virtual machine by name, where the gates created are added.
+        """
+        self._gates = gates
+
+        # Evaluating the circuits in call graph order means the circuits they call were evaluated before
+        for name, template in templates.items():
+            if name != "main":
+                self._function(template, tuple(range(len(template.circuit.params))))
+
+
+    def created(self):
+        """Returns the names of the gates created for the collapsed circuits."""
+        return set(gate.name for gate in self._variants.values())
+
+
+    def call(self, template: Template, args: list, lval: Token, used: bool, token: Token):
+        """Returns the gate expression a call to the given circuit is assembled into along with the tokens of the registers
+        it assigns, None if the call cannot be assembled into a single gate application.
+
+        Args:
+            template(Template): The template of the circuit called.
+            args(list): The tokens of the registers passed as arguments.
+            lval(Token): The token of the register the returned value is assigned to, None if there isn't one.
+            used(bool): Whether the returned value is used.
+            token(Token): The token of the circuit expression.
+        """
+        names = [arg.lexeme for arg in args]
+        pattern = aliasing(names)
+        function = self._function(template, pattern)
+        if function is None:
+            return None
+
+        # The inputs of the gate are the distinct registers passed as arguments
+        registers = [args[names.index(name)] for name in unique(names)]
+        written, returns, table = function
+
+        # The returned value is assigned after the arguments are written so it wins over an argument written to the same register
+        outputs = [index for index, variable in enumerate(written) if lval is None or registers[variable].lexeme != lval.lexeme]
+        targets = [registers[written[index]] for index in outputs]
+        if used == True and returns == True:
+            if lval is None and len(outputs) > 0:
+                return None
+
+            outputs.append(len(written))
+            if lval is not None:
+                targets.append(lval)
+
+        gate_expr = None
+        if len(outputs) > 0:
+            gate = self._variant(template.circuit.token.lexeme, pattern, len(registers), len(written) + (1 if returns == True else 0), table, outputs)
+            gate_expr = GateExpression(Token(TokenType.IDENTIFIER, gate.name, token.line, ""), tuple(RegisterExpression(register) for register in registers))
+
+        self.calls = self.calls + 1
+        return gate_expr, targets
+
+
+    def _function(self, template: Template, pattern: tuple):
+        """Returns the function computed by the given circuit when its arguments alias as given, None if it cannot be collapsed.
+
+        The pattern gives, for each parameter, the position of the first parameter passed the same register.
+        The circuit is then a function of the distinct registers it is passed and writes some of them.
+        """
+        key = (template.circuit.token.lexeme, pattern)
+        if key not in self._functions:
+            variables = len(set(pattern))
+            function = None
+            if variables <= self.max_inputs:
+                function = self._evaluate(template, [sorted(set(pattern)).index(position) for position in pattern], variables)
+
+            if function is not None and template.circuit.token.lexeme not in self._collapsed:
+                self._collapsed.add(template.circuit.token.lexeme)
+                self.circuits = len(self._collapsed)
+
+            self._functions[key] = function
+
+        return self._functions[key]
+
+
+    def _variant(self, name: str, pattern: tuple, inputs: int, size: int, table: tuple, outputs: list):
+        """Returns the gate for the given outputs of the given circuit, creating it if this is the first time we need it."""
+        key = (name, pattern, tuple(outputs))
+        if key in self._variants:
+            return self._variants[key]
+
+        # We keep the requested outputs of each packed output, the first output being the most significant bit
+        variant_table = []
+        for value in table:
+            packed = 0
+            for index in outputs:
+                packed = (packed << 1) | ((value >> (size - 1 - index)) & 1)
+            variant_table.append(packed)
+
+        index = len(self._variants)
+        gate_name = "_" + name + str(index)
+        while gate_name in self._gates:
+            index = index + 1
+            gate_name = "_" + name + str(index)
+
+        gate = Gate.from_table(gate_name, inputs, len(outputs), tuple(variant_table))
+        self._gates[gate_name] = gate
+        self._variants[key] = gate
+        self.gates = len(self._variants)
+
+        return gate
+
+
+    def _evaluate(self, template: Template, slots: list, size: int):
+        """Returns the variables the given circuit writes, whether it returns a value and its truth table
+        or None if the circuit cannot be collapsed.
+
+        Each parameter reads and writes the variable at the same position in the given slots.
+        The truth table gives, for each packed value of the variables, the packed new values of the variables written
+        followed by the value returned, if any.
+        """
+        mask = (1 << (1 << size)) - 1
+        inputs = [self._variable(position, size) for position in range(size)]
+        values = list(inputs)
+        for entry in template.stmts:
+            outputs = self._apply(entry, slots, values, mask)
+            if outputs is None:
+                return None
+
+            if entry[2] is not None:
+                if isinstance(entry[2], int) == False:
+                    return None
+
+                values[slots[entry[2]]] = outputs[-1]
+
+        returns = template.result is not None
+        result = []
+        if returns == True:
+            result = self._apply(template.result, slots, values, mask)
+            if result is None:
+                return None
+
+        written = [position for position in range(size) if values[position] != inputs[position]]
+        masks = [values[position] for position in written] + result[-1:]
+        table = []
+        for value in range(1 << size):
+            packed = 0
+            for output in masks:
+                packed = (packed << 1) | ((output >> value) & 1)
+            table.append(packed)
+
+        return written, returns, tuple(table)
+
+
+    def _apply(self, entry: tuple, slots: list, values: list, mask: int):
+        """Returns the masks of the outputs of the given entry, the value it moves or returns coming last,
+        or None if the entry cannot be evaluated.
+
+        The variables a called circuit writes are updated in the given values.
+        """
+        kind = entry[0]
+        if kind == Template.LITERAL:
+            return None
+
+        if kind == Template.MOVE:
+            if isinstance(entry[3], int) == False:
+                return None
+
+            return [values[slots[entry[3]]]]
+
+        operands = entry[4]
+        for operand in operands:
+            if isinstance(operand, int) == False:
+                return None
+
+        variables = [slots[operand] for operand in operands]
+        if kind == Template.GATE:
+            gate = self._gates.get(entry[3].lexeme)
+            if gate is None or gate.table is None or gate.inputs != len(operands) or (entry[2] is not None and gate.outputs != 1):
+                return None
+
+            return sliced(gate.table, gate.inputs, gate.outputs, [values[variable] for variable in variables], mask)
+
+        # The called circuit is a function of the distinct variables it is passed
+        distinct = unique(variables)
+        function = self._function(entry[3], aliasing(variables))
+        if function is None:
+            return None
+
+        written, returns, table = function
+        outputs = sliced(table, len(distinct), len(written) + (1 if returns == True else 0), [values[variable] for variable in distinct], mask)
+        for index, variable in enumerate(written):
+            values[distinct[variable]] = outputs[index]
+
+        return outputs
+
+
+    def _variable(self, position: int, size: int):
+        """Returns the mask of the variable at the given position among the given number of variables."""
+        variable = 0
+        for value in range(1 << size):
+            if (value >> (size - 1 - position)) & 1 == 1:
+                variable = variable | (1 << value)
+
+        return variable
+
+
+def aliasing(names: list):
+    """Returns, for each of the given names, the position of its first occurrence."""
+    return tuple(names.index(name) for name in names)
+
+
+def unique(names: list):
+    """Returns the given names without duplicates, in the order in which they first appear."""
+    result = []
+    for name in names:
+        if name not in result:
+            result.append(name)
+
+    return result
+
+
+def sliced(table: tuple, inputs: int, outputs: int, args: list, mask: int):
+    """Returns the masks of the outputs of the given truth table applied to the given masks.
+
+    Each packed input whose packed output isn't zero is a minterm: the conjunction of the arguments or their negations.
+    Each output is the disjunction of the minterms for which it is 1.
+    """
+    results = [0] * outputs
+    for value, packed in enumerate(table):
+        if packed == 0:
+            continue
+
+        term = mask
+        for position, arg in enumerate(args):
+            if (value >> (inputs - 1 - position)) & 1 == 1:
+                term = term & arg
+            else:
+                term = term & ~arg
+
+        for index in range(outputs):
+            if (packed >> (outputs - 1 - index)) & 1 == 1:
+                results[index] = results[index] | term
+
+    return results
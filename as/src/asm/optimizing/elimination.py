@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from asm.optimizing.ssa import Function, Instruction, Definition
+
+class DeadCodeEliminator(object):
+    """Removes the assignments of the main circuit whose result is never observed.
+
+    Folding circuits copies every statement of the callees, including assignments to registers that are
+    overwritten before anything reads them, as in <cr0 = and(cr0, cr0);> followed by <cr0 = cr1;>.
+    We walk the instructions backwards and remove those whose definitions have no use left,
+    which in turn removes the uses of their operands.
+
+    A register is observed when it is printed and, unless told otherwise, when the program ends
+    since the final state of the registers is the result of the program.
+
+    Attributes:
+        function(Function): The main circuit, with all the other circuits folded into it, in static single assignment form.
+        final_state(bool): Whether the final value of every register is observed.
+        before(int): The number of statements before elimination.
+        after(int): The number of statements after elimination.
+        applications(int): The number of gate applications removed.
+    """
+    function        : Function      = None
+    final_state     : bool          = True
+    before          : int           = 0
+    after           : int           = 0
+    applications    : int           = 0
+
+    def __init__(self, function: Function, final_state: bool = True):
+        self.function = function
+        self.final_state = final_state
+        self.before = 0
+        self.after = 0
+        self.applications = 0
+
+
+    def eliminate(self):
+        """Remove the dead assignments of the main circuit and return the number of statements removed."""
+        function = self.function
+        instructions = list(function.instructions)
+        for instruction in reversed(instructions):
+            # A move of a register into itself does nothing whether the register is observed or not
+            if instruction.kind == Instruction.MOVE and instruction.operands[0].symbol == instruction.results[0].symbol:
+                function.forward(instruction.results[0], instruction.operands[0])
+                continue
+
+            if len(instruction.results) > 0 and all(self._isDead(result) for result in instruction.results):
+                if instruction.kind == Instruction.GATE:
+                    self.applications = self.applications + 1
+                function.remove(instruction)
+
+        function.compact()
+        self.before = len(instructions)
+        self.after = len(function.instructions)
+
+        return self.before - self.after
+
+
+    def _isDead(self, definition: Definition):
+        """Returns true if the given definition is never read and isn't observed at the end of the program."""
+        if len(definition.uses) > 0:
+            return False
+
+        return self.final_state == False or self.function.outputs.get(definition.symbol) is not definition
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from asm.optimizing.bdd import BDD
+from asm.optimizing.statements import *
+
+class EquivalenceChecker(object):
+    """Proves that two main circuits produce the same observations for every initial value of the registers.
+
+    Both circuits are evaluated symbolically over the same variables, one per register read before being written,
+    so that the value of each register is a binary decision diagram. Since the diagrams are canonical,
+    the circuits are equivalent if they apply the same side effect gates such as print to the same values
+    and, unless told otherwise, leave the same values in the registers. Otherwise, the diagram of the difference
+    between two values gives initial values of the registers that tell the circuits apart.
+
+    Attributes:
+        final_state(bool): Whether the final value of every register is observed.
+        reason(str): Why the circuits could not be proved equivalent, empty if they were.
+        witness(dict): The initial value of each register for which the circuits differ, None if there is no such value.
+    """
+    final_state     : bool          = True
+    reason          : str           = ""
+    witness         : dict          = None
+
+    _gates          : dict          = {}
+    _bdd            : BDD           = None
+    _initial        : dict          = {}
+
+    def __init__(self, gates: dict, final_state: bool = True):
+        self.final_state = final_state
+        self.reason = ""
+        self.witness = None
+
+        self._gates = gates
+        self._bdd = BDD()
+        self._initial = {}
+
+
+    def prove(self, first: list, second: list):
+        """Returns true if the given statements of two main circuits are equivalent, false if they are not
+        and None if they could not be compared because they apply a gate that isn't deterministic."""
+        self.reason = ""
+        self.witness = None
+
+        first_values, first_effects = self._evaluate(first)
+        second_values, second_effects = self._evaluate(second)
+        if first_values is None or second_values is None:
+            return None
+
+        if len(first_effects) != len(second_effects):
+            self.reason = "the circuits apply <" + str(len(first_effects)) + "> and <" + str(len(second_effects)) + "> side effect gates"
+            return False
+
+        for index, (first_effect, second_effect) in enumerate(zip(first_effects, second_effects)):
+            if first_effect[0] != second_effect[0] or len(first_effect[1]) != len(second_effect[1]):
+                self.reason = "side effect <" + str(index) + "> applies <" + first_effect[0] + "> in one circuit and <" + second_effect[0] + "> in the other"
+                return False
+
+            for first_value, second_value in zip(first_effect[1], second_effect[1]):
+                if first_value != second_value:
+                    self.reason = "side effect <" + str(index) + "> <" + first_effect[0] + "> is applied to different values"
+                    self.witness = self._witness(first_value, second_value)
+                    return False
+
+        if self.final_state == True:
+            for name in sorted(set(first_values.keys()) | set(second_values.keys())):
+                first_value = self._value(first_values, name)
+                second_value = self._value(second_values, name)
+                if first_value != second_value:
+                    self.reason = "register <" + name + "> ends with different values"
+                    self.witness = self._witness(first_value, second_value)
+                    return False
+
+        return True
+
+
+    def _evaluate(self, statements: list):
+        """Returns the final value of each register the given statements write and, for each side effect gate they apply,
+        its name and the values it is applied to. Returns None for both if a gate isn't deterministic."""
+        values = {}
+        effects = []
+        for statement in statements:
+            # The applications of a vector application all read their registers before any of them writes
+            group = statement.stmts if isinstance(statement, VectorStatement) else [statement]
+            assignments = []
+            for member in group:
+                expr = member.expr
+                if isinstance(expr, GateExpression):
+                    effects.append((expr.token.lexeme, [self._value(values, name) for name in registers(expr)]))
+                    continue
+
+                outputs = self._outputs(expr, values)
+                if outputs is None:
+                    return None, None
+
+                lvals = expr.lvals if isinstance(expr, MultipleAssignmentExpression) else [expr.lval]
+                assignments.extend(zip(lvals, outputs))
+
+            for lval, value in assignments:
+                values[lval.token.lexeme] = value
+
+        return values, effects
+
+
+    def _outputs(self, expr: Expression, values: dict):
+        """Returns the values the given assignment moves into its registers, None if a gate isn't deterministic."""
+        rval = expr.rval
+        if isinstance(rval, LiteralExpression):
+            bit = literal(rval)
+            if bit is None:
+                self.reason = "the literal <" + rval.token.lexeme + "> is not a single bit"
+                return None
+
+            return [self._bdd.constant(bit)]
+
+        if isinstance(rval, RegisterExpression):
+            return [self._value(values, rval.token.lexeme)]
+
+        count = len(expr.lvals) if isinstance(expr, MultipleAssignmentExpression) else 1
+        gate = self._gates.get(rval.token.lexeme)
+        if gate is None or gate.table is None or gate.inputs != len(rval.args) or gate.outputs != count:
+            self.reason = "the gate <" + rval.token.lexeme + "> is not deterministic"
+            return None
+
+        return self._bdd.apply(gate, [self._value(values, name) for name in registers(rval)])
+
+
+    def _value(self, values: dict, name: str):
+        """Returns the value of the given register, its initial value if it wasn't written."""
+        if name in values:
+            return values[name]
+
+        return self._variable(name)
+
+
+    def _variable(self, name: str):
+        """Returns the variable holding the initial value of the given register."""
+        if name not in self._initial:
+            self._initial[name] = self._bdd.variable()
+
+        return self._initial[name]
+
+
+    def _witness(self, first: int, second: int):
+        """Returns the initial value of each register for which the given values differ."""
+        # Each variable was created for a register so registers and variables come in the same order
+        values = self._bdd.witness(self._bdd.differ(first, second))
+        return dict((name, values[position]) for position, name in enumerate(self._initial))
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from common.ast import LiteralExpression
+from common.gate import Gate
+from common.token import Token
+from common.token_type import TokenType
+from asm.optimizing.ssa import Function, Instruction
+from asm.optimizing.statements import literal, pack, unpack, unique
+
+class ConstantFolder(object):
+    """Evaluates at assembly time the gate applications of the main circuit whose inputs are known.
+
+    Registers start with unknown values but a literal moved into a register is a known definition,
+    as is the move of a known definition. A gate applied to definitions whose values are all known is evaluated
+    using its truth table and replaced by the move of the resulting literal, which turns an APPLY instruction into a MOV instruction.
+    A gate with many outputs becomes the move of a literal into each of its outputs.
+    Likewise, a move from a register whose value is known becomes the move of that value.
+
+    The gates of collapsed circuits are specific to the program, so when only some of their inputs are known,
+    the known inputs are folded into their truth table: the application becomes that of a new gate over the unknown inputs alone,
+    and the outputs that no longer depend on any input become moves of literals.
+    The gates of the virtual machine are only folded when all their inputs are known, so that no gate is created for them.
+
+    Attributes:
+        function(Function): The main circuit, with all the other circuits folded into it, in static single assignment form.
+        before(int): The number of gate applications before folding.
+        after(int): The number of gate applications after folding.
+        specialized(int): The number of gates created by folding known inputs into the truth table of a collapsed gate.
+    """
+    function        : Function      = None
+    before          : int           = 0
+    after           : int           = 0
+    specialized     : int           = 0
+
+    _gates          : dict          = {}
+    _operators      : dict          = {}
+    _collapsed      : set           = set([])
+    _specialized    : dict          = {}
+
+    def __init__(self, function: Function, gates: dict, collapsed: set = None):
+        """
+        Args:
+            gates(dict): The gates of the program by name, where the gates created are added.
+            collapsed(set): The names of the gates created for collapsed circuits.
+        """
+        self.function = function
+        self.before = 0
+        self.after = 0
+        self.specialized = 0
+
+        self._gates = gates
+        self._operators = function.gates(gates)
+        self._collapsed = set([]) if collapsed is None else set(collapsed)
+        self._specialized = {}
+
+
+    def fold(self):
+        """Fold the gate applications of the main circuit with known inputs and return the number of gate applications removed."""
+        # The value of each definition whose value is known
+        values = {}
+        for instruction in self.function.instructions:
+            if instruction.kind == Instruction.EFFECT:
+                continue
+
+            if instruction.kind == Instruction.GATE:
+                self.before = self.before + 1
+                if self._fold(instruction, values) == False:
+                    self.after = self.after + 1
+                continue
+
+            value = self._evaluate(instruction, values)
+            if value is None:
+                continue
+
+            values[instruction.results[0]] = value
+            if instruction.kind != Instruction.LITERAL:
+                self.function.make_literal(instruction, value)
+
+        self.function.compact()
+        return self.before - self.after
+
+
+    def _evaluate(self, instruction: Instruction, values: dict):
+        """Returns the value the given literal or move moves into its single result if it is known, None otherwise."""
+        if instruction.kind == Instruction.LITERAL:
+            return literal(LiteralExpression(instruction.operator))
+
+        return values.get(instruction.operands[0])
+
+
+    def _fold(self, instruction: Instruction, values: dict):
+        """Fold the known inputs of the given gate application and return whether the application is gone.
+
+        The outputs known once the inputs are folded are added to the given values.
+        """
+        gate = self._operators.get(instruction.operator.symbol)
+        if gate is None or gate.table is None or gate.inputs != len(instruction.operands) or gate.outputs != len(instruction.results):
+            return False
+
+        unknown = unique([operand for operand in instruction.operands if operand not in values])
+        if len(unknown) > 0 and gate.name not in self._collapsed:
+            return False
+
+        # The packed outputs of the gate for each value of its unknown inputs
+        inputs = dict((operand, values[operand]) for operand in instruction.operands if operand in values)
+        outputs = []
+        for value in range(1 << len(unknown)):
+            inputs.update(unpack(value, unknown))
+            outputs.append(gate.apply(pack(inputs, instruction.operands)))
+
+        # An output is known when it is the same whatever the unknown inputs
+        known = {}
+        for index, result in enumerate(instruction.results):
+            bits = set((output >> (gate.outputs - 1 - index)) & 1 for output in outputs)
+            if len(bits) == 1:
+                known[result] = bits.pop()
+
+        if len(known) == 0 and len(unknown) == len(instruction.operands):
+            return False
+
+        values.update(known)
+        kept = [index for index, result in enumerate(instruction.results) if result not in known]
+        if len(kept) > 0:
+            specialized = self._specialize(gate, instruction, unknown, kept, outputs)
+            self.function.make_gate(instruction, Token(TokenType.IDENTIFIER, specialized.name, instruction.operator.line, "", self.function.symbols.intern(specialized.name)), unknown)
+
+        self.function.make_literals(instruction, known)
+        return len(kept) == 0
+
+
+    def _specialize(self, gate: Gate, instruction: Instruction, unknown: list, kept: list, outputs: list):
+        """Returns the gate computing the kept outputs of the given gate from its unknown inputs alone, given its packed outputs
+        for each value of those inputs, creating it if this is the first time we need it."""
+        table = []
+        for output in outputs:
+            packed = 0
+            for index in kept:
+                packed = (packed << 1) | ((output >> (gate.outputs - 1 - index)) & 1)
+            table.append(packed)
+
+        key = (len(unknown), len(kept), tuple(table))
+        if key in self._specialized:
+            return self._specialized[key]
+
+        index = len(self._specialized)
+        name = gate.name + "_" + str(index)
+        while name in self._gates:
+            index = index + 1
+            name = gate.name + "_" + str(index)
+
+        specialized = Gate.from_table(name, len(unknown), len(kept), tuple(table))
+        self._gates[name] = specialized
+        self._operators[self.function.symbols.intern(name)] = specialized
+        self._specialized[key] = specialized
+        self._collapsed.add(name)
+        self.specialized = len(self._specialized)
+
+        return specialized
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from common.gate import Gate
+from common.token import Token
+from common.token_type import TokenType
+from asm.optimizing.ssa import Function, Instruction
+from asm.optimizing.statements import pack, unpack, unique
+
+class Fuser(object):
+    """Fuses chains of gate applications in the main circuit into applications of composite gates.
+
+    Folding circuits produces long chains where a gate writes a register that is read right away by the next gate
+    and never read again, as in <cr0 = and(cr0, cr0); cr0 = not(cr0);>.
+    Such a pair is replaced by a single application of a composite gate whose truth table is precomputed
+    from those of the two gates, which turns two APPLY instructions into one.
+    The composite gates are added to the gates the program is assembled with so they make it into the package.
+
+    Since the final value of every register is observable, the output of a gate is only fused away
+    if the next gate is its only use and it isn't the final value of its register.
+    The composite gate is applied where the last gate of the chain was, to the definitions the chain reads:
+    the chain removed, nothing else writes their registers in between, so their registers still hold them.
+
+    Attributes:
+        function(Function): The main circuit, with all the other circuits folded into it, in static single assignment form.
+        max_inputs(int): The maximum number of inputs of a composite gate, its truth table having 2^max_inputs entries.
+        before(int): The number of gate applications before fusion.
+        after(int): The number of gate applications after fusion.
+        composites(int): The number of composite gates created.
+    """
+    function        : Function      = None
+    max_inputs      : int           = 8
+    before          : int           = 0
+    after           : int           = 0
+    composites      : int           = 0
+
+    _gates          : dict          = {}
+    _operators      : dict          = {}
+    _composites     : dict          = {}
+
+    def __init__(self, function: Function, gates: dict, max_inputs: int = 8):
+        self.function = function
+        self.max_inputs = max_inputs
+        self.before = 0
+        self.after = 0
+        self.composites = 0
+
+        self._gates = gates
+        self._operators = function.gates(gates)
+        self._composites = {}
+
+
+    def fuse(self):
+        """Fuse the chains of gate applications of the main circuit and return the number of gate applications removed."""
+        function = self.function
+        instructions = [instruction for instruction in function.instructions if instruction.removed == False]
+        applications = [self._application(instruction) for instruction in instructions]
+
+        removed = 0
+        index = 0
+        while index < len(instructions):
+            if applications[index] is None:
+                index = index + 1
+                continue
+
+            # We grow the chain as long as the next instruction is a gate application that consumes the output of the chain
+            chain = self._chain(applications[index])
+            end = index + 1
+            while end < len(instructions) and applications[end] is not None:
+                fused = self._fuse(chain, applications[end])
+                if fused is None:
+                    break
+
+                chain = fused
+                end = end + 1
+
+            if end > index + 1:
+                inputs, table, output = chain
+                last = instructions[end - 1]
+                gate = self._composite(inputs, table)
+                function.make_gate(last, Token(TokenType.IDENTIFIER, gate.name, last.operator.line, "", function.symbols.intern(gate.name)), inputs)
+
+                # Each output of the chain was only read by the gate after it, so removing the chain backwards
+                # leaves every removed output unused
+                for instruction in reversed(instructions[index : end - 1]):
+                    function.remove(instruction)
+                removed = removed + end - 1 - index
+
+            index = end
+
+        function.compact()
+        self.before = len([app for app in applications if app is not None])
+        self.after = self.before - removed
+
+        return self.before - self.after
+
+
+    def _application(self, instruction: Instruction):
+        """Returns the gate, the input definitions and the output definition of the given instruction
+        if it applies a deterministic single output gate, None otherwise."""
+        if instruction.kind != Instruction.GATE or len(instruction.results) != 1:
+            return None
+
+        gate = self._operators.get(instruction.operator.symbol)
+        if gate is None or gate.table is None or gate.outputs != 1 or gate.inputs != len(instruction.operands):
+            return None
+
+        return gate, list(instruction.operands), instruction.results[0]
+
+
+    def _chain(self, app: tuple):
+        """Returns the inputs, truth table and output of a chain made of the given gate application alone.
+
+        The inputs of a chain are distinct definitions so the truth table is rebuilt over those.
+        """
+        gate, inputs, output = app
+        names = unique(inputs)
+        table = tuple(gate.apply(pack(unpack(value, names), inputs)) for value in range(1 << len(names)))
+        return names, table, output
+
+
+    def _fuse(self, chain: tuple, app: tuple):
+        """Returns the chain extended with the given gate application or None if it cannot be fused into the chain."""
+        inputs, table, output = chain
+        gate, app_inputs, app_output = app
+
+        # The gate application must consume the output of the chain and be the only one to do so
+        if output not in app_inputs:
+            return None
+
+        if any(use is not app_output.instruction for use in output.uses) or self.function.outputs.get(output.symbol) is output:
+            return None
+
+        names = unique(inputs + [name for name in app_inputs if name != output])
+        if len(names) > self.max_inputs:
+            return None
+
+        new_table = []
+        for value in range(1 << len(names)):
+            values = unpack(value, names)
+            chained = table[pack(values, inputs)]
+            values[output] = chained
+            new_table.append(gate.apply(pack(values, app_inputs)))
+
+        return names, tuple(new_table), app_output
+
+
+    def _composite(self, inputs: list, table: tuple):
+        """Returns the composite gate with the given truth table, creating it if this is the first time we need it."""
+        key = (len(inputs), table)
+        if key in self._composites:
+            return self._composites[key]
+
+        index = len(self._composites)
+        name = "_fused" + str(index)
+        while name in self._gates:
+            index = index + 1
+            name = "_fused" + str(index)
+
+        gate = Gate.from_table(name, len(inputs), 1, table)
+        self._gates[name] = gate
+        self._operators[self.function.symbols.intern(name)] = gate
+        self._composites[key] = gate
+        self.composites = len(self._composites)
+
+        return gate
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from common.ast import LiteralExpression
+from asm.optimizing.bdd import BDD
+from asm.optimizing.ssa import Function, Instruction, Definition
+from asm.optimizing.statements import literal
+
+class LogicMinimizer(object):
+    """Removes the gate applications of the main circuit whose result the registers already hold, whatever their initial values.
+
+    The value of each definition is a boolean function of the initial values of the registers, represented by a binary decision diagram.
+    Since the diagrams are canonical, a gate application computing a constant is replaced by the move of a literal
+    and one computing a function a register already holds is replaced by a move from that register, or removed if it is
+    the register assigned. This finds the redundant logic that reusing identical applications cannot,
+    such as <not(not(cr0))> being <cr0> or <and(cr0, not(cr0))> being <0b>.
+
+    The value of a gate that isn't deterministic is unknown: it becomes a new variable.
+    So does any value whose diagram would make the total number of nodes exceed the given limit,
+    which keeps the pass fast on circuits whose diagrams blow up, such as multipliers, at the cost of missing some redundancies.
+
+    Attributes:
+        function(Function): The main circuit, with all the other circuits folded into it, in static single assignment form.
+        max_nodes(int): The number of nodes past which new values become variables.
+        before(int): The number of gate applications before minimization.
+        after(int): The number of gate applications after minimization.
+    """
+    function        : Function      = None
+    max_nodes       : int           = 1000000
+    before          : int           = 0
+    after           : int           = 0
+
+    _gates          : dict          = {}
+    _bdd            : BDD           = None
+    _values         : dict          = {}
+    _holders        : dict          = {}
+
+    def __init__(self, function: Function, gates: dict, max_nodes: int = 1000000):
+        self.function = function
+        self.max_nodes = max_nodes
+        self.before = 0
+        self.after = 0
+
+        self._gates = function.gates(gates)
+        self._bdd = BDD()
+        self._values = {}
+        self._holders = {}
+
+
+    def minimize(self):
+        """Remove the redundant gate applications of the main circuit and return the number of gate applications removed."""
+        function = self.function
+        for instruction in list(function.instructions):
+            if instruction.kind == Instruction.EFFECT:
+                continue
+
+            if instruction.kind == Instruction.GATE:
+                self.before = self.before + 1
+
+            # The application of a gate with many outputs is kept as is but its outputs are still known
+            if len(instruction.results) > 1:
+                self.after = self.after + 1
+                for result, value in zip(instruction.results, self._outputs(instruction)):
+                    self._assign(result, value)
+                continue
+
+            result = instruction.results[0]
+            if instruction.kind == Instruction.LITERAL:
+                bit = literal(LiteralExpression(instruction.operator))
+                value = self._bdd.variable() if bit is None else self._bdd.constant(bit)
+            elif instruction.kind == Instruction.MOVE:
+                value = self._value(instruction.operands[0])
+            else:
+                value = self._outputs(instruction)[0]
+
+            # The register already holds the value so the instruction does nothing
+            if self._value(result.previous) == value:
+                function.forward(result, result.previous)
+                continue
+
+            holders = [holder for holder in self._holders.get(value, []) if function.available(holder, instruction)]
+            if instruction.kind == Instruction.GATE:
+                if value == BDD.FALSE or value == BDD.TRUE:
+                    function.make_literal(instruction, value)
+                elif len(holders) > 0:
+                    function.make_move(instruction, holders[0])
+                else:
+                    self.after = self.after + 1
+
+            self._assign(result, value)
+
+        function.compact()
+
+        return self.before - self.after
+
+
+    def _outputs(self, instruction: Instruction):
+        """Returns the values of the outputs of the given gate application."""
+        count = len(instruction.results)
+        gate = self._gates.get(instruction.operator.symbol)
+        if gate is None or gate.table is None or gate.inputs != len(instruction.operands) or gate.outputs != count:
+            return [self._bdd.variable() for output in range(count)]
+
+        outputs = self._bdd.apply(gate, [self._value(operand) for operand in instruction.operands])
+        if len(self._bdd) > self.max_nodes:
+            return [self._bdd.variable() for output in range(count)]
+
+        return outputs
+
+
+    def _assign(self, definition: Definition, value: int):
+        """Record that the given definition holds the given value."""
+        self._values[definition] = value
+        self._holders.setdefault(value, []).append(definition)
+
+
+    def _value(self, definition: Definition):
+        """Returns the value held by the given definition, a new variable if it is an initial value that wasn't read yet."""
+        if definition not in self._values:
+            self._assign(definition, self._bdd.variable())
+
+        return self._values[definition]
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from common.ast import CircuitDeclaration, VectorStatement
+from asm.optimizing.ssa import Function, Instruction
+from asm.optimizing.statements import replace_statements
+
+class Scheduler(object):
+    """Groups the independent applications of the same gate in the main circuit into vector applications.
+
+    Once circuits are folded, many instructions don't depend on each other, like the two <nand> calls at the start of <or>.
+    An instruction depends on the instructions defining the values it reads, on the instruction defining the value its results
+    replace in their registers as well as on the instructions reading that value, and, for side effect gates such as print,
+    on the side effect before it so that prints stay in order.
+    We place each instruction on the level after the last level it depends on, so the instructions of a level are independent
+    and the levels in order make a valid schedule. The applications of the same gate on a level then become
+    a single vector APPLY instruction instead of one APPLY instruction each.
+
+    Vector applications only exist as statements, so scheduling is the last pass: it lifts the function back
+    to the statements of the main circuit, level by level, grouping the applications of each level into vector statements.
+
+    Attributes:
+        function(Function): The main circuit, with all the other circuits folded into it, in static single assignment form.
+        circuit(CircuitDeclaration): The main circuit whose statements are replaced by the scheduled ones.
+        max_tuples(int): The maximum number of applications in a vector application, bounded by the size of its count byte.
+        before(int): The number of APPLY instructions before scheduling.
+        after(int): The number of APPLY and vector APPLY instructions after scheduling.
+        levels(int): The number of levels of the schedule.
+        vectors(int): The number of vector applications.
+    """
+    function        : Function              = None
+    circuit         : CircuitDeclaration    = None
+    max_tuples      : int                   = 255
+    before          : int                   = 0
+    after           : int                   = 0
+    levels          : int                   = 0
+    vectors         : int                   = 0
+
+    def __init__(self, function: Function, circuit: CircuitDeclaration, max_tuples: int = 255):
+        self.function = function
+        self.circuit = circuit
+        self.max_tuples = max_tuples
+        self.before = 0
+        self.after = 0
+        self.levels = 0
+        self.vectors = 0
+
+
+    def schedule(self):
+        """Replace the statements of the main circuit by its instructions level by level, grouping the applications of the same gate
+        on each level, and return the number of instructions saved."""
+        instructions = [instruction for instruction in self.function.instructions if instruction.removed == False]
+
+        # The instructions of each level in their original order
+        levels = []
+        for instruction, level in zip(instructions, self._levels(instructions)):
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(instruction)
+
+        new_instructions = []
+        for level in levels:
+            groups = {}
+            for instruction in level:
+                symbol = self._gate(instruction)
+                if symbol is None:
+                    new_instructions.append(instruction)
+                    continue
+
+                self.before = self.before + 1
+                if symbol not in groups:
+                    groups[symbol] = []
+                    new_instructions.append(groups[symbol])
+                groups[symbol].append(instruction)
+
+        # Each group of applications is replaced by vector applications of at most the maximum number of applications
+        scheduled = []
+        for instruction in new_instructions:
+            if isinstance(instruction, list) == False:
+                scheduled.append(self.function.statement(instruction))
+                continue
+
+            for start in range(0, len(instruction), self.max_tuples):
+                chunk = [self.function.statement(application) for application in instruction[start : start + self.max_tuples]]
+                if len(chunk) == 1:
+                    scheduled.append(chunk[0])
+                else:
+                    scheduled.append(VectorStatement(chunk[0].expr.rval.token, chunk))
+                    self.vectors = self.vectors + 1
+                self.after = self.after + 1
+
+        self.levels = len(levels)
+        replace_statements(self.circuit, scheduled)
+
+        return self.before - self.after
+
+
+    def _levels(self, instructions: list):
+        """Returns the level of each of the given instructions, right after the last level of the instructions it depends on."""
+        # The level of each instruction and the last level reading each definition
+        placed = {}
+        read = {}
+        effect = -1
+
+        levels = []
+        for instruction in instructions:
+            level = 0
+            for operand in instruction.operands:
+                if operand.instruction is not None:
+                    level = max(level, placed[operand.instruction] + 1)
+            for result in instruction.results:
+                previous = result.previous
+                if previous.instruction is not None:
+                    level = max(level, placed[previous.instruction] + 1)
+                level = max(level, read.get(previous, -1) + 1)
+
+            if instruction.kind == Instruction.EFFECT:
+                level = max(level, effect + 1)
+                effect = level
+
+            for operand in instruction.operands:
+                read[operand] = max(read.get(operand, -1), level)
+
+            placed[instruction] = level
+            levels.append(level)
+
+        return levels
+
+
+    def _gate(self, instruction: Instruction):
+        """Returns the symbol of the gate the given instruction applies to assign registers, None if it doesn't."""
+        if instruction.kind == Instruction.GATE:
+            return instruction.operator.symbol
+
+        return None
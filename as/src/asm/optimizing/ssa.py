@@ -0,0 +1,437 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+"""The static single assignment form of the main circuit the optimizing passes work on.
+
+Once circuits are folded, the main circuit is straight-line code so every assignment simply defines a new version
+of the register it assigns and no join of versions is ever needed. Each instruction points to the definitions
+it reads and each definition keeps the instructions that use it, so passes follow use-def and def-use chains
+instead of tracking the current value of every register by name.
+
+Registers and gates are told apart by the symbol of their token, the id their name was interned to when it was lexed,
+rather than by name. Definitions keep the symbol and the name of the register holding them. Lifting the function back to statements
+writes each definition to that register, so a pass may only make an instruction read a definition
+that is still held by its register at that instruction, which <Function.available> tells.
+
+Every optimizing pass, from constant folding to fusion and register allocation, works on this form, the main circuit
+being lowered once after checking. It is lifted back to statements once at the end, by the scheduler, which groups
+applications into vector statements that have no instruction of their own, or as is without scheduling.
+The assembler has no bytecode emitter yet: the lifted main circuit is what it prints and what the equivalence checker compares.
+"""
+
+from common.ast import *
+from common.token import Token
+from common.token_type import TokenType
+from common.symbols import SymbolTable
+
+
+class Definition(object):
+    """A value held by a register: its initial value or the value an instruction assigns to it.
+
+    Attributes:
+        register(str): The name of the register holding the value.
+        symbol(int): The symbol of the register holding the value.
+        token(Token): A token of the register, whose type and error the statements reading or writing it reuse.
+        version(int): 0 for the initial value of the register, then one more for each assignment to it.
+        instruction(Instruction): The instruction assigning the value, None for the initial value.
+        uses(list): The instructions reading the value, once for each operand reading it.
+        previous(Definition): The value the register held before, None for the initial value.
+        next(Definition): The value the register holds next, None if the value is never overwritten.
+    """
+    register        : str           = ""
+    symbol          : int           = -1
+    token           : Token         = None
+    version         : int           = 0
+    instruction                     = None
+    uses            : list          = []
+    previous                        = None
+    next                            = None
+
+    def __init__(self, register: str, symbol: int, token: Token, version: int, instruction):
+        self.register = register
+        self.symbol = symbol
+        self.token = token
+        self.version = version
+        self.instruction = instruction
+        self.uses = []
+        self.previous = None
+        self.next = None
+
+
+    def __repr__(self):
+        return "{0!s}.{1!s}".format(self.register, self.version)
+
+    __str__ = __repr__
+
+
+class Instruction(object):
+    """A statement of the main circuit in static single assignment form.
+
+    The kind of an instruction tells what it does with its operands and results:
+        - GATE:     the results are the outputs of the gate applied to the operands
+        - MOVE:     the single result is the single operand
+        - LITERAL:  the single result is the literal, there are no operands
+        - EFFECT:   the gate is applied to the operands for its side effect, such as print, there are no results
+
+    Attributes:
+        kind(int): What the instruction does.
+        token(Token): The token of the assignment, the token of the gate for side effects.
+        operator(Token): The token of the gate or of the literal, None for moves. The token of a gate always has a symbol.
+        operands(list): The definitions the instruction reads, in order.
+        results(list): The definitions the instruction assigns, in order.
+        position(int): The position of the instruction in its function.
+        removed(bool): Whether the instruction was removed from its function.
+    """
+    GATE            = 0
+    MOVE            = 1
+    LITERAL         = 2
+    EFFECT          = 3
+
+    kind            : int           = 0
+    token           : Token         = None
+    operator        : Token         = None
+    operands        : list          = []
+    results         : list          = []
+    position        : int           = 0
+    removed         : bool          = False
+
+    def __init__(self, kind: int, token: Token, operator: Token, position: int):
+        self.kind = kind
+        self.token = token
+        self.operator = operator
+        self.operands = []
+        self.results = []
+        self.position = position
+        self.removed = False
+
+
+    def __repr__(self):
+        rep = ", ".join(str(result) for result in self.results)
+        if len(self.results) > 0:
+            rep = rep + " = "
+
+        if self.kind == Instruction.LITERAL:
+            return rep + self.operator.lexeme
+
+        if self.kind == Instruction.MOVE:
+            return rep + str(self.operands[0])
+
+        return rep + "{0!s}({1!s})".format(self.operator.lexeme, ", ".join(str(operand) for operand in self.operands))
+
+    __str__ = __repr__
+
+
+class Function(object):
+    """The main circuit lowered to static single assignment form.
+
+    Attributes:
+        symbols(SymbolTable): The table the identifiers of the circuit were interned in when they were lexed.
+        instructions(list): The instructions of the circuit, in order.
+        inputs(dict): The initial value of each register the circuit mentions, by register symbol.
+        outputs(dict): The final value of each register the circuit mentions, by register symbol.
+    """
+    symbols         : SymbolTable   = None
+    instructions    : list          = []
+    inputs          : dict          = {}
+    outputs         : dict          = {}
+
+    # The literals split off each instruction, which take their place right after it once the instructions are compacted
+    _literals       : dict          = {}
+
+    def __init__(self, circuit: CircuitDeclaration, symbols: SymbolTable):
+        """
+        Raises:
+            ValueError: If the circuit holds a statement that isn't one of the forms found once circuits are folded.
+        """
+        self.symbols = symbols
+        self.instructions = []
+        self.inputs = {}
+        self.outputs = {}
+        self._literals = {}
+
+        for statement in circuit.stmts:
+            self._lower(statement)
+
+
+    def lift(self, circuit: CircuitDeclaration):
+        """Replace the statements of the given circuit by the instructions of the function, each definition written to its register."""
+        circuit.stmts = CircuitStatements()
+        for instruction in self.instructions:
+            if instruction.removed == False:
+                circuit.add_statement(self.statement(instruction))
+
+
+    def statement(self, instruction: Instruction):
+        """Returns the statement of the given instruction, each definition written as its register."""
+        line = instruction.token.line
+        def register(definition: Definition):
+            return RegisterExpression(Token(definition.token.token_type, definition.register, line, definition.token.error, definition.symbol))
+
+        if instruction.kind == Instruction.LITERAL:
+            rval = LiteralExpression(instruction.operator)
+        elif instruction.kind == Instruction.MOVE:
+            rval = register(instruction.operands[0])
+        else:
+            rval = GateExpression(instruction.operator, tuple(register(operand) for operand in instruction.operands))
+
+        if instruction.kind == Instruction.EFFECT:
+            return ExpressionStatement(rval)
+
+        if len(instruction.results) > 1:
+            return ExpressionStatement(MultipleAssignmentExpression(instruction.token, [register(result) for result in instruction.results], rval))
+
+        return ExpressionStatement(AssignmentExpression(instruction.token, register(instruction.results[0]), rval))
+
+
+    def available(self, definition: Definition, instruction: Instruction):
+        """Returns true if the register of the given definition holds it when the given instruction reads its operands."""
+        if definition.instruction is not None and definition.instruction.position >= instruction.position:
+            return False
+
+        return definition.next is None or definition.next.instruction.position >= instruction.position
+
+
+    def use(self, instruction: Instruction, index: int, definition: Definition):
+        """Make the given instruction read the given definition as the operand at the given index."""
+        instruction.operands[index].uses.remove(instruction)
+        instruction.operands[index] = definition
+        definition.uses.append(instruction)
+
+
+    def forward(self, definition: Definition, replacement: Definition):
+        """Make everything reading the given definition read the given replacement, a value of the same register,
+        then remove the instruction assigning the definition if it doesn't assign anything else that is used."""
+        for instruction in definition.uses:
+            instruction.operands = [replacement if operand is definition else operand for operand in instruction.operands]
+            replacement.uses.append(instruction)
+
+        definition.uses = []
+        if self.outputs.get(definition.symbol) is definition:
+            self.outputs[definition.symbol] = replacement
+
+        instruction = definition.instruction
+        if all(self._isDead(result) for result in instruction.results):
+            self.remove(instruction)
+
+
+    def remove(self, instruction: Instruction):
+        """Remove the given instruction, whose results must not be used."""
+        for operand in instruction.operands:
+            operand.uses.remove(instruction)
+
+        for result in instruction.results:
+            # The register keeps its previous value until its next assignment
+            result.previous.next = result.next
+            if result.next is not None:
+                result.next.previous = result.previous
+            if self.outputs.get(result.symbol) is result:
+                self.outputs[result.symbol] = result.previous
+
+        instruction.operands = []
+        instruction.results = []
+        instruction.removed = True
+
+
+    def make_literal(self, instruction: Instruction, bit: int):
+        """Turn the given instruction with a single result into the move of the given bit."""
+        for operand in instruction.operands:
+            operand.uses.remove(instruction)
+
+        instruction.kind = Instruction.LITERAL
+        instruction.operator = Token(TokenType.CBINARY, str(bit) + "b", instruction.token.line, "")
+        instruction.operands = []
+
+
+    def make_move(self, instruction: Instruction, definition: Definition):
+        """Turn the given instruction with a single result into the move of the given definition."""
+        for operand in instruction.operands:
+            operand.uses.remove(instruction)
+
+        instruction.kind = Instruction.MOVE
+        instruction.operator = None
+        instruction.operands = [definition]
+        definition.uses.append(instruction)
+
+
+    def make_literals(self, instruction: Instruction, bits: dict):
+        """Move the results of the given instruction found in the given dictionary into literal instructions of their bit
+        assigned right after it, removing the instruction if it has no result left.
+
+        The literals only appear among the instructions once they are compacted. Since they read nothing and assign
+        registers the instruction assigns, their definitions are available wherever they were before.
+        """
+        literals = []
+        for result in instruction.results:
+            if result in bits:
+                literal = Instruction(Instruction.LITERAL, instruction.token, Token(TokenType.CBINARY, str(bits[result]) + "b", instruction.token.line, ""), instruction.position)
+                literal.results.append(result)
+                result.instruction = literal
+                literals.append(literal)
+
+        instruction.results = [result for result in instruction.results if result not in bits]
+        if len(instruction.results) == 0:
+            for operand in instruction.operands:
+                operand.uses.remove(instruction)
+            instruction.operands = []
+            instruction.removed = True
+
+        self._literals[instruction] = literals
+
+
+    def make_gate(self, instruction: Instruction, operator: Token, operands: list):
+        """Turn the given gate application into the application of the given gate to the given definitions."""
+        for operand in instruction.operands:
+            operand.uses.remove(instruction)
+
+        instruction.operator = operator
+        instruction.operands = list(operands)
+        for operand in instruction.operands:
+            operand.uses.append(instruction)
+
+
+    def rename(self, definition: Definition, register: str):
+        """Make the given definition held by the named register. The definitions of each register must be linked again afterwards."""
+        definition.register = register
+        definition.symbol = self.symbols.intern(register)
+
+
+    def gates(self, gates: dict):
+        """Returns the given gates, by name, keyed by the symbol of their name instead, which is the symbol of the operator of their instructions."""
+        return dict((self.symbols.intern(name), gate) for name, gate in gates.items())
+
+
+    def compact(self):
+        """Drop the removed instructions, place the literals split off the others right after them and number the instructions again."""
+        instructions = []
+        for instruction in self.instructions:
+            if instruction.removed == False:
+                instructions.append(instruction)
+            instructions.extend(self._literals.get(instruction, []))
+
+        self.instructions = instructions
+        self._literals = {}
+        for position, instruction in enumerate(self.instructions):
+            instruction.position = position
+
+
+    def relink(self):
+        """Link the definitions of each register again once the passes changed the registers holding them."""
+        self.inputs = dict((definition.symbol, definition) for definition in self.inputs.values())
+        for definition in self.inputs.values():
+            definition.next = None
+
+        current = dict(self.inputs)
+        for instruction in self.instructions:
+            if instruction.removed == True:
+                continue
+
+            for result in instruction.results:
+                if result.symbol not in current:
+                    self.inputs[result.symbol] = Definition(result.register, result.symbol, result.token, 0, None)
+                    current[result.symbol] = self.inputs[result.symbol]
+
+                previous = current[result.symbol]
+                result.previous = previous
+                result.version = previous.version + 1
+                result.next = None
+                previous.next = result
+                current[result.symbol] = result
+
+        self.outputs = current
+
+
+    def definitions(self):
+        """Returns every definition of the function, the initial values first then the results of each instruction in order."""
+        definitions = list(self.inputs.values())
+        for instruction in self.instructions:
+            if instruction.removed == False:
+                definitions.extend(instruction.results)
+
+        return definitions
+
+
+    def _isDead(self, definition: Definition):
+        """Returns true if nothing reads the given definition, not even the end of the circuit."""
+        return len(definition.uses) == 0 and self.outputs.get(definition.symbol) is not definition
+
+
+    def _lower(self, statement: Statement):
+        """Append the instruction of the given statement."""
+        if isinstance(statement, ExpressionStatement) == False:
+            raise ValueError("Only expression statements can be lowered, found <" + str(statement).strip() + ">.")
+
+        expr = statement.expr
+        position = len(self.instructions)
+        if isinstance(expr, GateExpression):
+            instruction = Instruction(Instruction.EFFECT, expr.token, self._interned(expr.token), position)
+            lvals = []
+            rval = expr
+        elif isinstance(expr, (AssignmentExpression, MultipleAssignmentExpression)):
+            lvals = expr.lvals if isinstance(expr, MultipleAssignmentExpression) else [expr.lval]
+            rval = expr.rval
+            if isinstance(rval, GateExpression):
+                instruction = Instruction(Instruction.GATE, expr.token, self._interned(rval.token), position)
+            elif isinstance(rval, RegisterExpression):
+                instruction = Instruction(Instruction.MOVE, expr.token, None, position)
+            elif isinstance(rval, LiteralExpression):
+                instruction = Instruction(Instruction.LITERAL, expr.token, rval.token, position)
+            else:
+                raise ValueError("Only gates, registers and literals can be assigned once circuits are folded, found <" + str(expr) + ">.")
+        else:
+            raise ValueError("Only assignments and gate applications can be lowered, found <" + str(expr) + ">.")
+
+        # The operands are read before the results are written, so the same register may be both
+        operands = rval.args if isinstance(rval, GateExpression) else ([rval] if isinstance(rval, RegisterExpression) else [])
+        for operand in operands:
+            definition = self._current(operand.token)
+            instruction.operands.append(definition)
+            definition.uses.append(instruction)
+
+        for lval in lvals:
+            previous = self._current(lval.token)
+            definition = Definition(previous.register, previous.symbol, previous.token, previous.version + 1, instruction)
+            definition.previous = previous
+            previous.next = definition
+            self.outputs[definition.symbol] = definition
+            instruction.results.append(definition)
+
+        self.instructions.append(instruction)
+
+
+    def _current(self, token: Token):
+        """Returns the definition the register of the given token currently holds, its initial value if it wasn't assigned yet."""
+        symbol = self._interned(token).symbol
+        if symbol not in self.inputs:
+            self.inputs[symbol] = Definition(token.lexeme, symbol, token, 0, None)
+            self.outputs[symbol] = self.inputs[symbol]
+
+        return self.outputs[symbol]
+
+
+    def _interned(self, token: Token):
+        """Returns the given token if it has a symbol, otherwise a copy of it with the symbol of its lexeme.
+
+        Tokens the assembler makes rather than lexes, such as the gates of collapsed circuits, don't have one.
+        """
+        if token.symbol != -1:
+            return token
+
+        return Token(token.token_type, token.lexeme, token.line, token.error, self.symbols.intern(token.lexeme))
+
+
+    def __repr__(self):
+        rep = ""
+        for instruction in self.instructions:
+            if instruction.removed == False:
+                rep = rep + "{0!s};\n".format(instruction)
+        return rep
+
+    __str__ = __repr__
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+"""Helpers to look at the statements of the main circuit once all other circuits have been folded into it.
+
+After folding, the main circuit only holds expression statements of the following forms:
+    - register = gate(register, ...);   the application of a gate, compiled to an APPLY instruction
+    - register = register;              a move from one register to another
+    - register = literal;               a move of a literal into a register
+    - gate(register, ...);              a gate applied for its side effect such as print
+    - register, ... = gate(register, ...);  the application of a gate with many outputs, from a collapsed circuit
+
+The optimizing passes work on the static single assignment form of the main circuit instead. These helpers serve
+the equivalence checker, which compares statements, the scheduler, which lifts the function back to statements,
+and the passes that read the bit of a literal or build truth tables.
+"""
+
+from common.ast import *
+
+
+def registers(expression: Expression):
+    """Returns the names of the registers the given expression reads."""
+    if isinstance(expression, RegisterExpression):
+        return [expression.token.lexeme]
+
+    if isinstance(expression, GateExpression):
+        return [arg.token.lexeme for arg in expression.args]
+
+    return []
+
+
+def literal(expression: Expression):
+    """Returns the bit held by the given expression if it is a single bit literal, None otherwise."""
+    if isinstance(expression, LiteralExpression) == False:
+        return None
+
+    digits = expression.token.lexeme[:-1]
+    if digits not in ("0", "1"):
+        return None
+
+    return int(digits)
+
+
+def replace_statements(circuit: CircuitDeclaration, statements: list):
+    """Replace the statements of the given circuit by the given ones."""
+    circuit.stmts = CircuitStatements()
+    for statement in statements:
+        circuit.add_statement(statement)
+
+
+def pack(values: dict, names: list):
+    """Returns the bits of the given registers packed into an integer, the first register being the most significant bit."""
+    value = 0
+    for name in names:
+        value = (value << 1) | values[name]
+
+    return value
+
+
+def unpack(value: int, names: list):
+    """Returns a dictionary that maps each of the given registers to its bit in the given packed integer.
+
+    This is the reverse of pack: the first register receives the most significant bit.
+    """
+    size = len(names)
+    return dict((name, (value >> (size - 1 - position)) & 1) for position, name in enumerate(names))
+
+
+def unique(names: list):
+    """Returns the given names without duplicates, in the order in which they first appear."""
+    result = []
+    for name in names:
+        if name not in result:
+            result.append(name)
+
+    return result
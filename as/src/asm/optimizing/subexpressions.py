@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from common.ast import LiteralExpression
+from common.gate import Gate
+from asm.optimizing.ssa import Function, Instruction, Definition
+from asm.optimizing.statements import literal
+
+class SubexpressionEliminator(object):
+    """Reuses the result of a gate application when the same gate is applied again to the same values.
+
+    Each definition is given a number: definitions share a number when they are known to hold the same value.
+    A gate application is identified by the gate and the numbers of its operands, sorted when the gate is symmetric,
+    so the application of a gate to values that were already fed to it yields the number of the earlier result.
+    If a register still holds that result, the application is replaced by a move from that register,
+    which turns an APPLY instruction into a MOV instruction, or removed altogether if it assigns the register holding it.
+
+    Attributes:
+        function(Function): The main circuit, with all the other circuits folded into it, in static single assignment form.
+        before(int): The number of gate applications before elimination.
+        after(int): The number of gate applications after elimination.
+    """
+    function        : Function      = None
+    before          : int           = 0
+    after           : int           = 0
+
+    _gates          : dict          = {}
+    _symmetric      : dict          = {}
+    _numbers        : dict          = {}
+    _holders        : dict          = {}
+    _expressions    : dict          = {}
+    _count          : int           = 0
+
+    def __init__(self, function: Function, gates: dict):
+        self.function = function
+        self.before = 0
+        self.after = 0
+
+        self._gates = function.gates(gates)
+        self._symmetric = {}
+        self._numbers = {}
+        self._holders = {}
+        self._expressions = {}
+        self._count = 0
+
+
+    def eliminate(self):
+        """Reuse the results of repeated gate applications of the main circuit and return the number of gate applications removed."""
+        function = self.function
+        for instruction in list(function.instructions):
+            if instruction.kind == Instruction.EFFECT:
+                continue
+
+            if instruction.kind == Instruction.GATE:
+                self.before = self.before + 1
+
+            # The application of a gate with many outputs is kept as is, each output being a new value
+            if len(instruction.results) > 1:
+                self.after = self.after + 1
+                for result in instruction.results:
+                    self._assign(result, self._fresh())
+                continue
+
+            result = instruction.results[0]
+            if instruction.kind == Instruction.MOVE:
+                number = self._number(instruction.operands[0])
+            else:
+                key = self._key(instruction)
+                if key is not None and key in self._expressions:
+                    number = self._expressions[key]
+                else:
+                    number = self._fresh()
+                    if key is not None:
+                        self._expressions[key] = number
+
+            # The register already holds the value so the instruction does nothing
+            if self._number(result.previous) == number:
+                function.forward(result, result.previous)
+                continue
+
+            holders = [holder for holder in self._holders.get(number, []) if function.available(holder, instruction)]
+            if instruction.kind == Instruction.GATE and len(holders) > 0:
+                function.make_move(instruction, holders[0])
+            elif instruction.kind == Instruction.GATE:
+                self.after = self.after + 1
+
+            self._assign(result, number)
+
+        function.compact()
+
+        return self.before - self.after
+
+
+    def _assign(self, definition: Definition, number: int):
+        """Record that the given definition holds the value with the given number."""
+        self._numbers[definition] = number
+        self._holders.setdefault(number, []).append(definition)
+
+
+    def _fresh(self):
+        """Returns a number no value was given yet."""
+        self._count = self._count + 1
+        return self._count - 1
+
+
+    def _number(self, definition: Definition):
+        """Returns the number of the value held by the given definition, numbering it if it is an initial value that wasn't numbered yet."""
+        if definition not in self._numbers:
+            self._assign(definition, self._fresh())
+
+        return self._numbers[definition]
+
+
+    def _key(self, instruction: Instruction):
+        """Returns what identifies the value the given literal or gate application moves into its single result,
+        None if the value cannot be identified."""
+        if instruction.kind == Instruction.LITERAL:
+            value = literal(LiteralExpression(instruction.operator))
+            return None if value is None else ("literal", value)
+
+        gate = self._gates.get(instruction.operator.symbol)
+        if gate is None or gate.table is None or gate.outputs != 1 or gate.inputs != len(instruction.operands):
+            return None
+
+        operands = [self._number(operand) for operand in instruction.operands]
+        if self._isSymmetric(gate):
+            operands.sort()
+
+        return (gate.name, tuple(operands))
+
+
+    def _isSymmetric(self, gate: Gate):
+        """Returns true if the output of the given gate doesn't depend on the order of its inputs.
+
+        Swapping any two neighbouring inputs must leave the truth table unchanged since such swaps produce all the orders.
+        """
+        if gate.name in self._symmetric:
+            return self._symmetric[gate.name]
+
+        symmetric = True
+        for position in range(gate.inputs - 1):
+            low, high = 1 << position, 1 << (position + 1)
+            for value in range(1 << gate.inputs):
+                if (value & low != 0) != (value & high != 0) and gate.apply(value) != gate.apply(value ^ low ^ high):
+                    symmetric = False
+
+        self._symmetric[gate.name] = symmetric
+        return symmetric
@@ -23,7 +23,7 @@ class CircuitDeclarationParselet(object):
         decl = CircuitDeclaration(parser.consume(TokenType.IDENTIFIER))
 
         # We parse parameters
-        parser.consume(TokenType.LEFT_PAREN)
+        parser.expect(TokenType.LEFT_PAREN)
         while True:
             # If the left parenthesis is immediately followed by a right parenthesis, we exit early
             if parser.peek() == TokenType.RIGHT_PAREN:
@@ -38,10 +38,10 @@ class CircuitDeclarationParselet(object):
                 break
 
         # We expect a closing right token
-        parser.consume(TokenType.RIGHT_PAREN)
+        parser.expect(TokenType.RIGHT_PAREN)
 
         # We parse the circuit body
-        parser.consume(TokenType.LEFT_BRACE)
+        parser.expect(TokenType.LEFT_BRACE)
         while True:
             # We match a closing brace, we terminate the loop
             if parser.match(TokenType.RIGHT_BRACE):
@@ -66,7 +66,7 @@ class CircuitParselet(DynamicExpressionParselet):
         """Parses a circuit application expression."""
         circuit_expr = CircuitExpression(token)
 
-        parser.consume(TokenType.LEFT_PAREN)
+        parser.expect(TokenType.LEFT_PAREN)
         while True:
             # If the left parenthesis is immediately followed by a right parenthesis, we exit early
             if parser.peek() == TokenType.RIGHT_PAREN:
@@ -80,7 +80,7 @@ class CircuitParselet(DynamicExpressionParselet):
             if parser.match(TokenType.COMMA) == False:
                 break
         # We expect a closing right token
-        parser.consume(TokenType.RIGHT_PAREN)
+        parser.expect(TokenType.RIGHT_PAREN)
 
         return circuit_expr
 
@@ -90,7 +90,7 @@ class GateParselet(StaticExpressionParselet):
         """Parses a gate application expression."""
         gate_expr = GateExpression(token)
 
-        parser.consume(TokenType.LEFT_PAREN)
+        parser.expect(TokenType.LEFT_PAREN)
         while True:
             # If the left parenthesis is immediately followed by a right parenthesis, we exit early
             if parser.peek() == TokenType.RIGHT_PAREN:
@@ -104,7 +104,7 @@ class GateParselet(StaticExpressionParselet):
             if parser.match(TokenType.COMMA) == False:
                 break;
         # We expect a closing right token
-        parser.consume(TokenType.RIGHT_PAREN)
+        parser.expect(TokenType.RIGHT_PAREN)
 
         return gate_expr
 
@@ -21,7 +21,7 @@ class ReturnStatementParselet(object):
         expr = parser.parseExpression()
 
         # We consume the semicolon that terminates an expression statement
-        parser.consume(TokenType.SEMI_COLON)
+        parser.expect(TokenType.SEMI_COLON)
 
         return ReturnStatement(token, expr)
 
@@ -33,6 +33,6 @@ class ExpressionStatementParselet(object):
         expr = parser.parseExpression()
 
         # We consume the semicolon that terminates an expression statement
-        parser.consume(TokenType.SEMI_COLON)
+        parser.expect(TokenType.SEMI_COLON)
 
         return ExpressionStatement(expr)
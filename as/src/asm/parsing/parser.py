@@ -17,6 +17,7 @@ from asm.parsing.exceptions import ParseError
 from common.token_type import TokenType
 from asm.lexing.lexer import Lexer
 from common.token import Token
+from collections import deque
 
 
 class Parser(object):
@@ -31,10 +32,11 @@ class Parser(object):
     literal_exprs   : dict      = {}
     assign_exprs    : dict      = {}
     
-    _read_tokens    : list      = []
+    _read_tokens    : deque     = None
 
     def __init__(self, lexer: Lexer, parselets: dict):
         self.lexer = lexer
+        self._read_tokens = deque()
 
         # Set the grammar
         for token_type, parselet in parselets.items():
@@ -46,30 +48,38 @@ class Parser(object):
         """
         program = Program()
 
-        while self.peek() != TokenType.EOF:
-            decl = self.parseDeclaration()
-
+        for decl in self.declarations():
             # If the current declaration is a circuit declaration and its name is <main>, we set it as the main entry point
             if isinstance(decl, CircuitDeclaration) and decl.token.lexeme == "main":
                 program.set_main("main")
 
-            # We don't allow for two declarations to share the same name
-            try:
-                old_decl = program.get_declaration(decl.token.lexeme)
-                raise ParseError("[Parsing Error] There already exists another circuit with the name <" + decl.token.lexeme + "> on line <" + str(old_decl.token.line) + ">.")
-            except KeyError:
-                pass
-
             # Add the current declaration to the program list of declarations
             program.add_declaration(decl)
 
-        # We are at the end of the token stream, we consume the EOF token
-        self.consume()
-
         # We return the parse program as an AST
         return program
 
 
+    def declarations(self):
+        """Generate the declarations of the program one at a time, as soon as each is parsed.
+
+        Only the line of each declaration is kept, to report a declaration sharing its name.
+        """
+        lines = {}
+        while self.peek() != TokenType.EOF:
+            decl = self.parseDeclaration()
+
+            # We don't allow for two declarations to share the same name
+            if decl.token.lexeme in lines:
+                raise ParseError("[Parsing Error] There already exists another circuit with the name <" + decl.token.lexeme + "> on line <" + str(lines[decl.token.lexeme]) + ">.")
+
+            lines[decl.token.lexeme] = decl.token.line
+            yield decl
+
+        # We are at the end of the token stream, we consume the EOF token
+        self.expect(TokenType.EOF)
+
+
     def parseDeclaration(self):
         """
         """
@@ -85,11 +95,11 @@ class Parser(object):
         """
         """
         # We look two tokens ahead of the current token and if it is a colon, we know we have a labeled statement
-        if self._lookAhead(2).token_type == TokenType.COLON:
+        if self.peek(2) == TokenType.COLON:
             return self.parseLabelStatement()
 
         # We lookahead one token and if we have the return keyword then we have a return statement
-        elif self._lookAhead(1).token_type == TokenType.RETURN:
+        elif self.peek() == TokenType.RETURN:
             return self.parseReturnStatement()
 
         else:
@@ -143,9 +153,8 @@ class Parser(object):
             raise ParseError("[Parsing Error] Failed to parse expression <" + current_token.lexeme + "> found on line <" + str(current_token.line) + ">.")
 
         # Now we check if we have an assignment after afterwards
-        assignment_token = self._lookAhead(1)
         try:
-            assignment_parselet = self.assign_exprs[assignment_token.token_type]
+            assignment_parselet = self.assign_exprs[self.peek()]
             self.consume()
             return assignment_parselet.parse(self, lval, current_token)
         except KeyError:
@@ -188,9 +197,13 @@ class Parser(object):
                 raise ParseError("[Parsing Error] Expected token <" + str(expected) + "> but found <" + str(token.token_type) + "> on line <" + str(token.line) + ">.")
 
         self._lookAhead(1)
-        read_token = self._read_tokens[0]
-        del self._read_tokens[0]
-        return read_token
+        return self._read_tokens.popleft()
+
+
+    def expect(self, expected: TokenType):
+        """Consume the next token, which must be of the given type, without returning it.
+        """
+        self.consume(expected)
 
 
     def match(self, expected: TokenType):
@@ -204,10 +217,10 @@ class Parser(object):
         return True
 
 
-    def peek(self):
+    def peek(self, distance: int = 1):
         """
         """
-        return self._lookAhead(1).token_type
+        return self._lookAhead(distance).token_type
 
 
     def _lookAhead(self, distance: int):
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from asm.parsing.exceptions import ParseError
+from asm.parsing.parser import Parser
+from common.token_type import TokenType
+
+
+class StreamParser(Parser):
+    """Generates an AST from a stream of tokens, reading the stream in place.
+
+    Looking ahead and checking the type of the next token only read the array of token types,
+    so the tokens the grammar merely expects, such as parentheses, commas and semicolons, never become objects.
+    A token object, with its lexeme, is only made when a token is consumed for the AST to keep.
+
+    The tokens are either all scanned beforehand in a <TokenStream> or scanned as the parser moves forward in a <TokenRing>.
+
+    Attributes:
+        stream(TokenStream|TokenRing): The tokens of the program.
+    """
+    stream                          = None
+
+    _position       : int           = 0
+
+    def __init__(self, stream, parselets: dict):
+        super().__init__(None, parselets)
+        self.stream = stream
+        self._position = 0
+
+
+    def consume(self, expected: TokenType = None):
+        """Returns the next token and moves past it, checking that it is of the given type if there is one."""
+        if expected is not None:
+            self.expect(expected)
+            return self.stream.token(self._position - 1)
+
+        token = self.stream.token(self._position)
+        self._position = self._position + 1
+        return token
+
+
+    def expect(self, expected: TokenType):
+        """Move past the next token, which must be of the given type, without making a token for it."""
+        token_type = self.stream.token_type(self._position)
+        if expected != token_type:
+            raise ParseError("[Parsing Error] Expected token <" + str(expected) + "> but found <" + str(token_type) + "> on line <" + str(self.stream.line(self._position)) + ">.")
+
+        self._position = self._position + 1
+
+
+    def match(self, expected: TokenType):
+        """Returns true and moves past the next token if it is of the given type, false otherwise."""
+        if self.stream.token_type(self._position) != expected:
+            return False
+
+        self._position = self._position + 1
+        return True
+
+
+    def peek(self, distance: int = 1):
+        """Returns the type of the token at the given distance ahead, 1 being the next token."""
+        return self.stream.token_type(self._position + distance - 1)
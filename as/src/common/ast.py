@@ -14,12 +14,19 @@ from abc import ABC, abstractmethod
 from common.token import Token
 
 
+"""
+Nodes are slotted so they don't carry a dictionary each, which matters since folding copies the nodes of a circuit
+for every call to it. Without a dictionary an attribute cannot have a class level default, so the attributes
+are only declared with their type and set in the constructor. The arguments of expressions are tuples, which are smaller than lists.
+"""
 class Program(object):
     """
 
     """
-    decls   : dict          = {}
-    main    : str           = ""
+    __slots__ = ("decls", "main")
+
+    decls   : dict
+    main    : str
 
     def __init__(self):
         """
@@ -82,22 +89,24 @@ class CircuitDeclaration(object):
     """
 
     """
-    token   : Token             = None
-    params  : list              = []
-    stmts                       = None
+    __slots__ = ("token", "params", "stmts")
+
+    token   : Token
+    params  : tuple
+    stmts   : "CircuitStatements"
 
     def __init__(self, token: Token):
         """
         """
         self.token = token
-        self.params = []
+        self.params = ()
         self.stmts = CircuitStatements()
 
 
     def add_parameter(self, parameter):
         """
         """
-        self.params.append(parameter)
+        self.params = self.params + (parameter,)
 
 
     def add_statement(self, statement):
@@ -130,6 +139,8 @@ class Statement(ABC):
     """
 
     """
+    __slots__ = ()
+
     @abstractmethod
     def __repr__(self):
         pass
@@ -143,7 +154,9 @@ class LabeledStatement(Statement):
     """
 
     """
-    token   : Token         = None
+    __slots__ = ("token",)
+
+    token   : Token
 
     def __init__(self, token: Token):
         """
@@ -161,8 +174,10 @@ class ReturnStatement(Statement):
     """
 
     """
-    token   : Token         = None
-    expr                    = None
+    __slots__ = ("token", "expr")
+
+    token   : Token
+    expr    : "Expression"
 
     def __init__(self, token, expr):
         """
@@ -181,8 +196,10 @@ class ExpressionStatement(Statement):
     """
 
     """
-    token   : Token         = None
-    expr                    = None
+    __slots__ = ("token", "expr")
+
+    token   : Token
+    expr    : "Expression"
 
     def __init__(self, expr):
         """
@@ -197,10 +214,36 @@ class ExpressionStatement(Statement):
     __str__ = __repr__
 
 
+class VectorStatement(Statement):
+    """
+    Applications of the same gate to independent registers, compiled to a single vector APPLY instruction.
+    Every register they read is read before any register they assign is written.
+    Programs cannot contain them: the assembler produces them when it schedules the main circuit.
+    """
+    __slots__ = ("token", "stmts")
+
+    token   : Token
+    stmts   : list
+
+    def __init__(self, token: Token, stmts: list):
+        """
+        """
+        self.token = token
+        self.stmts = stmts
+
+
+    def __repr__(self):
+        return "{0!s};\n".format(" | ".join(str(stmt.expr) for stmt in self.stmts))
+
+    __str__ = __repr__
+
+
 class Expression(ABC):
     """
 
     """
+    __slots__ = ()
+
     @abstractmethod
     def __eq__(self, other):
         pass
@@ -222,9 +265,11 @@ class AssignmentExpression(Expression):
     """
 
     """
-    token   : Token         = None
-    lval    : Expression    = None
-    rval    : Expression    = None
+    __slots__ = ("token", "lval", "rval")
+
+    token   : Token
+    lval    : Expression
+    rval    : Expression
 
     def __init__(self, token: Token, lval, rval):
         """
@@ -248,18 +293,55 @@ class AssignmentExpression(Expression):
     __str__ = __repr__
 
 
+class MultipleAssignmentExpression(Expression):
+    """
+    The assignment of each output of a gate to a register, in order.
+    Programs cannot contain them: the assembler produces them when it turns a circuit into a gate with many outputs.
+    """
+    __slots__ = ("token", "lvals", "rval")
+
+    token   : Token
+    lvals   : tuple
+    rval    : Expression
+
+    def __init__(self, token: Token, lvals, rval):
+        """
+        """
+        self.token = token
+        self.lvals = tuple(lvals)
+        self.rval = rval
+
+
+    def __eq__(self, other):
+        return self.token == other.token
+
+
+    def __ne__(self, other):
+        return not (self == other)
+
+
+    def __repr__(self):
+        return "{0!s} = {1!s}".format(", ".join(str(lval) for lval in self.lvals), self.rval)
+
+    __str__ = __repr__
+
+
 class CircuitExpression(Expression):
     """
 
     """
-    token   : Token         = None
-    args    : list          = []
+    __slots__ = ("token", "args")
 
-    def __init__(self, token: Token):
+    token   : Token
+    args    : tuple
+
+    def __init__(self, token: Token, args: tuple = ()):
         """
+        Args:
+            args(tuple): The arguments, when they are all known, instead of adding them one at a time.
         """
         self.token = token
-        self.args = []
+        self.args = args
 
 
     def add_argument(self, arg):
@@ -268,7 +350,7 @@ class CircuitExpression(Expression):
         if isinstance(arg, Expression) == False:
             raise ValueError("The given argument to a circuit expander must an expression.")
 
-        self.args.append(arg)
+        self.args = self.args + (arg,)
 
 
     def __eq__(self, other):
@@ -299,14 +381,18 @@ class GateExpression(Expression):
     """
 
     """
-    token   : Token         = None
-    args    : list          = []
+    __slots__ = ("token", "args")
 
-    def __init__(self, token: Token):
+    token   : Token
+    args    : tuple
+
+    def __init__(self, token: Token, args: tuple = ()):
         """
+        Args:
+            args(tuple): The arguments, when they are all known, instead of adding them one at a time.
         """
         self.token = token
-        self.args = []
+        self.args = args
 
 
     def add_argument(self, arg):
@@ -315,7 +401,7 @@ class GateExpression(Expression):
         if isinstance(arg, Expression) == False:
             raise ValueError("The given argument to a gate must an expression.")
 
-        self.args.append(arg)
+        self.args = self.args + (arg,)
 
 
     def __eq__(self, other):
@@ -346,7 +432,9 @@ class ParameterExpression(Expression):
     """
 
     """
-    token   : Token         = None
+    __slots__ = ("token",)
+
+    token   : Token
 
     def __init__(self, token: Token):
         """
@@ -374,7 +462,9 @@ class RegisterExpression(Expression):
     """
 
     """
-    token   : Token         = None
+    __slots__ = ("token",)
+
+    token   : Token
 
     def __init__(self, token: Token):
         """
@@ -403,7 +493,9 @@ class LiteralExpression(Expression):
     """
 
     """
-    token   : Token         = None
+    __slots__ = ("token",)
+
+    token   : Token
 
     def __init__(self, token: Token):
         """
@@ -435,9 +527,11 @@ class CircuitStatement(object):
     """
 
     """
-    stmt    : Statement     = None
-    prev    : Statement     = None
-    next    : Statement     = None
+    __slots__ = ("stmt", "prev", "next")
+
+    stmt    : Statement
+    prev    : "CircuitStatement"
+    next    : "CircuitStatement"
 
     def __init__(self, statement: Statement):
         self.stmt = statement
@@ -449,13 +543,15 @@ class CircuitStatements(object):
     """
 
     """
+    __slots__ = ("head", "prev", "current", "next", "tail", "length")
+
     # I wonder if I'm not doing too much bookkeeping here
-    head    : CircuitStatement      = None
-    prev    : CircuitStatement      = None
-    current : CircuitStatement      = None
-    next    : CircuitStatement      = None
-    tail    : CircuitStatement      = None
-    length  : int                   = 0
+    head    : CircuitStatement
+    prev    : CircuitStatement
+    current : CircuitStatement
+    next    : CircuitStatement
+    tail    : CircuitStatement
+    length  : int
 
     def __init__(self):
         self.head = None
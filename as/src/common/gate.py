@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+class Gate(object):
+    """A gate the virtual machine is configured with.
+
+    The matrix of a gate with n inputs and m outputs has 2^n columns and 2^m rows.
+    Column <j> describes what happens to the input whose bits, packed with the first input as most significant bit, equal <j>.
+    For a deterministic gate, every column holds a single 1 and the row of that 1 is the packed output:
+    the gate is then fully described by its truth table.
+
+    Attributes:
+        name(str): The name of the gate.
+        inputs(int): The number of inputs of the gate.
+        outputs(int): The number of outputs of the gate.
+        matrix(list): The matrix representing the gate.
+        table(tuple): The packed output for each packed input, None if the gate is not deterministic.
+    """
+    name        : str       = ""
+    inputs      : int       = 0
+    outputs     : int       = 0
+    matrix      : list      = []
+    table       : tuple     = None
+
+    def __init__(self, name: str, matrix: list):
+        """
+        Raises:
+            ValueError: If the matrix doesn't have a power of two rows and columns.
+        """
+        if isinstance(matrix, list) == False or len(matrix) < 2 or len(matrix) & (len(matrix) - 1) != 0:
+            raise ValueError("The matrix of gate <" + name + "> must have a number of rows that is a power of two.")
+
+        columns = len(matrix[0]) if isinstance(matrix[0], list) else 0
+        if columns == 0 or columns & (columns - 1) != 0:
+            raise ValueError("The matrix of gate <" + name + "> must have a number of columns that is a power of two.")
+
+        for row in matrix:
+            if isinstance(row, list) == False or len(row) != columns:
+                raise ValueError("All the rows of the matrix of gate <" + name + "> must have the same number of columns.")
+
+            for entry in row:
+                if isinstance(entry, (int, float)) == False or isinstance(entry, bool):
+                    raise ValueError("The matrix of gate <" + name + "> must only hold numbers.")
+
+        self.name = name
+        self.inputs = columns.bit_length() - 1
+        self.outputs = len(matrix).bit_length() - 1
+        self.matrix = matrix
+        self.table = None
+
+        # A gate is deterministic if each column has a single 1 and zeros everywhere else
+        table = []
+        for column in range(columns):
+            rows = [row for row in range(len(matrix)) if matrix[row][column] != 0]
+            if len(rows) != 1 or matrix[rows[0]][column] != 1:
+                return
+
+            table.append(rows[0])
+
+        self.table = tuple(table)
+
+
+    @classmethod
+    def from_table(cls, name: str, inputs: int, outputs: int, table: tuple):
+        """Create the deterministic gate with the given truth table."""
+        matrix = [[1 if table[column] == row else 0 for column in range(1 << inputs)] for row in range(1 << outputs)]
+        return cls(name, matrix)
+
+
+    def apply(self, value: int):
+        """Returns the packed output of the gate for the given packed input."""
+        return self.table[value]
+
+
+    def __repr__(self):
+        return "{0!s}/{1!s}->{2!s}".format(self.name, self.inputs, self.outputs)
+
+    __str__ = __repr__
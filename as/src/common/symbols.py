@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import sys
+
+class SymbolTable(object):
+    """Interns the identifiers of a program, each distinct identifier getting a dense integer id in the order it is first seen.
+
+    The lexers intern every identifier they scan, so the tokens of the same identifier share its id and a single string
+    rather than a string each. Whatever keys tables by circuit, parameter or register name can key them by id instead.
+
+    Attributes:
+        names(list): The name of each identifier, by id.
+    """
+    names       : list      = []
+
+    _ids        : dict      = {}
+
+    def __init__(self):
+        self.names = []
+        self._ids = {}
+
+
+    def intern(self, name: str):
+        """Returns the id of the given identifier, giving it the next id if it wasn't seen before."""
+        symbol = self._ids.get(name)
+        if symbol is None:
+            symbol = len(self.names)
+            name = sys.intern(name)
+            self._ids[name] = symbol
+            self.names.append(name)
+
+        return symbol
+
+
+    def name(self, symbol: int):
+        """Returns the identifier with the given id."""
+        return self.names[symbol]
+
+
+    def __contains__(self, name: str):
+        return name in self._ids
+
+
+    def __len__(self):
+        return len(self.names)
@@ -15,16 +15,20 @@ class Token(object):
     """
 
     """
-    token_type  : TokenType     = None
-    lexeme      : str           = ""
-    line        : int           = 0
-    error       : str           = ""
+    __slots__ = ("token_type", "lexeme", "line", "error", "symbol")
 
-    def __init__(self, token_type: TokenType, lexeme: str, line: int, error: str):
+    token_type  : TokenType
+    lexeme      : str
+    line        : int
+    error       : str
+    symbol      : int
+
+    def __init__(self, token_type: TokenType, lexeme: str, line: int, error: str, symbol: int = -1):
         self.token_type = token_type
         self.lexeme = lexeme
         self.line = line
         self.error = error
+        self.symbol = symbol
 
     def __eq__(self, other):
         return self.token_type == other.token_type and self.lexeme == other.lexeme
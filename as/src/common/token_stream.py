@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from array import array
+
+from common.token_type import TokenType
+from common.symbols import SymbolTable
+from common.token import Token
+
+class TokenStream(object):
+    """The tokens of a source held in parallel arrays rather than one object each.
+
+    The type of each token takes a byte, its start and end offsets in the source, its line and the id of its identifier
+    four bytes each, so a token costs seventeen bytes until something asks for it. Lexemes are only decoded from the source
+    when a token is made for the parser to keep or for a diagnostic; the parentheses, commas and semicolons
+    the parser only checks never become strings, and identifiers are taken from the symbol table they were interned in.
+    The stream always ends with an end of file token.
+
+    Attributes:
+        source(bytes): The source the tokens were scanned from.
+        types(array): The type of each token.
+        starts(array): The offset in the source of the first byte of each token.
+        ends(array): The offset in the source past the last byte of each token.
+        lines(array): The line of each token.
+        symbols(array): The id of the identifier of each token, -1 for tokens that aren't identifiers.
+        symbol_table(SymbolTable): The table the identifiers were interned in.
+        errors(dict): The error of each error token, by token index.
+    """
+    source      : bytes     = b""
+    types       : array     = None
+    starts      : array     = None
+    ends        : array     = None
+    lines       : array     = None
+    symbols     : array     = None
+    symbol_table: SymbolTable   = None
+    errors      : dict      = {}
+
+    # Token types by value, cheaper than converting each value to the enumeration
+    _token_types: tuple     = tuple(TokenType)
+
+    def __init__(self, source: bytes, symbol_table: SymbolTable):
+        self.source = source
+        self.types = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lines = array('I')
+        self.symbols = array('i')
+        self.symbol_table = symbol_table
+        self.errors = {}
+
+
+    def extend(self, source: bytes, types: array, starts: array, ends: array, lines: array, symbols: array, errors: dict):
+        """Add the given tokens, whose offsets are in the given source, at the end of the stream.
+
+        Args:
+            source(bytes): The source the offsets are in, which must be the source of the stream.
+            errors(dict): The error of each error token, by index in the given arrays.
+        """
+        for index, error in errors.items():
+            self.errors[len(self.types) + index] = error
+
+        self.source = source
+        self.types.extend(types)
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+        self.lines.extend(lines)
+        self.symbols.extend(symbols)
+
+
+    def token_type(self, index: int):
+        """Returns the type of the token at the given index, the type of the end of file token past the end of the stream."""
+        if index >= len(self.types):
+            index = len(self.types) - 1
+
+        return self._token_types[self.types[index]]
+
+
+    def line(self, index: int):
+        """Returns the line of the token at the given index, the line of the end of file token past the end of the stream."""
+        if index >= len(self.types):
+            index = len(self.types) - 1
+
+        return self.lines[index]
+
+
+    def lexeme(self, index: int):
+        """Returns the text of the token at the given index."""
+        if self.symbols[index] != -1:
+            return self.symbol_table.names[self.symbols[index]]
+
+        return self.source[self.starts[index] : self.ends[index]].decode("utf-8", "replace")
+
+
+    def token(self, index: int):
+        """Returns the token at the given index, the end of file token past the end of the stream."""
+        if index >= len(self.types):
+            index = len(self.types) - 1
+
+        return Token(self._token_types[self.types[index]], self.lexeme(index), self.lines[index], self.errors.get(index, ""), self.symbols[index])
+
+
+    def __len__(self):
+        return len(self.types)
+
+
+class TokenRing(object):
+    """A window of fixed size over the tokens of a source, scanned by the lexer as the parser moves forward.
+
+    Tokens are asked for by their index in the whole source, like from a <TokenStream>, but only the last tokens scanned
+    are held: asking for a token past the window has the lexer scan enough tokens to fill the window again
+    from a few tokens before the one asked for, overwriting the oldest ones. The parser only looks a couple of tokens
+    ahead and one behind, so memory stays the same however long the source is.
+
+    Each token keeps the chunk of the source its offsets are in, so that the lexer can read the source in chunks
+    and only the chunks holding the tokens of the window are kept.
+
+    Attributes:
+        lexer(RegexLexer): The lexer scanning the tokens.
+        capacity(int): The number of tokens held, a power of two.
+    """
+    lexer                   = None
+    capacity    : int       = 1024
+
+    _types      : array     = None
+    _starts     : array     = None
+    _ends       : array     = None
+    _lines      : array     = None
+    _symbols    : array     = None
+    _sources    : list      = []
+    _errors     : list      = []
+    _end        : int       = 0
+    _done       : bool      = False
+
+    # The number of tokens before the one asked for that are kept when the window moves
+    _behind     : int       = 4
+
+    _token_types: tuple     = tuple(TokenType)
+
+    def __init__(self, lexer, capacity: int = 1024):
+        """
+        Raises:
+            ValueError: If the capacity isn't a power of two that leaves room for the tokens kept behind.
+        """
+        if capacity & (capacity - 1) != 0 or capacity <= 2 * self._behind:
+            raise ValueError("The capacity of a token ring must be a power of two greater than <" + str(2 * self._behind) + ">, found <" + str(capacity) + ">.")
+
+        self.lexer = lexer
+        self.capacity = capacity
+        self._types = array('B', bytes(capacity))
+        self._starts = array('I', [0]) * capacity
+        self._ends = array('I', [0]) * capacity
+        self._lines = array('I', [0]) * capacity
+        self._symbols = array('i', [-1]) * capacity
+        self._sources = [None] * capacity
+        self._errors = [""] * capacity
+        self._end = 0
+        self._done = False
+
+
+    def extend(self, source: bytes, types: array, starts: array, ends: array, lines: array, symbols: array, errors: dict):
+        """Add the given tokens, whose offsets are in the given source, after the last token scanned.
+
+        Args:
+            errors(dict): The error of each error token, by index in the given arrays.
+        """
+        # The tokens are copied in at most two runs of slots, the second one when the first reaches the end of the arrays
+        copied = 0
+        while copied < len(types):
+            slot = (self._end + copied) & (self.capacity - 1)
+            count = min(len(types) - copied, self.capacity - slot)
+            self._types[slot : slot + count] = types[copied : copied + count]
+            self._starts[slot : slot + count] = starts[copied : copied + count]
+            self._ends[slot : slot + count] = ends[copied : copied + count]
+            self._lines[slot : slot + count] = lines[copied : copied + count]
+            self._symbols[slot : slot + count] = symbols[copied : copied + count]
+            self._sources[slot : slot + count] = [source] * count
+            self._errors[slot : slot + count] = [errors.get(copied + index, "") for index in range(count)] if len(errors) > 0 else [""] * count
+            copied = copied + count
+
+        self._end = self._end + len(types)
+        if len(types) > 0 and types[-1] == TokenType.EOF:
+            self._done = True
+
+
+    def token_type(self, index: int):
+        """Returns the type of the token at the given index, the type of the end of file token past the end of the source."""
+        # Most tokens asked for are held so we skip checking the window
+        if self._end - self.capacity <= index < self._end:
+            return self._token_types[self._types[index & (self.capacity - 1)]]
+
+        return self._token_types[self._types[self._slot(index)]]
+
+
+    def line(self, index: int):
+        """Returns the line of the token at the given index, the line of the end of file token past the end of the source."""
+        return self._lines[self._slot(index)]
+
+
+    def lexeme(self, index: int):
+        """Returns the text of the token at the given index."""
+        return self._lexeme(self._slot(index))
+
+
+    def token(self, index: int):
+        """Returns the token at the given index, the end of file token past the end of the source."""
+        slot = self._slot(index)
+        return Token(self._token_types[self._types[slot]], self._lexeme(slot), self._lines[slot], self._errors[slot], self._symbols[slot])
+
+
+    def _lexeme(self, slot: int):
+        """Returns the text of the token in the given slot, from the symbol table of the lexer for identifiers."""
+        if self._symbols[slot] != -1:
+            return self.lexer.symbols.names[self._symbols[slot]]
+
+        return self._sources[slot][self._starts[slot] : self._ends[slot]].decode("utf-8", "replace")
+
+
+    def _slot(self, index: int):
+        """Returns the slot holding the token at the given index, scanning tokens until it is held.
+
+        Raises:
+            IndexError: If the token was already overwritten.
+        """
+        if index >= self._end and self._done == False:
+            self.lexer.scan(self, index - self._behind + self.capacity - self._end)
+
+        if index >= self._end:
+            index = self._end - 1
+
+        if index < self._end - self.capacity:
+            raise IndexError("The token at index <" + str(index) + "> is no longer held, the oldest token held is at index <" + str(self._end - self.capacity) + ">.")
+
+        return index & (self.capacity - 1)
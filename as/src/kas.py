@@ -21,15 +21,70 @@ Then both files are packages into one ZIP file suitable for sharing and deployme
 Example:
     The assembler is called as follows
     $ kas program.alc
+
+    To collapse the circuits with at most 12 parameters by default into gates whose truth tables are computed by the assembler
+    $ kas program.alc --collapse
+    $ kas program.alc --collapse --collapse-inputs=8
+
+    To evaluate at assembly time the gate applications whose inputs are known
+    $ kas program.alc --fold
+
+    Along with --collapse, the known inputs of collapsed circuits are folded into the truth tables of their gates
+    $ kas program.alc --collapse --fold
+
+    To reuse the result of a gate application when the same gate is applied again to the same values
+    $ kas program.alc --reuse
+
+    To remove the gate applications computing a value the registers already hold, such as <not(not(cr0))>
+    $ kas program.alc --minimize
+
+    To remove the assignments whose result is never printed nor part of the final state of the registers
+    $ kas program.alc --eliminate
+    $ kas program.alc --eliminate --only-prints
+
+    To map the values of the program onto as few registers as possible and report the register count it needs
+    $ kas program.alc --allocate
+    $ kas program.alc --allocate --only-prints
+
+    To fuse chains of gate applications into composite gates, each with at most 8 inputs by default
+    $ kas program.alc --fuse
+    $ kas program.alc --fuse --fuse-inputs=4
+
+    To apply the same gate to independent registers with a single vector APPLY instruction
+    $ kas program.alc --schedule
+
+    To prove with decision diagrams that the optimizations kept the program equivalent to the program as written
+    $ kas program.alc --collapse --fold --reuse --minimize --eliminate --fuse --allocate --schedule --verify
+
+    To scan large ASCII programs for tokens with a single regular expression instead of one character at a time
+    $ kas program.alc --regex-lexer
+
+    To read large programs in chunks and check each circuit as soon as it is parsed, holding few circuits at a time
+    $ kas program.alc --stream
 """
 import sys
 from docopt import docopt
 
 from asm.lexing.lexer import Lexer
+from asm.lexing.regex_lexer import RegexLexer
 from asm.parsing.parser import Parser
+from asm.parsing.stream_parser import StreamParser
+from common.token_stream import TokenRing
+from common.ast import Program
+from common.symbols import SymbolTable
 from asm.parsing.grammar import Grammar
 from asm.checking.checker import Checker
 from asm.checking.exceptions import CheckError
+from asm.optimizing.collapsing import Collapser
+from asm.optimizing.ssa import Function
+from asm.optimizing.folding import ConstantFolder
+from asm.optimizing.subexpressions import SubexpressionEliminator
+from asm.optimizing.minimization import LogicMinimizer
+from asm.optimizing.elimination import DeadCodeEliminator
+from asm.optimizing.fusion import Fuser
+from asm.optimizing.allocation import RegisterAllocator
+from asm.optimizing.scheduling import Scheduler
+from asm.optimizing.equivalence import EquivalenceChecker
 
 def main(**kwargs):
     """Get the content of the program file and begin the assembly process.
@@ -45,13 +100,37 @@ def main(**kwargs):
     """
     program_path = kwargs.pop("program")
     directives_path = kwargs.pop("directives")
+    collapse = kwargs.pop("collapse", False)
+    collapse_inputs = kwargs.pop("collapse_inputs", "12")
+    fold = kwargs.pop("fold", False)
+    reuse = kwargs.pop("reuse", False)
+    minimize = kwargs.pop("minimize", False)
+    eliminate = kwargs.pop("eliminate", False)
+    only_prints = kwargs.pop("only_prints", False)
+    fuse = kwargs.pop("fuse", False)
+    fuse_inputs = kwargs.pop("fuse_inputs", "8")
+    allocate = kwargs.pop("allocate", False)
+    schedule = kwargs.pop("schedule", False)
+    verify = kwargs.pop("verify", False)
+    regex_lexer = kwargs.pop("regex_lexer", False)
+    stream = kwargs.pop("stream", False)
     source = ""
     directives = ""
 
-    # Try to get the source test
+    # Validate the numeric options before doing any work, so that an invalid value is reported right away
+    if collapse_inputs.isdecimal() == False:
+        print("The maximum number of parameters of a collapsed circuit <" + collapse_inputs + "> must be a whole number.")
+        return
+
+    if fuse_inputs.isdecimal() == False:
+        print("The maximum number of inputs of a composite gate <" + fuse_inputs + "> must be a whole number.")
+        return
+
+    # Try to get the source test, unless it is read in chunks as it is assembled
     try:
-        with open(program_path, 'r', encoding = "utf-8") as program_file:
-            source = program_file.read()
+        if stream == False:
+            with open(program_path, 'r', encoding = "utf-8") as program_file:
+                source = program_file.read()
     except OSError:
         print("The program file <" + program_path + "> could not be found. Please make sure the file exists and the user the Arklight assembler is running under has READ permissions on the file..")
 
@@ -62,23 +141,121 @@ def main(**kwargs):
     except OSError:
         print("The directives file <" + directives_path + "> could not be found. Please make sure the file exists and the user the Arklight assembler is running under has READ permissions on the file.")
 
-    # Begin compilation
-    lexer = Lexer(source)
-    parser = Parser(lexer, Grammar.parselets)
-    program = parser.parse()
+    collapser = None
+    if collapse == True:
+        collapser = Collapser(int(collapse_inputs))
+
+    # Begin compilation, the declarations being parsed as they are checked when streaming
+    #   The identifiers are interned in a table the optimizing passes look registers and gates up by
+    symbols = SymbolTable()
+    program = Program() if stream == True else parse(source, regex_lexer, symbols)
     # print(program, end = '', flush = True)
-    checker = Checker(program, directives)
+    checker = Checker(program, directives, collapser)
     try:
-        checker.check()
-        print(program, end = '', flush = True)
+        check(checker, program_path, stream, symbols)
     except CheckError as error:
         print(error)
+        return
+    except OSError:
+        print("The program file <" + program_path + "> could not be found. Please make sure the file exists and the user the Arklight assembler is running under has READ permissions on the file..")
+        return
+
+    # The optimized program is compared against the program as written, without collapsed circuits
+    reference = None
+    if verify == True:
+        reference_program = Program() if stream == True else parse(source, regex_lexer, symbols)
+        check(Checker(reference_program, directives), program_path, stream, symbols)
+        reference = list(reference_program.get_main().stmts)
+
+    if collapser is not None:
+        print("[Optimizing] Collapsed circuits into gates: <" + str(collapser.circuits) + "> circuits collapsed, <" + str(collapser.calls) + "> calls assembled into single APPLY instructions using <" + str(collapser.gates) + "> gates.")
+
+    # Optimize the main circuit now that all other circuits have been folded into it, in static single assignment form
+    main_circuit = program.get_main()
+    function = Function(main_circuit, symbols)
+    if fold == True:
+        folder = ConstantFolder(function, checker.get_gates(), collapser.created() if collapser is not None else None)
+        folder.fold()
+        print("[Optimizing] Folded constant gate applications: <" + str(folder.before) + "> APPLY instructions down to <" + str(folder.after) + "> using <" + str(folder.specialized) + "> gates specialized to their known inputs.")
+
+    if reuse == True:
+        subexpression_eliminator = SubexpressionEliminator(function, checker.get_gates())
+        subexpression_eliminator.eliminate()
+        print("[Optimizing] Reused repeated gate applications: <" + str(subexpression_eliminator.before) + "> APPLY instructions down to <" + str(subexpression_eliminator.after) + ">.")
+
+    if minimize == True:
+        minimizer = LogicMinimizer(function, checker.get_gates())
+        minimizer.minimize()
+        print("[Optimizing] Minimized redundant logic: <" + str(minimizer.before) + "> APPLY instructions down to <" + str(minimizer.after) + ">.")
+
+    if eliminate == True:
+        eliminator = DeadCodeEliminator(function, only_prints == False)
+        eliminator.eliminate()
+        print("[Optimizing] Eliminated dead assignments: <" + str(eliminator.before) + "> statements down to <" + str(eliminator.after) + ">, removing <" + str(eliminator.applications) + "> APPLY instructions.")
+
+    if fuse == True:
+        fuser = Fuser(function, checker.get_gates(), int(fuse_inputs))
+        fuser.fuse()
+        print("[Optimizing] Fused gate applications: <" + str(fuser.before) + "> APPLY instructions down to <" + str(fuser.after) + "> using <" + str(fuser.composites) + "> composite gates.")
+
+    if allocate == True:
+        allocator = RegisterAllocator(function, checker.get_reg_prefix(), only_prints == False)
+        try:
+            allocator.allocate()
+        except ValueError as error:
+            print(error)
+            return
+
+        print("[Optimizing] Allocated registers: the program needs a register count of <" + str(allocator.reg_count) + ">, the directives provide <" + str(checker.get_reg_count()) + ">.")
+
+    # Scheduling comes last since the other passes don't know about vector applications,
+    # it lifts the function back to statements itself, grouping applications into vector statements
+    if schedule == True:
+        scheduler = Scheduler(function, main_circuit)
+        scheduler.schedule()
+        print("[Optimizing] Scheduled independent gate applications: <" + str(scheduler.before) + "> APPLY instructions down to <" + str(scheduler.after) + "> including <" + str(scheduler.vectors) + "> vector APPLY instructions over <" + str(scheduler.levels) + "> levels.")
+    else:
+        function.lift(main_circuit)
+
+    if reference is not None:
+        equivalence_checker = EquivalenceChecker(checker.get_gates(), only_prints == False)
+        equivalent = equivalence_checker.prove(reference, list(program.get_main().stmts))
+        if equivalent == True:
+            print("[Verifying] The assembled program is equivalent to the program as written.")
+        elif equivalent is None:
+            print("[Verifying] The assembled program could not be compared to the program as written: " + equivalence_checker.reason + ".")
+        else:
+            registers = ", ".join(name + " = " + str(value) + "b" for name, value in equivalence_checker.witness.items()) if equivalence_checker.witness is not None else ""
+            print("[Verifying] The assembled program differs from the program as written: " + equivalence_checker.reason + (" when the registers start as <" + registers + ">" if registers != "" else "") + ".")
+
+    print(program, end = '', flush = True)
+
+
+def parse(source: str, regex_lexer: bool, symbols: SymbolTable):
+    """Returns the program of the given source, scanned into a stream of tokens with a regular expression if asked,
+    its identifiers interned in the given table."""
+    if regex_lexer == True:
+        return StreamParser(RegexLexer(source, symbols = symbols).tokenize(), Grammar.parselets).parse()
+
+    return Parser(Lexer(source, symbols), Grammar.parselets).parse()
+
+
+def check(checker: Checker, program_path: str, stream: bool, symbols: SymbolTable):
+    """Check the program of the given checker or, when streaming, read the program file in chunks and check each declaration
+    as soon as it is parsed. Only a window of tokens and the circuits not checked yet are then held."""
+    if stream == False:
+        checker.check()
+        return
+
+    with open(program_path, 'rb') as program_file:
+        parser = StreamParser(TokenRing(RegexLexer(program_file, symbols = symbols)), Grammar.parselets)
+        checker.check_stream(parser.declarations())
 
 
 options = """Little Arklight assembler.
 
 Usage:
-    kas.py <program> (-d <file> | --directives=<file>)
+    kas.py <program> (-d <file> | --directives=<file>) [--collapse] [--collapse-inputs=<count>] [--fold] [--reuse] [--minimize] [--eliminate] [--fuse] [--fuse-inputs=<count>] [--allocate] [--schedule] [--only-prints] [--verify] [--regex-lexer] [--stream]
     kas.py (-h | --help)
     kas.py (-V | --version)
 
@@ -86,10 +263,38 @@ Options:
     -h, --help                      Show this help message.
     -V, --version                   Display the assembler version.
     -d <file>, --directives=<file>  Specify the directives file that details the VM configuration.
+    -c, --collapse                  Collapse the circuits with few parameters into gates computed when the program is assembled.
+    --collapse-inputs=<count>       Maximum number of parameters of a collapsed circuit [default: 12].
+    --fold                          Evaluate the gate applications whose inputs are known when the program is assembled.
+    -r, --reuse                     Reuse the result of a gate application when the same gate is applied again to the same values.
+    -m, --minimize                  Remove the gate applications computing a value the registers already hold, using decision diagrams.
+    -e, --eliminate                 Remove the assignments whose result is never observed.
+    -f, --fuse                      Fuse chains of gate applications into applications of composite gates.
+    --fuse-inputs=<count>           Maximum number of inputs of a composite gate [default: 8].
+    -a, --allocate                  Map the values of the program onto as few registers as possible.
+    -s, --schedule                  Group the independent applications of the same gate into vector APPLY instructions.
+    --only-prints                   Only consider printed registers observed rather than the final state of all registers.
+    --verify                        Prove the assembled program equivalent to the program as written.
+    -x, --regex-lexer               Scan the program with a single regular expression over its bytes into a compact token stream.
+    --stream                        Read the program in chunks and check each circuit as soon as it is parsed.
 """
 if __name__ == "__main__":
     args = docopt(options, version = "Little Arklight assembler 0.0.1")
     main(
-        program     = args["<program>"],
-        directives  = args["--directives"],
+        program         = args["<program>"],
+        directives      = args["--directives"],
+        collapse        = args["--collapse"],
+        collapse_inputs = args["--collapse-inputs"],
+        fold            = args["--fold"],
+        reuse           = args["--reuse"],
+        minimize        = args["--minimize"],
+        eliminate       = args["--eliminate"],
+        only_prints     = args["--only-prints"],
+        fuse            = args["--fuse"],
+        fuse_inputs     = args["--fuse-inputs"],
+        allocate        = args["--allocate"],
+        schedule        = args["--schedule"],
+        verify          = args["--verify"],
+        regex_lexer     = args["--regex-lexer"],
+        stream          = args["--stream"],
     )
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+"""This module assembles programs for the tests the way kas.py does, without going through files.
+
+The optimizing passes are checked by assembling a program as written, running passes over its main circuit
+and proving the result equivalent to the program as written with the <EquivalenceChecker>.
+"""
+import io
+import json
+
+from asm.lexing.lexer import Lexer
+from asm.lexing.regex_lexer import RegexLexer
+from asm.parsing.parser import Parser
+from asm.parsing.stream_parser import StreamParser
+from asm.parsing.grammar import Grammar
+from asm.checking.checker import Checker
+from asm.optimizing.ssa import Function
+from asm.optimizing.equivalence import EquivalenceChecker
+from common.token_stream import TokenRing
+from common.ast import Program
+from common.symbols import SymbolTable
+
+
+def directives(reg_count: int = 4):
+    """Returns the directives of a VM with the given number of registers and the NOT and AND gates."""
+    return json.dumps({
+        "cvm/deterministic": {
+            "reg-count": reg_count,
+            "reg-prefix": "cr",
+            "gates": {
+                "not": [[0, 1], [1, 0]],
+                "and": [[1, 1, 1, 0], [0, 0, 0, 1]],
+            },
+        },
+    })
+
+
+def check(source: str, reg_count: int = 4, collapser = None, stream: bool = False, symbols: SymbolTable = None):
+    """Returns the checker of the given program once it is parsed and checked, reading it in chunks when streaming.
+
+    Raises:
+        CheckError: If the program is not valid.
+    """
+    symbols = SymbolTable() if symbols is None else symbols
+    if stream == True:
+        checker = Checker(Program(), directives(reg_count), collapser)
+        parser = StreamParser(TokenRing(RegexLexer(io.BytesIO(source.encode("utf-8")), chunk_size = 64, symbols = symbols)), Grammar.parselets)
+        checker.check_stream(parser.declarations())
+        return checker
+
+    checker = Checker(Parser(Lexer(source, symbols), Grammar.parselets).parse(), directives(reg_count), collapser)
+    checker.check()
+    return checker
+
+
+def optimize(source: str, passes: list, reg_count: int = 4, collapser = None, schedule = None):
+    """Returns the checker of the given program, the statements of its main circuit once the given passes ran over it
+    and what each pass returned.
+
+    Args:
+        passes(list): The passes to run in order, each a function called with the main circuit in static single assignment form
+            and the checker, which usually returns the pass so that its counts can be checked.
+        schedule(function): The function scheduling the main circuit, given the function, the checker and the main circuit,
+            if the main circuit is lifted back to statements by the scheduler rather than as is. What it returns comes last.
+    """
+    symbols = SymbolTable()
+    checker = check(source, reg_count, collapser, symbols = symbols)
+    main_circuit = checker.program.get_main()
+    function = Function(main_circuit, symbols)
+    results = [run(function, checker) for run in passes]
+
+    if schedule is not None:
+        results.append(schedule(function, checker, main_circuit))
+    else:
+        function.lift(main_circuit)
+
+    return checker, list(main_circuit.stmts), results
+
+
+def prove(source: str, passes: list, reg_count: int = 4, collapser = None, schedule = None, final_state: bool = True):
+    """Returns whether the given program once the given passes ran over it is equivalent to the program as written,
+    its statements and what each pass returned."""
+    checker, statements, results = optimize(source, passes, reg_count, collapser, schedule)
+    reference = list(check(source, reg_count).program.get_main().stmts)
+    return EquivalenceChecker(checker.get_gates(), final_state).prove(reference, statements), statements, results
+
+
+def equivalent(first: str, second: str, reg_count: int = 4, final_state: bool = True):
+    """Returns whether the main circuits of the given programs, as written, are equivalent."""
+    first_checker = check(first, reg_count)
+    second_checker = check(second, reg_count)
+    statements = [list(checker.program.get_main().stmts) for checker in (first_checker, second_checker)]
+    return EquivalenceChecker(first_checker.get_gates(), final_state).prove(statements[0], statements[1])
+
+
+def text(statements: list):
+    """Returns the source of the given statements."""
+    return "".join(str(statement) for statement in statements)
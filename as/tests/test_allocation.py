@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from asm.optimizing.elimination import DeadCodeEliminator
+from asm.optimizing.allocation import RegisterAllocator
+from tests.assembling import prove, text
+
+SOURCE = """circuit main() {
+    cr1 = and(cr0, cr1);
+    cr2 = not(cr1);
+    cr3 = not(cr2);
+    cr4 = and(cr3, cr0);
+    print(cr4);
+}
+"""
+
+
+def allocate(final_state: bool):
+    """Returns the pass allocating registers, the final value of every register being observed if asked."""
+    def run(function, checker):
+        allocator = RegisterAllocator(function, checker.get_reg_prefix(), final_state)
+        allocator.allocate()
+        return allocator
+
+    return run
+
+
+def test_registers_keep_their_final_values():
+    equivalent, statements, (allocator,) = prove(SOURCE, [allocate(True)], reg_count = 5)
+    assert equivalent == True
+    assert allocator.reg_count == 5
+
+
+def test_registers_reused_when_only_prints_are_observed():
+    def eliminate(function, checker):
+        DeadCodeEliminator(function, False).eliminate()
+
+    equivalent, statements, (eliminated, allocator) = prove(SOURCE, [eliminate, allocate(False)], reg_count = 5, final_state = False)
+    assert equivalent == True
+    assert allocator.reg_count < 5
+    assert "cr4" not in text(statements)
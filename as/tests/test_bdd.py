@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from asm.optimizing.bdd import BDD
+from asm.optimizing.minimization import LogicMinimizer
+from common.gate import Gate
+from tests.assembling import prove
+
+# More variables than the default recursion limit, so that a recursive if-then-else runs out of stack
+WIDTH = 3000
+
+AND = Gate("and", [[1, 1, 1, 0], [0, 0, 0, 1]])
+
+
+def chain(width: int):
+    """Returns a main circuit that ANDs each register into the next one over <width> registers then prints the negation of the last one.
+
+    The registers are printed from the last to the first beforehand so that each register is tested before the ones it is ANDed with:
+    every AND adds a node on top of the diagram, which grows one variable deeper at a time.
+    """
+    lines = ["circuit main() {"]
+    lines.extend("    print(cr" + str(index) + ");" for index in reversed(range(width)))
+    lines.extend("    cr" + str(index) + " = and(cr" + str(index - 1) + ", cr" + str(index) + ");" for index in range(1, width))
+    lines.append("    cr0 = not(cr" + str(width - 1) + ");")
+    lines.append("    print(cr0);")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def minimize(function, checker):
+    """Returns the logic minimizer once it ran over the given function."""
+    minimizer = LogicMinimizer(function, checker.get_gates())
+    minimizer.minimize()
+    return minimizer
+
+
+def test_operations():
+    bdd = BDD()
+    x = bdd.variable()
+    y = bdd.variable()
+
+    assert bdd.conjoin(x, bdd.negate(x)) == BDD.FALSE
+    assert bdd.disjoin(x, bdd.negate(x)) == BDD.TRUE
+    assert bdd.differ(bdd.differ(x, y), y) == x
+    assert bdd.conjoin(x, y) == bdd.conjoin(y, x)
+    assert bdd.witness(bdd.conjoin(x, bdd.negate(y))) == [1, 0]
+
+
+def test_apply_follows_the_truth_table():
+    bdd = BDD()
+    x = bdd.variable()
+    y = bdd.variable()
+    half = Gate.from_table("half", 2, 2, (0b00, 0b01, 0b01, 0b10))
+
+    carry, total = bdd.apply(half, [x, y])
+    assert carry == bdd.conjoin(x, y)
+    assert total == bdd.differ(x, y)
+
+
+def test_deep_conjunction():
+    bdd = BDD()
+    variables = [bdd.variable() for index in range(WIDTH)]
+    f = variables[-1]
+    for variable in reversed(variables[:-1]):
+        f = bdd.apply(AND, [variable, f])[0]
+
+    # One node per variable and the two constants
+    assert bdd.size(f) == WIDTH + 2
+    assert bdd.evaluate(f, [1] * WIDTH) == 1
+    assert bdd.evaluate(f, [1] * (WIDTH - 1) + [0]) == 0
+
+    # Negating the conjunction goes through every variable
+    g = bdd.negate(f)
+    assert bdd.size(g) == WIDTH + 2
+    assert bdd.negate(g) == f
+    assert bdd.conjoin(f, g) == BDD.FALSE
+    assert bdd.witness(bdd.differ(f, variables[-1])) == [0] * (WIDTH - 1) + [1]
+
+
+def test_wide_chain_minimized_and_verified():
+    equivalent, statements, results = prove(chain(WIDTH), [minimize], reg_count = WIDTH)
+    assert equivalent == True
+    assert len(statements) == 2 * WIDTH + 1
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from asm.optimizing.collapsing import Collapser
+from asm.optimizing.folding import ConstantFolder
+from tests.assembling import prove, text
+
+CIRCUITS = """circuit half(pr1, pr2) {
+    %pr2 = and(%pr1, %pr2);
+    return not(%pr2);
+}
+
+circuit swap(pr1, pr2) {
+    %pr1 = not(%pr1);
+    return and(%pr1, %pr2);
+}
+
+"""
+
+
+def fold(function, checker):
+    """Returns the constant folder once it ran over the given function, folding into the gates of collapsed circuits."""
+    folder = ConstantFolder(function, checker.get_gates(), checker.collapser.created())
+    folder.fold()
+    return folder
+
+
+def test_calls_collapsed_into_single_applications():
+    source = CIRCUITS + """circuit main() {
+    cr2 = %half(cr0, cr1);
+    cr3 = %half(cr2, cr3);
+    cr1 = %swap(cr0, cr3);
+    print(cr1);
+    print(cr3);
+}
+"""
+    collapser = Collapser()
+    equivalent, statements, results = prove(source, [], collapser = collapser)
+    assert equivalent == True
+    assert collapser.circuits == 2
+    assert collapser.calls == 3
+    assert "and(" not in text(statements)
+    assert len(statements) == 5
+
+
+def test_circuits_wider_than_the_limit_not_collapsed():
+    source = CIRCUITS + """circuit main() {
+    cr2 = %half(cr0, cr1);
+    print(cr2);
+}
+"""
+    collapser = Collapser(1)
+    equivalent, statements, results = prove(source, [], collapser = collapser)
+    assert equivalent == True
+    assert collapser.circuits == 0
+    assert "and(" in text(statements)
+
+
+def test_collapsed_calls_with_known_inputs_folded():
+    source = CIRCUITS + """circuit main() {
+    cr0 = 1b;
+    cr1 = 1b;
+    cr2 = %half(cr0, cr1);
+    cr3 = %half(cr2, cr3);
+    cr1 = %swap(cr0, cr3);
+    print(cr1);
+    print(cr3);
+}
+"""
+    equivalent, statements, (folder,) = prove(source, [fold], collapser = Collapser())
+    assert equivalent == True
+    assert folder.after == 0
+    assert folder.specialized == 0
+    assert "cr2 = 0b;" in text(statements)
+
+
+def test_collapsed_calls_with_some_known_inputs_specialized():
+    source = CIRCUITS + """circuit main() {
+    cr0 = 1b;
+    cr2 = %half(cr0, cr1);
+    print(cr2);
+}
+"""
+    collapser = Collapser()
+    equivalent, statements, (folder,) = prove(source, [fold], collapser = collapser)
+    assert equivalent == True
+    assert folder.after == 1
+    assert folder.specialized == 1
+    assert all(name + "(" not in text(statements) for name in collapser.created())
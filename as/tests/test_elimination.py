@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from asm.optimizing.elimination import DeadCodeEliminator
+from tests.assembling import prove, text
+
+SOURCE = """circuit main() {
+    cr2 = and(cr0, cr1);
+    cr2 = not(cr0);
+    cr3 = not(cr1);
+    print(cr2);
+}
+"""
+
+
+def eliminate(final_state: bool):
+    """Returns the pass removing the dead assignments, the final value of every register being observed if asked."""
+    def run(function, checker):
+        eliminator = DeadCodeEliminator(function, final_state)
+        eliminator.eliminate()
+        return eliminator
+
+    return run
+
+
+def test_overwritten_assignment_removed():
+    equivalent, statements, (eliminator,) = prove(SOURCE, [eliminate(True)])
+    assert equivalent == True
+    assert eliminator.before == 4
+    assert eliminator.after == 3
+    assert eliminator.applications == 1
+    assert "and(" not in text(statements)
+
+
+def test_unprinted_assignments_removed_when_only_prints_are_observed():
+    equivalent, statements, (eliminator,) = prove(SOURCE, [eliminate(False)], final_state = False)
+    assert equivalent == True
+    assert text(statements) == "cr2 = not(cr0);\nprint(cr2);\n"
+
+    # The final value of cr3 is lost, which only matters when the final state is observed
+    equivalent, statements, results = prove(SOURCE, [eliminate(False)])
+    assert equivalent == False
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from asm.optimizing.folding import ConstantFolder
+from tests.assembling import prove, text
+
+
+def fold(function, checker):
+    """Returns the constant folder once it ran over the given function."""
+    folder = ConstantFolder(function, checker.get_gates())
+    folder.fold()
+    return folder
+
+
+def test_known_inputs_folded():
+    source = """circuit main() {
+    cr0 = 1b;
+    cr1 = 0b;
+    cr2 = and(cr0, cr1);
+    cr3 = not(cr2);
+    print(cr3);
+}
+"""
+    equivalent, statements, (folder,) = prove(source, [fold])
+    assert equivalent == True
+    assert folder.before == 2
+    assert folder.after == 0
+    assert "cr3 = 1b;" in text(statements)
+
+
+def test_moves_of_known_values_folded():
+    source = """circuit main() {
+    cr0 = 1b;
+    cr1 = cr0;
+    cr2 = not(cr1);
+    print(cr2);
+}
+"""
+    equivalent, statements, (folder,) = prove(source, [fold])
+    assert equivalent == True
+    assert text(statements) == "cr0 = 1b;\ncr1 = 1b;\ncr2 = 0b;\nprint(cr2);\n"
+
+
+def test_unknown_inputs_kept():
+    source = """circuit main() {
+    cr1 = 1b;
+    cr2 = and(cr0, cr1);
+    cr3 = not(cr0);
+    print(cr2);
+}
+"""
+    equivalent, statements, (folder,) = prove(source, [fold])
+    assert equivalent == True
+    assert folder.after == folder.before == 2
+    assert "cr2 = and(cr0, cr1);" in text(statements)
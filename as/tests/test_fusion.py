@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import pytest
+
+from asm.optimizing.fusion import Fuser
+from common.ast import GateExpression
+from tests.assembling import prove
+
+SOURCE = """circuit main() {
+    cr2 = and(cr0, cr1);
+    cr2 = not(cr2);
+    cr3 = and(cr2, cr3);
+    cr3 = not(cr3);
+    print(cr3);
+}
+"""
+
+
+def fuse(max_inputs: int):
+    """Returns the pass fusing gate applications into composite gates with at most the given number of inputs."""
+    def run(function, checker):
+        fuser = Fuser(function, checker.get_gates(), max_inputs)
+        fuser.fuse()
+        return fuser
+
+    return run
+
+
+def applied(statements: list):
+    """Returns the gate expressions the given statements apply."""
+    return [statement.expr.rval for statement in statements if isinstance(getattr(statement.expr, "rval", None), GateExpression)]
+
+
+@pytest.mark.parametrize("max_inputs", [1, 2, 3, 4, 8])
+def test_fused_program_is_equivalent(max_inputs):
+    equivalent, statements, (fuser,) = prove(SOURCE, [fuse(max_inputs)])
+    assert equivalent == True
+    assert fuser.before == 4
+    assert fuser.after == len(applied(statements))
+
+    # No composite gate takes more inputs than allowed, unless it is one of the gates of the program
+    for rval in applied(statements):
+        assert len(rval.args) <= max(max_inputs, 2)
+
+
+def test_chains_fused_into_composite_gates():
+    equivalent, statements, (fuser,) = prove(SOURCE, [fuse(4)])
+    assert equivalent == True
+
+    # The final value of cr2 is observed so the chain is cut there, and both halves are the same NAND composite gate
+    assert fuser.after == 2
+    assert fuser.composites == 1
+
+
+def test_value_read_twice_is_not_fused_away():
+    source = """circuit main() {
+    cr2 = and(cr0, cr1);
+    cr3 = not(cr2);
+    print(cr2);
+    print(cr3);
+}
+"""
+    equivalent, statements, (fuser,) = prove(source, [fuse(8)])
+    assert equivalent == True
+    assert fuser.after == 2
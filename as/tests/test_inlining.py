@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import pytest
+
+from tests.assembling import check, equivalent, text
+
+DEPTH = 3000
+
+
+def make_source(depth: int):
+    """Returns a program of <depth> circuits, each calling the circuit before it once, main calling the last one."""
+    circuits = ["circuit c0(pr1, pr2) {\n    %pr1 = and(%pr1, %pr2);\n    return not(%pr1);\n}\n\n"]
+    for index in range(1, depth):
+        circuits.append("circuit c{0}(pr1, pr2) {{\n    %pr1 = %c{1}(%pr1, %pr2);\n    return not(%pr1);\n}}\n\n".format(index, index - 1))
+
+    main = "circuit main() {{\n    cr0 = 0b;\n    cr1 = 1b;\n    cr1 = %c{0}(cr0, cr1);\n    print(cr1);\n}}\n".format(depth - 1)
+    return "".join(circuits) + main
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_deep_call_chain_inlined(stream):
+    statements = list(check(make_source(DEPTH), stream = stream).program.get_main().stmts)
+    # The NOT of each circuit, the AND of the first one and the four statements of main
+    assert len(statements) == DEPTH + 4
+    assert text(statements).count("not(") == DEPTH
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_call_chains_print_their_value(depth):
+    # c0 returns 1 from 0 and 1, so c<i> returns 1 when <i> is even
+    bit = "1b" if (depth - 1) % 2 == 0 else "0b"
+    expected = "circuit main() {\n    cr0 = 0b;\n    cr1 = " + bit + ";\n    print(cr1);\n}\n"
+    assert equivalent(make_source(depth), expected, final_state = False) == True
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import pytest
+
+import kas
+from tests.assembling import directives
+
+SOURCE = """circuit main() {
+    cr2 = and(cr0, cr1);
+    cr2 = not(cr2);
+    print(cr2);
+}
+"""
+
+
+@pytest.fixture
+def paths(tmp_path):
+    """Returns the paths of a program file and its directives file."""
+    program = tmp_path / "program.al"
+    program.write_text(SOURCE)
+    directives_file = tmp_path / "directives.json"
+    directives_file.write_text(directives())
+    return str(program), str(directives_file)
+
+
+@pytest.mark.parametrize("options, message", [
+    ({"fold": True, "fuse": True, "fuse_inputs": "x"}, "The maximum number of inputs of a composite gate <x> must be a whole number.\n"),
+    ({"collapse": True, "collapse_inputs": "-2"}, "The maximum number of parameters of a collapsed circuit <-2> must be a whole number.\n"),
+])
+def test_invalid_numbers_reported_before_any_work(paths, capsys, options, message):
+    kas.main(program = paths[0], directives = paths[1], **options)
+    assert capsys.readouterr().out == message
+
+
+def test_optimized_and_verified(paths, capsys):
+    kas.main(program = paths[0], directives = paths[1], fold = True, fuse = True, fuse_inputs = "3", verify = True)
+    out = capsys.readouterr().out
+    assert "[Optimizing] Fused gate applications: <2> APPLY instructions down to <1>" in out
+    assert "[Verifying] The assembled program is equivalent to the program as written." in out
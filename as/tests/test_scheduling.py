@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from common.ast import VectorStatement
+from asm.optimizing.scheduling import Scheduler
+from tests.assembling import prove
+
+WIDTH = 600
+
+
+def levelize(max_tuples: int = 255):
+    """Returns the function scheduling the main circuit into vector applications of at most the given number of applications."""
+    def run(function, checker, circuit):
+        scheduler = Scheduler(function, circuit, max_tuples)
+        scheduler.schedule()
+        return scheduler
+
+    return run
+
+
+def test_independent_applications_vectorized():
+    source = """circuit main() {
+    cr2 = and(cr0, cr1);
+    cr3 = and(cr1, cr0);
+    cr0 = not(cr2);
+    cr1 = not(cr3);
+    print(cr0);
+    print(cr1);
+}
+"""
+    equivalent, statements, (scheduler,) = prove(source, [], schedule = levelize())
+    assert equivalent == True
+    assert scheduler.before == 4
+    assert scheduler.after == 2
+    assert scheduler.vectors == 2
+    assert scheduler.levels == 4
+    assert [len(statement.stmts) for statement in statements if isinstance(statement, VectorStatement)] == [2, 2]
+
+
+def test_dependent_applications_kept_apart():
+    source = """circuit main() {
+    cr2 = and(cr0, cr1);
+    cr3 = not(cr2);
+    cr2 = not(cr3);
+    print(cr2);
+}
+"""
+    equivalent, statements, (scheduler,) = prove(source, [], schedule = levelize())
+    assert equivalent == True
+    assert scheduler.vectors == 0
+    assert scheduler.after == scheduler.before == 3
+
+
+def test_wide_level_split_into_bounded_vectors():
+    lines = ["    cr{0} = not(cr{0});\n".format(index) for index in range(WIDTH)]
+    source = "circuit main() {\n" + "".join(lines) + "    print(cr0);\n}\n"
+    equivalent, statements, (scheduler,) = prove(source, [], reg_count = WIDTH, schedule = levelize(255))
+    assert equivalent == True
+    assert scheduler.levels == 2
+    assert scheduler.vectors == 3
+    assert [len(statement.stmts) for statement in statements if isinstance(statement, VectorStatement)] == [255, 255, 90]
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from asm.optimizing.collapsing import Collapser
+from asm.optimizing.ssa import Function, Instruction
+from common.symbols import SymbolTable
+from tests.assembling import check, prove, text
+
+SOURCE = """circuit main() {
+    cr0 = 1b;
+    cr2 = and(cr0, cr1);
+    cr2 = not(cr2);
+    cr3 = cr2;
+    cr1 = not(cr3);
+    print(cr1);
+}
+"""
+
+
+def lower(source: str, collapser = None):
+    """Returns the main circuit of the given program and its static single assignment form."""
+    symbols = SymbolTable()
+    main_circuit = check(source, collapser = collapser, symbols = symbols).program.get_main()
+    return main_circuit, Function(main_circuit, symbols)
+
+
+def test_lifting_gives_back_the_statements():
+    main_circuit, function = lower(SOURCE)
+    written = text(main_circuit.stmts)
+    function.lift(main_circuit)
+    assert text(main_circuit.stmts) == written
+
+
+def test_each_assignment_defines_a_new_version():
+    main_circuit, function = lower(SOURCE)
+    kinds = [instruction.kind for instruction in function.instructions]
+    assert kinds == [Instruction.LITERAL, Instruction.GATE, Instruction.GATE, Instruction.MOVE, Instruction.GATE, Instruction.EFFECT]
+
+    first, second = function.instructions[1].results[0], function.instructions[2].results[0]
+    assert (first.register, first.version) == ("cr2", 1)
+    assert (second.register, second.version) == ("cr2", 2)
+    assert second.previous is first and first.next is second
+    assert function.instructions[2].operands == [first]
+    assert first.uses == [function.instructions[2]]
+
+    # The initial value of cr1 is read before cr1 is assigned
+    initial = function.instructions[1].operands[1]
+    assert (initial.register, initial.version, initial.instruction) == ("cr1", 0, None)
+
+
+def test_multiple_assignments_round_trip():
+    source = """circuit half(pr1, pr2) {
+    %pr2 = and(%pr1, %pr2);
+    return not(%pr2);
+}
+
+circuit main() {
+    cr2 = %half(cr0, cr1);
+    cr3 = %half(cr2, cr3);
+    print(cr3);
+}
+"""
+    main_circuit, function = lower(source, Collapser())
+    written = text(main_circuit.stmts)
+    assert len(function.instructions[0].results) == 2
+    function.lift(main_circuit)
+    assert text(main_circuit.stmts) == written
+
+    equivalent, statements, results = prove(source, [], collapser = Collapser())
+    assert equivalent == True
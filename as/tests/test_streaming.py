@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import pytest
+
+from asm.checking.exceptions import CheckError
+from tests.assembling import check, text
+
+NAND = """circuit nand(pr1, pr2) {
+    %pr1 = and(%pr1, %pr2);
+    return not(%pr1);
+}
+
+"""
+
+INVALID = {
+    "unknown circuit": NAND + "circuit main() {\n    cr2 = %nor(cr0, cr1);\n}\n",
+    "wrong argument count": NAND + "circuit main() {\n    cr2 = %nand(cr0);\n}\n",
+    "recursive call": "circuit loop(pr1) {\n    %pr1 = %loop(%pr1);\n    return not(%pr1);\n}\n\ncircuit main() {\n    cr0 = %loop(cr0);\n}\n",
+    "statement after return": "circuit nand(pr1, pr2) {\n    return not(%pr1);\n    %pr1 = and(%pr1, %pr2);\n}\n\ncircuit main() {\n    cr2 = %nand(cr0, cr1);\n}\n",
+    "literal outside main": "circuit one(pr1) {\n    %pr1 = 1b;\n    return not(%pr1);\n}\n\ncircuit main() {\n    cr0 = %one(cr0);\n}\n",
+    "invalid parameter": "circuit nand(pr1, pr2) {\n    %pr1 = and(%pr1, %pr3);\n    return not(%pr1);\n}\n\ncircuit main() {\n    cr2 = %nand(cr0, cr1);\n}\n",
+    "return in main": "circuit main() {\n    return not(cr0);\n}\n",
+}
+
+
+@pytest.mark.parametrize("name", sorted(INVALID))
+def test_streaming_reports_the_same_errors(name):
+    with pytest.raises(CheckError) as expected:
+        check(INVALID[name])
+
+    with pytest.raises(CheckError) as streamed:
+        check(INVALID[name], stream = True)
+
+    assert str(streamed.value) == str(expected.value)
+
+
+def test_circuits_declared_after_their_callers():
+    source = """circuit or(pr1, pr2) {
+    %pr1 = %nand(%pr1, %pr1);
+    %pr2 = %nand(%pr2, %pr2);
+    return %nand(%pr1, %pr2);
+}
+
+circuit main() {
+    cr2 = %or(cr0, cr1);
+    print(cr2);
+}
+
+""" + NAND
+    checked = text(check(source).program.get_main().stmts)
+    assert text(check(source, stream = True).program.get_main().stmts) == checked
+    assert checked.count("and(") == 3
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from asm.optimizing.subexpressions import SubexpressionEliminator
+from tests.assembling import prove, text
+
+
+def reuse(function, checker):
+    """Returns the subexpression eliminator once it ran over the given function."""
+    eliminator = SubexpressionEliminator(function, checker.get_gates())
+    eliminator.eliminate()
+    return eliminator
+
+
+def test_repeated_application_reused():
+    source = """circuit main() {
+    cr2 = and(cr0, cr1);
+    cr3 = and(cr1, cr0);
+    cr2 = not(cr2);
+    cr3 = not(cr3);
+    print(cr3);
+}
+"""
+    equivalent, statements, (eliminator,) = prove(source, [reuse])
+    assert equivalent == True
+    assert eliminator.before == 4
+    assert eliminator.after == 2
+
+
+def test_application_to_overwritten_register_not_reused():
+    source = """circuit main() {
+    cr2 = and(cr0, cr1);
+    cr0 = not(cr0);
+    cr3 = and(cr0, cr1);
+    print(cr2);
+    print(cr3);
+}
+"""
+    equivalent, statements, (eliminator,) = prove(source, [reuse])
+    assert equivalent == True
+    assert eliminator.after == eliminator.before == 3
+    assert text(statements).count("and(") == 2
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from tests.assembling import check, equivalent, text
+
+SOURCE = """circuit nand(pr1, pr2) {
+    %pr1 = and(%pr1, %pr2);
+    return not(%pr1);
+}
+
+circuit or(pr1, pr2) {
+    %pr1 = %nand(%pr1, %pr1);
+    %pr2 = %nand(%pr2, %pr2);
+    return %nand(%pr1, %pr2);
+}
+
+circuit main() {
+    cr2 = %or(cr0, cr1);
+    cr3 = %or(cr2, cr0);
+    print(cr3);
+}
+"""
+
+INLINED = """circuit main() {
+    cr0 = and(cr0, cr0);
+    cr0 = not(cr0);
+    cr1 = and(cr1, cr1);
+    cr1 = not(cr1);
+    cr0 = and(cr0, cr1);
+    cr2 = not(cr0);
+    cr2 = and(cr2, cr2);
+    cr2 = not(cr2);
+    cr0 = and(cr0, cr0);
+    cr0 = not(cr0);
+    cr2 = and(cr2, cr0);
+    cr3 = not(cr2);
+    print(cr3);
+}
+"""
+
+
+def test_circuits_called_many_times_instantiated_for_each_call():
+    statements = list(check(SOURCE).program.get_main().stmts)
+    assert text(statements).count("and(") == 6
+    assert equivalent(SOURCE, INLINED) == True
+
+
+def test_instances_do_not_share_arguments():
+    source = SOURCE.replace("cr3 = %or(cr2, cr0);", "cr3 = %or(cr1, cr3);")
+    assert equivalent(source, SOURCE) == False
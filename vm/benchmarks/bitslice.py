@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+"""This module measures how long it takes to compute the full truth table of a circuit.
+
+The circuit ORs a number of registers together using the OR circuit built from NAND circuits
+found in the examples, with NAND itself built from the AND and NOT gates.
+We compare running the VM once per assignment of the input registers against
+running the bit-sliced VM once with one lane per assignment.
+
+Example:
+    The benchmark accepts an optional number of input registers (twelve by default)
+        $ python bitslice.py 16
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from common.operations import OpCode
+from common.operands import OpType
+from common.directives import Directives, Operator
+from common.bytecode import Bytecode
+from vm.vmachine import VMachine
+from vm.registers import RegisterFile
+from vm.bitslice import BitSliceVMachine, exhaustive_inputs
+
+
+def make_directives(count: int):
+    """Configure the VM with the NOT and AND gates."""
+    directives = Directives()
+    directives.set_main("main")
+    directives.set_regcount(count)
+    directives.add_operator(Operator(0, "not", 1, [[0, 1], [1, 0]]))
+    directives.add_operator(Operator(1, "and", 2, [[1, 1, 1, 0], [0, 0, 0, 1]]))
+    return directives
+
+
+def make_bytecode(count: int):
+    """Create a program that ORs registers 0 to <count - 1> into the last register."""
+    def apply(operator, *registers):
+        code = [OpCode.APPLY, operator]
+        for register in registers:
+            code = code + [OpType.REGISTER, register]
+        return code
+
+    code = []
+    for register in range(1, count):
+        accumulator = register - 1
+        # %or(accumulator, register) folded into AND and NOT gates
+        code = code + apply(1, accumulator, accumulator, accumulator) + apply(0, accumulator, accumulator)
+        code = code + apply(1, register, register, register) + apply(0, register, register)
+        code = code + apply(1, accumulator, register, accumulator) + apply(0, accumulator, register)
+
+    bytecode = Bytecode()
+    bytecode.code = bytearray(code)
+    return bytecode
+
+
+def run_scalar(directives: Directives, bytecode: Bytecode, count: int):
+    """Run the VM once per assignment of the input registers and return the truth table of the last register."""
+    vmachine = VMachine(directives, bytecode)
+    table = []
+    for assignment in range(1 << count):
+        vmachine._registers = RegisterFile(count)
+        vmachine._registers.write_many(range(count), assignment)
+        vmachine.ip = 0
+        vmachine.run()
+        table.append(vmachine._registers.read(count - 1))
+
+    return table
+
+
+def run_bitsliced(directives: Directives, bytecode: Bytecode, count: int):
+    """Run the bit-sliced VM once over all assignments of the input registers and return the truth table of the last register."""
+    vmachine = BitSliceVMachine(directives, bytecode, 1 << count)
+    vmachine.load(exhaustive_inputs(count))
+    vmachine.run()
+    value = vmachine.state()[count - 1]
+    return [(value >> lane) & 1 for lane in range(1 << count)]
+
+
+def main(count: int):
+    directives = make_directives(count)
+    bytecode = make_bytecode(count)
+
+    start = time.perf_counter()
+    scalar = run_scalar(directives, bytecode, count)
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bitsliced = run_bitsliced(directives, bytecode, count)
+    bitsliced_time = time.perf_counter() - start
+
+    if scalar != bitsliced:
+        raise AssertionError("The bit-sliced VM computed a different truth table than the VM.")
+
+    print("Input registers : {0}".format(count))
+    print("Assignments     : {0:,}".format(1 << count))
+    print("one run each    : {0:.3f}s".format(scalar_time))
+    print("bit-sliced      : {0:.3f}s".format(bitsliced_time))
+    print("speedup         : {0:.1f}x".format(scalar_time / bitsliced_time))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 12)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+"""This module measures how many instructions per second the VM dispatches.
+
+It compares the pre-decoded program executed by the VM against the if...elif...else chain over raw bytes it replaced
+by running both over the same synthetic program made of APPLY and PRINT instructions.
+The chain is the first version of the VM, kept in baseline.py. It only prints a message where the VM computes
+the output of an APPLY instruction and writes it to its registers, so it does less work per instruction than the VM.
+The same program compiled into Python functions is measured as well, once compiled whatever its length
+and once as the compiling VM runs it without a cache, interpreting programs longer than its limit.
+The speedups compare the time it takes to load and run the program: the chain needs no loading and the VM
+decodes the program as it runs it, while the compiling VM decodes and compiles the whole program before running anything.
+Anything the instructions write to standard output is discarded so only execution is measured.
+
+Example:
+    The benchmark accepts an optional instruction count (one million by default)
+        $ python dispatch.py 5000000
+"""
+import os
+import sys
+import time
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from common.operations import OpCode
+from common.operands import OpType
+from common.directives import Directives, Operator
+from common.bytecode import Bytecode
+from vm.vmachine import VMachine
+from vm.jit import JitVMachine
+from baseline import VMachine as BaselineVMachine
+
+
+class NullOutput(object):
+    """A stream that swallows everything written to it."""
+    def write(self, data):
+        pass
+
+    def flush(self):
+        pass
+
+
+def make_directives():
+    """Configure the VM with the NOT and AND gates."""
+    directives = Directives()
+    directives.set_main("main")
+    directives.set_regcount(4)
+    directives.add_operator(Operator(0, "not", 1, [[0, 1], [1, 0]]))
+    directives.add_operator(Operator(1, "and", 2, [[1, 1, 1, 0], [0, 0, 0, 1]]))
+    return directives
+
+
+def make_bytecode(count: int):
+    """Create a program of <count> instructions cycling through NOT, AND and PRINT."""
+    pattern = bytearray([
+        OpCode.APPLY, 0, OpType.REGISTER, 0, OpType.REGISTER, 1,
+        OpCode.APPLY, 1, OpType.REGISTER, 1, OpType.REGISTER, 2, OpType.REGISTER, 3,
+        OpCode.PRINT, OpType.REGISTER, 3,
+    ])
+    bytecode = Bytecode()
+    bytecode.code = pattern * (count // 3) + pattern[:6] * (count % 3)
+    return bytecode
+
+
+def measure(machine_class, directives: Directives, bytecode: Bytecode, count: int):
+    """Load the program on a fresh VM of the given class then return the time it took to load it and to run it."""
+    start = time.perf_counter()
+    vmachine = machine_class(directives, bytecode)
+    loading = time.perf_counter() - start
+
+    with contextlib.redirect_stdout(NullOutput()):
+        start = time.perf_counter()
+        vmachine.run()
+        elapsed = time.perf_counter() - start
+
+    return loading, elapsed
+
+
+def main(count: int):
+    directives = make_directives()
+    bytecode = make_bytecode(count)
+
+    chain_loading, chain = measure(BaselineVMachine, directives, bytecode, count)
+    loading, decoded = measure(VMachine, directives, bytecode, count)
+    compiling, compiled = measure(lambda directives, bytecode: JitVMachine(directives, bytecode, limit=None), directives, bytecode, count)
+    jit_loading, jit = measure(JitVMachine, directives, bytecode, count)
+
+    print("Instructions executed : {0:,}".format(count))
+    print("if...elif chain       : {0:.3f}s ({1:,.0f} instructions/s)".format(chain_loading + chain, count / chain))
+    print("decoded program       : {0:.3f}s, loaded in {1:.3f}s then decoded and run in {2:.3f}s ({3:,.0f} instructions/s)".format(loading + decoded, loading, decoded, count / decoded))
+    print("compiled program      : {0:.3f}s, decoded and compiled in {1:.3f}s then run in {2:.3f}s ({3:,.0f} instructions/s)".format(compiling + compiled, compiling, compiled, count / compiled))
+    print("compiling VM          : {0:.3f}s, {1} since its limit is {2:,} instructions".format(jit_loading + jit, "interpreted without a cache" if count > JitVMachine.limit else "compiled", JitVMachine.limit))
+    print("speedup, load and run : {0:.2f}x decoded, {1:.2f}x compiled, {2:.2f}x compiling VM".format((chain_loading + chain) / (loading + decoded), (chain_loading + chain) / (compiling + compiled), (chain_loading + chain) / (jit_loading + jit)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -9,6 +9,8 @@ Maintainer      : Ntwali Bashige
 Email           : ntwali.bashige@gmail.com
 """
 
+import mmap
+
 from common.operations import OpCode
 
 class Bytecode(object):
@@ -18,14 +20,53 @@ class Bytecode(object):
     We may write this array to a file and allow any other program to read and interpret its content.
 
     Attributes:
-        code (bytearray): An array holding integers of bounded between 0 and 255.
+        code (bytearray|memoryview): An array holding integers of bounded between 0 and 255.
+            When the bytecode is loaded from a file, this is a read-only view of the memory mapped file.
 
     Note:
         - Think about implementing a buffered append so that we do not need to append a single byte at a time.
-        - Add method to load bytecode from a file.
     """
     code = bytearray()
 
+    # The memory mapped file the bytecode was loaded from, if any
+    _mapping = None
+
+    def __init__(self):
+        self.code = bytearray()
+        self._mapping = None
+
+    def load(self, path: str, offset: int = 0, length: int = None):
+        """Map the bytecode found in the given file into memory and expose it without copying it.
+
+        Pages of the file are only read when the VM touches them and they are shared with every other process
+        mapping the same file. The bytecode may be a part of the file, such as an uncompressed member of a ZIP file.
+
+        Args:
+            path(str): The file holding the bytecode.
+            offset(int): The offset at which the bytecode begins in the file.
+            length(int): The number of bytes of bytecode, up to the end of the file if not given.
+
+        Raises:
+            OSError: If the file cannot be opened.
+            ValueError: If the bytecode doesn't fit within the file.
+        """
+        with open(path, "rb") as bytecode_file:
+            size = bytecode_file.seek(0, 2)
+            if length is None:
+                length = size - offset
+
+            if offset < 0 or length < 0 or offset + length > size:
+                raise ValueError("The bytecode at offset <" + str(offset) + "> with length <" + str(length) + "> doesn't fit in the file <" + path + ">.")
+
+            # Empty files cannot be mapped
+            if length == 0:
+                self.code = bytearray()
+                return
+
+            self._mapping = mmap.mmap(bytecode_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        self.code = memoryview(self._mapping)[offset : offset + length]
+
     def length(self):
         """Retuns the number of bytes held in the bytecode"""
         return len(self.code)
@@ -34,13 +75,17 @@ class Bytecode(object):
         """This method appends a new byte to the bytecode.
 
         As we receive new bytes, this method validates the new byte and append it to the bytecode.
+        Bytecode loaded from a file is a read-only view of the file and cannot be appended to.
 
         Args:
             byte(OpCode|int): The byte to append to the bytecode
 
         Raises:
-            ValueError: If byte is not an integer between 0 and 255
+            ValueError: If byte is not an integer between 0 and 255 or the bytecode was loaded from a file
         """
+        if self._mapping is not None:
+            raise ValueError("Cannot append to the bytecode loaded from a file. The bytecode of a file is mapped into memory as read-only.")
+
         # If we are given an opcode directly but not as an integer, we convert it to an integer
         if isinstance(byte, OpCode) == True:
             byte = int(byte)
@@ -18,13 +18,18 @@ class Directives(object):
 
     Attributes:
         main (string): The name of the entry circuit.
-        operators(array): A list of operators. Each entry is a dictionary with the operator name, size and the matrix.
+        operators(array): A list of operators. Each entry is an operator with its id, name, size and the matrix.
         regcount(int): The number of registers to be allocated by the VM.
     """
     main = ""
     regcount = 0
     operators = []
 
+    def __init__(self):
+        self.main = ""
+        self.regcount = 0
+        self.operators = []
+
     def set_main(self, main: str):
         """Set the name of the circuit to serve as entry point."""
         self.main = main
@@ -33,6 +38,27 @@ class Directives(object):
         """Set the number of registers to be initialized by the VM"""
         self.regcount = regcount
 
-    def add_operator(self, operator: dict):
+    def add_operator(self, operator):
         """Add an operator to the operators list"""
         self.operators.append(operator)
+
+
+class Operator(object):
+    """A gate the virtual machine is configured with.
+
+    Attributes:
+        id(int): The index of the operator as referenced by the APPLY instruction.
+        name(str): The name of the gate as given in the directives file.
+        size(int): The number of inputs the operator accepts.
+        matrix(list): The matrix representing the operator.
+    """
+    id = 0
+    name = ""
+    size = 0
+    matrix = []
+
+    def __init__(self, id: int, name: str, size: int, matrix: list):
+        self.id = id
+        self.name = name
+        self.size = size
+        self.matrix = matrix
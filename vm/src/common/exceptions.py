@@ -13,5 +13,9 @@ class RuntimeError(Exception):
     pass
 
 
+class UnsupportedInstructionError(RuntimeError):
+    pass
+
+
 class CompilationError(Exception):
     pass
@@ -16,6 +16,7 @@ class OpCode(IntEnum):
     PRINT = 0
     MOV = 1
     APPLY = 2
+    VAPPLY = 3
 
     def is_unary(self):
         """Returns true if the current instruction accepts a single operand
@@ -49,3 +50,14 @@ class OpCode(IntEnum):
             return True
         else:
             return False
+
+    def is_vector_apply(self):
+        """Returns true if the current instruction is the vector APPLY instruction.
+
+        The vector APPLY instruction applies one operator to many tuples of registers so, unlike the other instructions,
+        the number of bytes to read depends on the number of tuples found after the operator byte.
+        """
+        if self.value == 3:
+            return True
+        else:
+            return False
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import json
+import struct
+import zipfile
+
+from common.directives import Directives, Operator
+from common.bytecode import Bytecode
+
+class Package(object):
+    """The ZIP file produced by the assembler, holding the bytecode and the directives of a program.
+
+    The bytecode is found in the <bytecode> member and the directives in the <directives.json> member.
+
+    Attributes:
+        path(str): The path to the ZIP file.
+    """
+    path = ""
+
+    # The names of the members of the package
+    _bytecode = "bytecode"
+    _directives = "directives.json"
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def bytecode(self):
+        """Returns the bytecode of the program.
+
+        When the bytecode member is stored uncompressed, it is memory mapped straight from the package without any copy.
+        Otherwise it has to be decompressed into memory.
+
+        Raises:
+            OSError: If the package cannot be read.
+            ValueError: If the package is not a valid ZIP file or has no bytecode.
+        """
+        bytecode = Bytecode()
+        try:
+            with zipfile.ZipFile(self.path) as package:
+                info = package.getinfo(self._bytecode)
+                if info.compress_type != zipfile.ZIP_STORED:
+                    bytecode.code = bytearray(package.read(info))
+                    return bytecode
+        except (zipfile.BadZipFile, KeyError) as error:
+            raise ValueError("The package <" + self.path + "> is not a valid package: " + str(error) + ".")
+
+        # The data begins after the local file header whose name and extra field lengths may differ from the central directory
+        with open(self.path, "rb") as package_file:
+            package_file.seek(info.header_offset)
+            header = package_file.read(30)
+
+        if len(header) != 30 or struct.unpack("<I", header[:4])[0] != 0x04034b50:
+            raise ValueError("The package <" + self.path + "> has a corrupted bytecode member.")
+
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        bytecode.load(self.path, info.header_offset + 30 + name_length + extra_length, info.file_size)
+        return bytecode
+
+    def directives(self):
+        """Returns the directives of the program.
+
+        Raises:
+            OSError: If the package cannot be read.
+            ValueError: If the package is not a valid ZIP file or has no valid directives.
+        """
+        try:
+            with zipfile.ZipFile(self.path) as package:
+                data = package.read(self._directives)
+        except (zipfile.BadZipFile, KeyError) as error:
+            raise ValueError("The package <" + self.path + "> is not a valid package: " + str(error) + ".")
+
+        return load_directives(data.decode("utf-8"))
+
+
+def load_directives(source: str):
+    """Returns the directives found in the given content of a directives file.
+
+    The gates are turned into operators numbered in the order in which they appear in the file.
+
+    Raises:
+        ValueError: If the content is not valid JSON or doesn't configure a classical deterministic virtual machine.
+    """
+    vm_id = "cvm/deterministic"
+    try:
+        data = json.loads(source)[vm_id]
+        regcount = data["reg-count"]
+        gates = data["gates"]
+    except (json.JSONDecodeError, TypeError, KeyError):
+        raise ValueError("Expected directives with the register count and the gates of the <" + vm_id + "> virtual machine.")
+
+    if isinstance(regcount, int) == False or isinstance(gates, dict) == False:
+        raise ValueError("Expected directives with the register count and the gates of the <" + vm_id + "> virtual machine.")
+
+    directives = Directives()
+    directives.set_main("main")
+    directives.set_regcount(regcount)
+    for opindex, (name, matrix) in enumerate(gates.items()):
+        # Only the shape of the matrix is checked here, the VM checks its size against the number of inputs and outputs
+        if isinstance(matrix, list) == False or any(isinstance(row, list) == False or any(isinstance(entry, (int, float)) == False for entry in row) for row in matrix):
+            raise ValueError("The matrix of the gate <" + name + "> must be a list of rows of numbers.")
+
+        columns = len(matrix[0]) if len(matrix) > 0 else 0
+        if columns == 0 or columns & (columns - 1) != 0:
+            raise ValueError("The matrix of the gate <" + name + "> must have a number of columns that is a power of two.")
+
+        directives.add_operator(Operator(opindex, name, columns.bit_length() - 1, matrix))
+
+    return directives
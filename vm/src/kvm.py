@@ -13,37 +13,179 @@ Email           : ntwali.bashige@gmail.com
 """This module runs the VM, executing the given bytecode.
 
 This is the module that's called to start execution of the virtual machine.
-It receives a file containing the bytecode as argument then calls the virtual machine execute method
-to interpret the given bytecode.
+It receives the package produced by the assembler, or a file containing the bytecode along with the directives file,
+as argument then calls the virtual machine execute method to interpret the given bytecode.
+The bytecode is memory mapped rather than read so that even very large programs start right away.
 
 Example:
     The module can be passed as argument to the Python interpreter
-        $ python vm.py bytecode.kar
+        $ python vm.py program.zip
 
     Or it can be invoked directly and leave it to the terminal to invoke Python
-        $ ./vm.py bytecode.kar
+        $ ./vm.py program.zip
 
-TODO:
-    Accept the binary file containing the bytecode as argument.
+    A bytecode file outside of a package needs the directives file
+        $ ./vm.py bytecode.kar --directives=directives.json
+
+    To compile the bytecode into a Python function before running it
+        $ ./vm.py bytecode.kar --jit
+
+    Compiled programs are cached so running the same bytecode again skips compilation.
+    The cache directory and its size in megabytes can be chosen, or the cache disabled
+        $ ./vm.py bytecode.kar --jit --cache=/tmp/arklight --cache-size=64
+        $ ./vm.py bytecode.kar --jit --no-cache
+
+    Compiling costs several times what interpreting the program once does, so without the cache,
+    programs of more than 16384 instructions by default are interpreted even with --jit, which is then reported
+        $ ./vm.py bytecode.kar --jit --no-cache --jit-limit=100000
+
+    To run the bytecode over many initial register assignments at once, give the number of lanes
+    and a file with one row per lane holding the initial value of the first registers
+        $ ./vm.py bytecode.kar --lanes=1024 --inputs=inputs.txt
+
+    When every gate is deterministic, the lanes are bit-sliced: lane <k> lives in bit <k> of every register
+    and each gate is a few integer operations for all lanes at once. Otherwise the lanes are vectorized with NumPy,
+    which is also used when bit-slicing is turned off
+        $ ./vm.py bytecode.kar --lanes=1024 --inputs=inputs.txt --no-bitslice
 """
-from common.operations import OpCode
-from common.operands import OpType
-from common.directives import Directives
+import sys
+import numpy
+from docopt import docopt
+
 from common.bytecode import Bytecode
+from common.package import Package, load_directives
 from vm.vmachine import VMachine
+from vm.batch import BatchVMachine
+from vm.bitslice import BitSliceVMachine, packed_inputs
+from vm.operators import compile_table
+from vm.jit import JitVMachine
+from vm.cache import CodeCache, default_directory
+
+def main(**kwargs):
+    """Configure the VM and run the bytecode.
+
+    If a number of lanes or an input matrix is given, the VM runs in batch mode:
+    each row of the input matrix is the initial value of the first registers in one lane.
+    The lanes are bit-sliced unless some gate isn't deterministic or bit-slicing is turned off.
+    Otherwise the program runs once, compiled into a Python function if so requested.
+    Without the cache, programs too long to be worth compiling are interpreted and we report it.
+    """
+    program_path = kwargs.pop("program")
+    directives_path = kwargs.pop("directives")
+    jit = kwargs.pop("jit")
+    cache_path = kwargs.pop("cache")
+    cache_size = kwargs.pop("cache_size")
+    no_cache = kwargs.pop("no_cache")
+    jit_limit = kwargs.pop("jit_limit")
+    lanes = kwargs.pop("lanes")
+    no_bitslice = kwargs.pop("no_bitslice")
+    inputs_path = kwargs.pop("inputs")
 
-def main():
-    directives = Directives()
-    directives.set_main("main")
-    directives.set_regcount(1)
+    # Try to get the bytecode and the directives, either from the package or from their own files
+    try:
+        if directives_path is None:
+            package = Package(program_path)
+            directives = package.directives()
+            bytecode = package.bytecode()
+        else:
+            with open(directives_path, 'r', encoding = "utf-8") as directives_file:
+                directives = load_directives(directives_file.read())
+            bytecode = Bytecode()
+            bytecode.load(program_path)
+    except OSError:
+        print("The program file <" + program_path + "> or its directives could not be read. Please make sure the files exist and the user the Arklight virtual machine is running under has READ permissions on them.")
+        return
+    except ValueError as error:
+        print(error)
+        return
 
-    bytecode = Bytecode()
-    # bytecode.append(OpCode.PRINT)
-    # bytecode.append(OpType.BINARY)
-    # bytecode.append(10)
+    # Without lanes nor inputs we run a single execution of the program
+    if lanes is None and inputs_path is None:
+        if cache_size.isdecimal() == False:
+            print("The cache size <" + cache_size + "> is not valid. Please give the size of the compiled programs cache as a whole number of megabytes.")
+            return
 
-    vmachine = VMachine(directives, bytecode)
-    vmachine.run()
+        if jit_limit.isdecimal() == False:
+            print("The compilation limit <" + jit_limit + "> is not valid. Please give the number of instructions above which programs are interpreted as a whole number.")
+            return
 
+        try:
+            if jit == True:
+                cache = None
+                if no_cache == False:
+                    cache = CodeCache(cache_path or default_directory(), int(cache_size) * 1024 * 1024)
+                vmachine = JitVMachine(directives, bytecode, cache, int(jit_limit))
+                if vmachine.compiled == False:
+                    print("The program has more than <" + jit_limit + "> instructions and the cache is disabled so it is interpreted rather than compiled.", file = sys.stderr)
+            else:
+                vmachine = VMachine(directives, bytecode)
+            vmachine.run()
+        except ValueError as error:
+            print(error)
+        return
+
+    # Try to get the input matrix, one row per lane
+    inputs = None
+    if inputs_path is not None:
+        try:
+            inputs = numpy.loadtxt(inputs_path, dtype = numpy.uint8, ndmin = 2)
+        except (OSError, ValueError):
+            print("The inputs file <" + inputs_path + "> could not be read. Please make sure the file exists and holds one row of 0s and 1s per lane.")
+            return
+
+    try:
+        # Without an explicit number of lanes, we run as many lanes as there are rows in the input matrix
+        if lanes is None:
+            lanes = inputs.shape[0]
+        else:
+            lanes = int(lanes)
+
+        # Only deterministic gates have the boolean expressions the bit-sliced VM evaluates
+        if no_bitslice == False and all(compile_table(operator.size, operator.matrix) is not None for operator in directives.operators):
+            vmachine = BitSliceVMachine(directives, bytecode, lanes)
+            if inputs is not None:
+                vmachine.load(packed_inputs(inputs.tolist(), lanes))
+        else:
+            vmachine = BatchVMachine(directives, bytecode, lanes)
+            if inputs is not None:
+                vmachine.load(inputs)
+        vmachine.run()
+    except ValueError as error:
+        print(error)
+
+
+options = """Little Arklight virtual machine.
+
+Usage:
+    kvm.py <program> [--directives=<file>] --jit [--cache=<dir> | --no-cache] [--cache-size=<mb>] [--jit-limit=<count>]
+    kvm.py <program> [--directives=<file>] [--lanes=<count>] [--inputs=<file>] [--no-bitslice]
+    kvm.py (-h | --help)
+    kvm.py (-V | --version)
+
+Options:
+    -h, --help                      Show this help message.
+    -V, --version                   Display the virtual machine version.
+    -d <file>, --directives=<file>  Specify the directives file when the program is a bytecode file rather than a package.
+    -j, --jit                       Compile the program into a Python function before running it.
+    --cache=<dir>                   Specify the directory where compiled programs are cached.
+    --cache-size=<mb>               Maximum size of the compiled programs cache in megabytes [default: 256].
+    --no-cache                      Compile the program even if it was compiled before and don't cache it.
+    --jit-limit=<count>             Number of instructions above which programs are interpreted when the cache is disabled [default: 16384].
+    -l <count>, --lanes=<count>     Run the program over <count> lanes at once.
+    -i <file>, --inputs=<file>      Specify the file with the initial registers of each lane, one row per lane.
+    --no-bitslice                   Vectorize the lanes with NumPy even when every gate is deterministic and they could be bit-sliced.
+"""
 if __name__ == "__main__":
-    main()
+    args = docopt(options, version = "Little Arklight virtual machine 0.0.1")
+    main(
+        program     = args["<program>"],
+        directives  = args["--directives"],
+        jit         = args["--jit"],
+        cache       = args["--cache"],
+        cache_size  = args["--cache-size"],
+        no_cache    = args["--no-cache"],
+        jit_limit   = args["--jit-limit"],
+        lanes       = args["--lanes"],
+        no_bitslice = args["--no-bitslice"],
+        inputs      = args["--inputs"],
+    )
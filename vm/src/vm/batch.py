@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import numpy
+
+from common.directives import Directives
+from common.bytecode import Bytecode
+from vm.vmachine import VMachine
+
+class BatchVMachine(VMachine):
+    """A virtual machine that executes the bytecode over many initial register assignments at once.
+
+    Each execution of the program is a lane. Every register holds a vector with one value per lane
+    so that each instruction is carried out for all lanes with a handful of vectorized NumPy operations.
+
+    Attributes:
+        lanes(int): The number of executions carried out side by side.
+    """
+    lanes = 1
+
+    def __init__(self, directives: Directives, bytecode: Bytecode, lanes: int):
+        if lanes <= 0:
+            raise ValueError("The number of lanes to run the VM with must be greater than zero.")
+
+        self.lanes = lanes
+        super().__init__(directives, bytecode)
+
+    def load(self, inputs):
+        """Set the initial value of the first registers of every lane.
+
+        Args:
+            inputs(array): A matrix with one row per lane and one column per register starting from the first register.
+
+        Raises:
+            ValueError: If the matrix doesn't have one row per lane or has more columns than there are registers.
+        """
+        inputs = numpy.asarray(inputs, dtype = numpy.uint8)
+        if inputs.ndim != 2 or inputs.shape[0] != self.lanes:
+            raise ValueError("Expected an input matrix with one row for each of the <" + str(self.lanes) + "> lanes.")
+
+        if inputs.shape[1] > len(self._registers):
+            raise ValueError("The input matrix has <" + str(inputs.shape[1]) + "> columns but the VM only has <" + str(len(self._registers)) + "> registers.")
+
+        self._registers[:inputs.shape[1]] = inputs.T & 1
+
+    def state(self):
+        """Returns a matrix with one row per lane holding the value of every register in that lane."""
+        return self._registers.T.copy()
+
+    def _allocate(self, count: int):
+        """Returns a matrix with one row per register and one column per lane, all set to zero."""
+        return numpy.zeros((count, self.lanes), dtype = numpy.uint8)
+
+    def _compile(self, operator):
+        """Returns the input size, output size, lookup table and matrix of the given operator as NumPy arrays."""
+        input_size, output_size, table, matrix = super()._compile(operator)
+        if table is not None:
+            table = numpy.array(table, dtype = numpy.intp)
+
+        return (input_size, output_size, table, numpy.array(matrix, dtype = numpy.float64))
+
+    def _gather(self, inputs: tuple):
+        """Returns the packed input of every lane, the first input register providing the most significant bit."""
+        registers = self._registers
+        index = numpy.zeros(self.lanes, dtype = numpy.intp)
+        for register in inputs:
+            index <<= 1
+            index |= registers[register]
+
+        return index
+
+    def _scatter(self, outputs: tuple, values):
+        """Unpack the packed output of every lane into the output registers.
+
+        Outputs are unpacked from the last to the first, as the register file does.
+        """
+        registers = self._registers
+        for shift, register in enumerate(reversed(outputs)):
+            registers[register] = (values >> shift) & 1
+
+    def _run_print_register(self, index: int):
+        """Execute the print instruction on the value held by the register at the given index in every lane."""
+        print(" ".join(str(value) + "b" for value in self._registers[index]))
+
+    def _run_apply(self, table, inputs: tuple, outputs: tuple):
+        """Execute the apply instruction of a deterministic operator for all lanes with one lookup into its table."""
+        self._scatter(outputs, table[self._gather(inputs)])
+
+    def _run_apply_matrix(self, matrix, inputs: tuple, outputs: tuple):
+        """Execute the apply instruction by multiplying the matrix of the operator with the input registers of every lane.
+
+        Each lane draws its output from the weights found in the column of the matrix at its input.
+        """
+        columns = numpy.cumsum(matrix[:, self._gather(inputs)], axis = 0)
+        draws = numpy.random.random(self.lanes) * columns[-1]
+        values = numpy.minimum((draws >= columns).sum(axis = 0), len(matrix) - 1)
+        self._scatter(outputs, values)
+
+    def _decode_vector_apply(self, offset: int):
+        """Decode the vector apply instruction with the registers of its tuples held in matrices with one row per tuple,
+        so that the registers of all the tuples are gathered and scattered with a single NumPy operation per column.
+
+        The outputs come with the tuples whose output at each position is the last write to its register, see <written>.
+        """
+        (handler, (operator, inputs, outputs)), offset = super()._decode_vector_apply(offset)
+        return (handler, (operator, tuples(inputs), (tuples(outputs), written(outputs)))), offset
+
+    def _gather_vector(self, inputs):
+        """Returns the packed input of every tuple in every lane, one row per tuple."""
+        registers = self._registers
+        index = numpy.zeros((inputs.shape[0], self.lanes), dtype = numpy.intp)
+        for column in inputs.T:
+            index <<= 1
+            index |= registers[column]
+
+        return index
+
+    def _scatter_vector(self, outputs, values):
+        """Unpack the packed output of every tuple in every lane into the output registers of the tuple.
+
+        Only the writes that decide the final value of their register are carried out, so a register is written at most once.
+        """
+        registers = self._registers
+        matrix, rows = outputs
+        shift = matrix.shape[1] - 1
+        for column, kept in zip(matrix.T, rows):
+            registers[column[kept]] = (values[kept] >> shift) & 1
+            shift = shift - 1
+
+    def _run_vector_apply(self, table, inputs, outputs):
+        """Execute the vector apply instruction of a deterministic operator for all tuples and lanes with one lookup into its table."""
+        self._scatter_vector(outputs, table[self._gather_vector(inputs)])
+
+    def _run_vector_apply_matrix(self, matrix, inputs, outputs):
+        """Execute the vector apply instruction by drawing the output of every tuple in every lane from the weights
+        found in the column of the matrix at its input."""
+        columns = numpy.cumsum(matrix[:, self._gather_vector(inputs)], axis = 0)
+        draws = numpy.random.random((inputs.shape[0], self.lanes)) * columns[-1]
+        values = numpy.minimum((draws >= columns).sum(axis = 0), len(matrix) - 1)
+        self._scatter_vector(outputs, values)
+
+
+def tuples(registers: tuple):
+    """Returns the given tuples of register indices as a matrix with one row per tuple."""
+    size = len(registers[0]) if len(registers) > 0 else 0
+    return numpy.array(registers, dtype = numpy.intp).reshape(len(registers), size)
+
+
+def written(outputs: tuple):
+    """Returns, for each output position, the rows of the given tuples of output registers whose write at that position
+    is the last write to its register.
+
+    The VM writes the tuples in order, each from its last output to its first, so a register repeated among the outputs
+    ends up with the value of its last write. When no register is repeated, every write is the last one and all the rows are kept.
+    """
+    size = len(outputs[0]) if len(outputs) > 0 else 0
+    registers = [register for indices in outputs for register in indices]
+    if len(set(registers)) == len(registers):
+        return [slice(None)] * size
+
+    last = {}
+    for row, indices in enumerate(outputs):
+        for position in reversed(range(size)):
+            last[indices[position]] = (row, position)
+
+    rows = [[] for position in range(size)]
+    for row, position in last.values():
+        rows[position].append(row)
+
+    return [numpy.array(sorted(kept), dtype = numpy.intp) for kept in rows]
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from common.directives import Directives
+from common.bytecode import Bytecode
+from vm.vmachine import VMachine
+from vm.synthesis import synthesize
+
+class BitSliceVMachine(VMachine):
+    """A virtual machine that executes the bytecode over many initial register assignments packed into the bits of integers.
+
+    Each execution of the program is a lane and lane <k> lives in bit <k> of every register.
+    Every operator is synthesized into a boolean expression so that applying it to all lanes at once
+    takes a short sequence of &, |, ^ and ~ operations on Python integers, which can be arbitrarily wide.
+
+    Attributes:
+        lanes(int): The number of executions carried out side by side.
+    """
+    lanes = 1
+
+    # The integer with a bit set for each lane, used to keep complemented values within the lanes
+    _mask = 1
+
+    def __init__(self, directives: Directives, bytecode: Bytecode, lanes: int):
+        if lanes <= 0:
+            raise ValueError("The number of lanes to run the VM with must be greater than zero.")
+
+        self.lanes = lanes
+        self._mask = (1 << lanes) - 1
+        super().__init__(directives, bytecode)
+
+    def load(self, values: list):
+        """Set the initial value of the first registers, bit <k> of each value being the register value in lane <k>.
+
+        Raises:
+            ValueError: If there are more values than registers.
+        """
+        if len(values) > len(self._registers):
+            raise ValueError("Got <" + str(len(values)) + "> values but the VM only has <" + str(len(self._registers)) + "> registers.")
+
+        for index, value in enumerate(values):
+            self._registers[index] = value & self._mask
+
+    def state(self):
+        """Returns the value of every register, bit <k> of each value being the register value in lane <k>."""
+        return list(self._registers)
+
+    def _allocate(self, count: int):
+        """Returns a list of <count> registers with every lane set to zero."""
+        return [0] * count
+
+    def _compile(self, operator):
+        """Returns the input size, output size, bit-sliced function and matrix of the given operator.
+
+        Raises:
+            ValueError: If the operator is not deterministic since it then has no boolean expression.
+        """
+        input_size, output_size, table, matrix = super()._compile(operator)
+        if table is None:
+            raise ValueError("The operator <" + operator.name + "> is not deterministic and cannot be executed by the bit-sliced VM.")
+
+        return (input_size, output_size, self._function(input_size, synthesize(input_size, output_size, table)), matrix)
+
+    def _function(self, size: int, expressions: list):
+        """Returns a function that evaluates the given expressions over integers holding one input each for all lanes.
+
+        The function receives the inputs in order and returns a tuple with the value of each output.
+        """
+        params = ["x" + str(position) for position in range(size)]
+
+        outputs = []
+        for negated, products in expressions:
+            terms = []
+            for product in products:
+                factors = [("x" if positive else "~x") + str(position) for position, positive in product]
+                terms.append(" & ".join(factors) if len(factors) > 0 else "mask")
+
+            expression = " | ".join("(" + term + ")" for term in terms) if len(terms) > 0 else "0"
+            if negated:
+                expression = "~(" + expression + ")"
+
+            outputs.append("(" + expression + ") & mask")
+
+        source = "def operator(" + ", ".join(params + ["mask = mask"]) + "):\n"
+        source = source + "    return (" + "".join(output + ", " for output in outputs) + ")\n"
+
+        namespace = {"mask": self._mask}
+        exec(compile(source, "<operator>", "exec"), namespace)
+        return namespace["operator"]
+
+    def _run_print_register(self, index: int):
+        """Execute the print instruction on the value held by the register at the given index in every lane."""
+        value = self._registers[index]
+        print(" ".join(str((value >> lane) & 1) + "b" for lane in range(self.lanes)))
+
+    def _run_apply(self, function, inputs: tuple, outputs: tuple):
+        """Execute the apply instruction for all lanes by evaluating the bit-sliced function of the operator.
+
+        Outputs are written from the last to the first, as the register file does.
+        """
+        registers = self._registers
+        values = function(*[registers[register] for register in inputs])
+        for register, value in zip(reversed(outputs), reversed(values)):
+            registers[register] = value
+
+    def _run_vector_apply(self, function, inputs: tuple, outputs: tuple):
+        """Execute the vector apply instruction for all lanes, evaluating the bit-sliced function on every tuple before writing any output.
+
+        The tuples are written in order, each from its last output to its first, as the VM does.
+        """
+        registers = self._registers
+        values = [function(*[registers[register] for register in indices]) for indices in inputs]
+        for indices, tuple_values in zip(outputs, values):
+            for register, value in zip(reversed(indices), reversed(tuple_values)):
+                registers[register] = value
+
+
+def exhaustive_inputs(count: int):
+    """Returns the values of <count> registers that together enumerate all their possible assignments over 2^count lanes.
+
+    In lane <k>, the registers hold the bits of <k> with the first register as most significant bit.
+    """
+    lanes = 1 << count
+    values = []
+    for register in range(count):
+        period = 1 << (count - 1 - register)
+
+        # A block of <period> zeros followed by <period> ones, repeated over all lanes
+        block = ((1 << period) - 1) << period
+        values.append(block * (((1 << lanes) - 1) // ((1 << (2 * period)) - 1)))
+
+    return values
+
+
+def packed_inputs(rows: list, lanes: int):
+    """Returns the initial value of the first registers given a matrix with one row per lane and one column per register,
+    bit <k> of each value being the register value in lane <k>, as the bit-sliced VM loads them.
+
+    Raises:
+        ValueError: If the matrix doesn't have one row per lane.
+    """
+    if len(rows) != lanes:
+        raise ValueError("Expected an input matrix with one row for each of the <" + str(lanes) + "> lanes.")
+
+    values = [0] * len(rows[0])
+    for lane, row in enumerate(rows):
+        for register, bit in enumerate(row):
+            values[register] = values[register] | ((bit & 1) << lane)
+
+    return values
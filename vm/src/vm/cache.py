@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import os
+import sys
+import json
+import types
+import marshal
+import hashlib
+import tempfile
+import importlib.util
+
+from common.directives import Directives
+from common.bytecode import Bytecode
+
+class CodeCache(object):
+    """A directory of compiled programs so that running the same program again doesn't require compiling it again.
+
+    Each entry is a file named after the hash of the bytecode and directives of the program,
+    the version of the code generator that compiled it and the tag of the Python implementation running it.
+    It holds the marshalled code object of the compiled program preceded by the magic number of the running Python,
+    so that, like .pyc files, entries written by a different Python version are ignored. They are removed, as are
+    truncated entries, since they could never be loaded.
+
+    Entries are written to a temporary file that is then renamed over the entry so that concurrent writers
+    and readers only ever see complete entries. Once the entries take more space than the capacity,
+    the least recently used ones are removed.
+
+    Attributes:
+        directory(str): The directory holding the entries.
+        capacity(int): The maximum number of bytes the entries may take.
+
+    Note:
+        - Failing to read or write the cache is never an error, the program is simply compiled again.
+    """
+    directory = ""
+    capacity = 0
+
+    # The extension of the files holding compiled programs
+    _extension = ".kjc"
+
+    def __init__(self, directory: str, capacity: int):
+        if capacity <= 0:
+            raise ValueError("The capacity of the compiled programs cache must be greater than zero.")
+
+        self.directory = directory
+        self.capacity = capacity
+
+    def key(self, directives: Directives, bytecode: Bytecode, version: int):
+        """Returns the key of the entry of the program made of the given bytecode and directives.
+
+        Args:
+            version(int): The version of the code generator, so that programs it compiled differently before get another key.
+        """
+        operators = [(operator.id, operator.name, operator.size, operator.matrix) for operator in directives.operators]
+
+        digest = hashlib.sha256()
+        digest.update(json.dumps([version, sys.implementation.cache_tag, directives.main, directives.regcount, operators]).encode())
+        digest.update(bytecode.code)
+        return digest.hexdigest()
+
+    def load(self, key: str):
+        """Returns the compiled program stored under the given key and whether it executes some instructions
+        through their handlers, or None if the cache holds no such program.
+
+        An entry that is too short to hold the magic number and the handlers flag, that was written by another Python
+        or that doesn't hold a code object can never be loaded, so it is removed.
+        """
+        path = os.path.join(self.directory, key + self._extension)
+        try:
+            with open(path, "rb") as entry_file:
+                data = entry_file.read()
+
+            # Mark the entry as recently used
+            os.utime(path)
+        except OSError:
+            return None
+
+        magic = importlib.util.MAGIC_NUMBER
+        if len(data) <= len(magic) or data[:len(magic)] != magic:
+            self._discard(path)
+            return None
+
+        try:
+            code = marshal.loads(data[len(magic) + 1:])
+        except (EOFError, ValueError, TypeError):
+            code = None
+
+        if isinstance(code, types.CodeType) == False:
+            self._discard(path)
+            return None
+
+        return code, data[len(magic)] == 1
+
+    def store(self, key: str, code, calls: bool):
+        """Store the given compiled program under the given key then make room if the cache is over capacity."""
+        data = importlib.util.MAGIC_NUMBER + bytes([1 if calls else 0]) + marshal.dumps(code)
+
+        try:
+            os.makedirs(self.directory, exist_ok = True)
+            descriptor, temporary = tempfile.mkstemp(dir = self.directory, suffix = ".tmp")
+            try:
+                with os.fdopen(descriptor, "wb") as entry_file:
+                    entry_file.write(data)
+                os.replace(temporary, os.path.join(self.directory, key + self._extension))
+            except OSError:
+                os.remove(temporary)
+                raise
+        except OSError:
+            return
+
+        self._evict()
+
+    def _discard(self, path: str):
+        """Remove the entry at the given path, which another process may have removed already."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Remove the least recently used entries until the remaining ones fit within the capacity."""
+        entries = []
+        try:
+            with os.scandir(self.directory) as scanner:
+                for entry in scanner:
+                    if entry.name.endswith(self._extension):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+
+        size = sum(entry[1] for entry in entries)
+        for mtime, entry_size, path in sorted(entries):
+            if size <= self.capacity:
+                break
+
+            self._discard(path)
+            size = size - entry_size
+
+
+def default_directory():
+    """Returns the directory where compiled programs are cached when none is given."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "arklight")
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+from common.directives import Directives
+from common.bytecode import Bytecode
+from vm.vmachine import VMachine
+from vm.cache import CodeCache
+
+# The version of the generated code, bumped whenever the source the compiler generates changes
+# so that programs cached by an older compiler are compiled again rather than run
+VERSION = 2
+
+class JitVMachine(VMachine):
+    """A virtual machine that compiles the decoded program into Python functions before running it.
+
+    Once circuits are folded into the main circuit, the program is straight-line code.
+    So we generate Python source where each register is a local variable, each APPLY of a deterministic operator
+    is a lookup into the table of its operator and each PRINT a call to print.
+    The tables are bound to global names of the generated code, one per operator, rather than written out
+    at every instruction as literals the Python compiler would have to fold again and again.
+
+    The Python compiler slows down on very long functions, so the program is split into functions of a fixed number
+    of instructions, each loading the registers it reads into local variables and writing back the ones it modifies,
+    and running the program is a call to each function in turn, without any dispatch loop.
+    The cost of compiling then grows linearly with the length of the program, but it remains several times
+    the cost of decoding and interpreting the program once: compiling only pays off when the program is run again
+    from the cache. So when given a cache, programs of any length are compiled and stored, the next runs skipping
+    compilation altogether. Without a cache, programs of more than <limit> instructions are interpreted instead,
+    as the VM would, since their compiled program would be thrown away. Below that limit compiling takes
+    less than half a second and a limit of None compiles programs of any length.
+
+    Instructions we don't know how to compile are executed by their handler, as the VM would,
+    after writing the registers held in local variables back into the register file.
+
+    When given a cache, compiled programs are looked up there first. If the compiled program found
+    doesn't rely on handlers to execute some instructions, even decoding the bytecode is skipped.
+
+    Attributes:
+        cache(CodeCache): The cache of compiled programs, if any.
+        limit(int): The number of instructions above which programs are interpreted when there is no cache, None for no limit.
+        compiled(bool): Whether the program runs compiled rather than interpreted, known once the VM is initialized.
+    """
+    cache = None
+    limit = 16384
+    compiled = False
+
+    # The number of instructions compiled into each function
+    _chunk = 1024
+
+    # The compiled program, a function taking the register read, register write and instruction call functions
+    _function = None
+    # The key of the program in the cache
+    _key = None
+    # The code object of the compiled program and whether it calls handlers, when found in the cache
+    _cached = None
+
+    def __init__(self, directives: Directives, bytecode: Bytecode, cache: CodeCache = None, limit: int = 16384):
+        self.cache = cache
+        self.limit = limit
+        self.compiled = False
+        self._function = None
+        self._key = None
+        self._cached = None
+        super().__init__(directives, bytecode)
+
+    def init(self):
+        """Initialize the VM as usual, decode the whole bytecode then compile the decoded program."""
+        super().init()
+        self._program = self._decode()
+        self._function = self._load()
+        self.compiled = self._function is not None
+
+    def run(self):
+        """Execute the compiled program from start to finish, or interpret it if it wasn't compiled."""
+        if self._function is None:
+            return super().run()
+
+        self._function(self._registers.read, self._registers.write, self._call)
+        self.ip = len(self._program)
+
+    def _decode(self):
+        """Decode the bytecode unless the cache holds a compiled program that doesn't need the decoded one."""
+        if self.cache is not None:
+            self._key = self.cache.key(self.directives, self.bytecode, VERSION)
+            self._cached = self.cache.load(self._key)
+            if self._cached is not None and self._cached[1] == False:
+                return []
+
+        return super()._decode()
+
+    def _load(self):
+        """Returns the compiled program, from the cache if it has it, compiling and caching it otherwise.
+
+        Returns None when there is no cache to reuse the compiled program and the program is too long to be worth compiling,
+        in which case it is interpreted.
+        """
+        if self._cached is not None:
+            return self._define(self._cached[0])
+
+        if self.cache is None and self.limit is not None and len(self._program) > self.limit:
+            return None
+
+        source = self._source()
+        code = compile(source, "<program>", "exec")
+        if self.cache is not None:
+            self.cache.store(self._key, code, "call(" in source)
+
+        return self._define(code)
+
+    def _define(self, code):
+        """Execute the given code object, which defines the program function, and return that function."""
+        namespace = dict(("table" + str(operator_id), operator[2]) for operator_id, operator in self._operators.items() if operator[2] is not None)
+        exec(code, namespace)
+        return namespace["program"]
+
+    def _call(self, position: int):
+        """Execute the instruction at the given position of the decoded program with its handler."""
+        handler, operands = self._program[position]
+        handler(*operands)
+
+    def _emitters(self):
+        """Returns a dictionary that maps the handlers of the instructions we can compile to the methods generating their source."""
+        return {
+            self._run_print_register: self._emit_print_register,
+            self._run_print_binary: self._emit_print_binary,
+            self._run_apply: self._emit_apply,
+            self._run_vector_apply: self._emit_vector_apply,
+        }
+
+    def _source(self):
+        """Returns the source defining the function executing the decoded program, which calls the function of each chunk in turn."""
+        chunks = range(0, len(self._program), self._chunk)
+        source = "".join(self._chunk_source(start) for start in chunks)
+        calls = "".join("    chunk" + str(start) + "(read, write, call)\n" for start in chunks)
+        return source + "def program(read, write, call):\n" + calls + "    return None\n"
+
+    def _chunk_source(self, start: int):
+        """Returns the source of the function executing the chunk of the decoded program starting at the given position.
+
+        Registers are read into local variables the first time an instruction needs them
+        and the ones that were modified are written back before the function returns
+        or before an instruction we couldn't compile is executed.
+        """
+        emitters = self._emitters()
+        tables = dict((id(operator[2]), "table" + str(operator_id)) for operator_id, operator in self._operators.items() if operator[2] is not None)
+        lines = []
+        loaded = set()
+        modified = set()
+
+        for position in range(start, min(start + self._chunk, len(self._program))):
+            handler, operands = self._program[position]
+            emitter = emitters.get(handler)
+
+            # We can't compile the instruction so its handler will execute it against the register file
+            if emitter is None:
+                lines.extend("write(" + str(register) + ", r" + str(register) + ")" for register in sorted(modified))
+                lines.append("call(" + str(position) + ")")
+                loaded.clear()
+                modified.clear()
+                continue
+
+            reads, writes, body = emitter(tables, *operands)
+            lines.extend("r" + str(register) + " = read(" + str(register) + ")" for register in reads if register not in loaded)
+            lines.extend(body)
+            loaded.update(reads)
+            loaded.update(writes)
+            modified.update(writes)
+
+        lines.extend("write(" + str(register) + ", r" + str(register) + ")" for register in sorted(modified))
+        lines.append("return None")
+
+        return "def chunk" + str(start) + "(read, write, call):\n" + "".join("    " + line + "\n" for line in lines)
+
+    def _emit_print_register(self, tables: dict, index: int):
+        """Returns the registers read, the registers written and the source of the print instruction of a register."""
+        return (index,), (), ["print(str(r" + str(index) + ") + \"b\")"]
+
+    def _emit_print_binary(self, tables: dict, value: int):
+        """Returns the registers read, the registers written and the source of the print instruction of a binary literal."""
+        return (), (), ["print(\"" + str(value) + "b\")"]
+
+    def _emit_apply(self, tables: dict, table: tuple, inputs: tuple, outputs: tuple):
+        """Returns the registers read, the registers written and the source of the apply instruction of a deterministic operator.
+
+        Args:
+            tables(dict): The global name of the table of each operator, by identity of the table.
+        """
+        if len(outputs) == 1:
+            return inputs, outputs, ["r" + str(outputs[0]) + " = " + lookup(tables[id(table)], inputs)]
+
+        return inputs, outputs, ["value = " + lookup(tables[id(table)], inputs)] + unpack("value", outputs)
+
+    def _emit_vector_apply(self, tables: dict, table: tuple, inputs: tuple, outputs: tuple):
+        """Returns the registers read, the registers written and the source of the vector apply instruction of a deterministic operator.
+
+        The output of every tuple is looked up into its own variable before any register is assigned.
+        """
+        body = ["value" + str(position) + " = " + lookup(tables[id(table)], indices) for position, indices in enumerate(inputs)]
+        for position, indices in enumerate(outputs):
+            body.extend(unpack("value" + str(position), indices))
+
+        reads = tuple(sorted(set(register for indices in inputs for register in indices)))
+        writes = tuple(sorted(set(register for indices in outputs for register in indices)))
+        return reads, writes, body
+
+
+def lookup(table: str, inputs: tuple):
+    """Returns the source of the lookup of the packed value of the given input registers into the table with the given name."""
+    size = len(inputs)
+    index = " | ".join("r" + str(register) + (" << " + str(size - 1 - position) if position < size - 1 else "") for position, register in enumerate(inputs))
+    return table + "[" + (index if size > 0 else "0") + "]"
+
+
+def unpack(value: str, outputs: tuple):
+    """Returns the source assigning the bits of the given packed value to the given output registers.
+
+    Outputs are unpacked from the last to the first, as the register file does.
+    """
+    return ["r" + str(register) + " = " + value + " >> " + str(len(outputs) - 1 - position) + " & 1" for position, register in reversed(list(enumerate(outputs)))]
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+"""Helpers to turn the matrix of an operator into a form the VM can execute quickly.
+
+The matrix of an operator with n inputs and m outputs has 2^n columns and 2^m rows.
+Column <j> describes what happens to the input whose bits, packed with the first input as most significant bit, equal <j>.
+For a deterministic operator, every column holds a single 1 and row <i> of that 1 is the packed output.
+"""
+
+def output_size(matrix: list):
+    """Returns the number of outputs of the operator represented by the given matrix.
+
+    Raises:
+        ValueError: If the number of rows of the matrix is not a power of two.
+    """
+    rows = len(matrix)
+    if rows < 2 or rows & (rows - 1) != 0:
+        raise ValueError("The number of rows of an operator matrix must be a power of two greater than one.")
+
+    return rows.bit_length() - 1
+
+
+def compile_table(size: int, matrix: list):
+    """Compile the matrix of a deterministic operator into a lookup table.
+
+    The lookup table maps each packed input to the packed output so applying the operator is a single indexing operation.
+
+    Args:
+        size(int): The number of inputs of the operator.
+        matrix(list): The matrix representing the operator.
+
+    Returns:
+        A tuple with one packed output per packed input or None if the operator is not deterministic.
+
+    Raises:
+        ValueError: If the matrix doesn't have one column per possible input.
+    """
+    columns = 1 << size
+    for row in matrix:
+        if len(row) != columns:
+            raise ValueError("An operator with <" + str(size) + "> inputs must have a matrix with <" + str(columns) + "> columns.")
+
+    table = []
+    for column in range(columns):
+        outputs = [row for row in range(len(matrix)) if matrix[row][column] != 0]
+
+        # A column that is not one-hot doesn't map its input to a single output
+        if len(outputs) != 1 or matrix[outputs[0]][column] != 1:
+            return None
+
+        table.append(outputs[0])
+
+    return tuple(table)
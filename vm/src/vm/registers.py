@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+class RegisterFile(object):
+    """The registers of the virtual machine packed as bits into a byte array.
+
+    Registers have a width of 1 so each of them takes a single bit and eight of them share a byte.
+    A register is addressed by the integer index carried by the bytecode: register <i> is bit <i % 8> of byte <i // 8>.
+
+    Attributes:
+        count(int): The number of registers in the register file.
+
+    Note:
+        - Registers wider than 1 bit will need a width and a stride instead of a single bit per register.
+    """
+    count = 0
+
+    # The byte array holding the value of every register
+    _bits = bytearray()
+
+    def __init__(self, count: int):
+        if count <= 0:
+            raise ValueError("The number of registers in a register file must be greater than zero.")
+
+        self.count = count
+        self._bits = bytearray((count + 7) >> 3)
+
+    def __len__(self):
+        return self.count
+
+    def read(self, index: int):
+        """Returns the value of the register at the given index."""
+        return (self._bits[index >> 3] >> (index & 7)) & 1
+
+    def write(self, index: int, value: int):
+        """Store the given bit into the register at the given index."""
+        if value & 1:
+            self._bits[index >> 3] |= 1 << (index & 7)
+        else:
+            self._bits[index >> 3] &= 0xFF ^ (1 << (index & 7))
+
+    def read_many(self, indices):
+        """Returns the values of the registers at the given indices packed into an integer.
+
+        The first register provides the most significant bit so that the result can directly be used
+        as the index of the column of a gate matrix.
+        """
+        bits = self._bits
+        value = 0
+        for index in indices:
+            value = (value << 1) | ((bits[index >> 3] >> (index & 7)) & 1)
+
+        return value
+
+    def write_many(self, indices, value: int):
+        """Unpack the given integer into the registers at the given indices.
+
+        This is the reverse of read_many: the first register receives the most significant bit.
+        """
+        bits = self._bits
+        for index in reversed(indices):
+            if value & 1:
+                bits[index >> 3] |= 1 << (index & 7)
+            else:
+                bits[index >> 3] &= 0xFF ^ (1 << (index & 7))
+            value = value >> 1
+
+    def __repr__(self):
+        return "".join(str(self.read(index)) for index in range(self.count))
+
+    __str__ = __repr__
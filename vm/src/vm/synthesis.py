@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+"""Boolean synthesis of operators from their lookup tables.
+
+Each output of a deterministic operator is a boolean function of its inputs.
+We minimize that function with the Quine-McCluskey method and express it as a sum of products
+so it can be evaluated with bitwise operations only.
+
+An implicant is a pair (value, mask): the bits set in the mask are the inputs the implicant doesn't depend on
+and the other bits of a packed input must equal those of the value for the implicant to cover it.
+As everywhere else in the VM, the first input is the most significant bit of a packed input.
+
+An expression is a pair (negated, products) where products is a list of products and each product is a list of literals.
+A literal is a pair (input, positive) where input is the position of the input in the operator and positive
+tells whether the input appears as is or complemented. An empty product is the constant 1 and an empty list of products
+the constant 0. When negated is true, the expression is the complement of the sum of its products.
+"""
+
+def prime_implicants(minterms: set):
+    """Returns the prime implicants of the boolean function that is true exactly on the given packed inputs."""
+    primes = set()
+    implicants = set((minterm, 0) for minterm in minterms)
+
+    while len(implicants) > 0:
+        # Only implicants that ignore the same inputs and differ in the number of set bits by one can be merged
+        groups = {}
+        for value, mask in implicants:
+            groups.setdefault((mask, bin(value).count("1")), []).append(value)
+
+        merged = set()
+        used = set()
+        for (mask, ones), values in groups.items():
+            for other in groups.get((mask, ones + 1), []):
+                for value in values:
+                    difference = value ^ other
+                    if difference & (difference - 1) == 0:
+                        merged.add((value, mask | difference))
+                        used.add((value, mask))
+                        used.add((other, mask))
+
+        primes |= implicants - used
+        implicants = merged
+
+    return primes
+
+
+def minimum_cover(minterms: set, primes: set):
+    """Select prime implicants that together cover all the given minterms.
+
+    Essential prime implicants are taken first then we repeatedly take the implicant covering the most
+    minterms left, preferring the one that depends on the fewest inputs.
+    """
+    covers = {}
+    for value, mask in primes:
+        covers[(value, mask)] = set(minterm for minterm in minterms if minterm & ~mask == value)
+
+    cover = []
+    remaining = set(minterms)
+
+    # A minterm covered by a single prime implicant makes that implicant essential
+    for minterm in minterms:
+        candidates = [implicant for implicant, covered in covers.items() if minterm in covered]
+        if len(candidates) == 1 and candidates[0] not in cover:
+            cover.append(candidates[0])
+            remaining -= covers[candidates[0]]
+
+    while len(remaining) > 0:
+        implicant = max(covers, key = lambda implicant: (len(covers[implicant] & remaining), bin(implicant[1]).count("1")))
+        cover.append(implicant)
+        remaining -= covers[implicant]
+
+    return sorted(cover)
+
+
+def sum_of_products(size: int, minterms: set):
+    """Returns the minimized products of the boolean function of <size> inputs that is true exactly on the given packed inputs."""
+    products = []
+    for value, mask in minimum_cover(minterms, prime_implicants(minterms)):
+        product = []
+        for position in range(size):
+            bit = 1 << (size - 1 - position)
+            if mask & bit == 0:
+                product.append((position, value & bit != 0))
+        products.append(product)
+
+    return products
+
+
+def literals(products: list):
+    """Returns the number of literals in the given products."""
+    return sum(len(product) for product in products)
+
+
+def synthesize(size: int, outputs: int, table: tuple):
+    """Returns one minimized expression per output of the operator with the given lookup table.
+
+    For each output we minimize both the function and its complement and keep the one with the fewest literals.
+
+    Args:
+        size(int): The number of inputs of the operator.
+        outputs(int): The number of outputs of the operator.
+        table(tuple): The lookup table of the operator mapping each packed input to its packed output.
+    """
+    expressions = []
+    for output in range(outputs):
+        shift = outputs - 1 - output
+        ones = set(index for index, value in enumerate(table) if (value >> shift) & 1)
+        zeros = set(range(len(table))) - ones
+
+        direct = sum_of_products(size, ones)
+        complement = sum_of_products(size, zeros)
+        if (literals(complement), len(complement)) < (literals(direct), len(direct)):
+            expressions.append((True, complement))
+        else:
+            expressions.append((False, direct))
+
+    return expressions
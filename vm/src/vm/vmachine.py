@@ -9,79 +9,211 @@ Maintainer      : Ntwali Bashige
 Email           : ntwali.bashige@gmail.com
 """
 
+import random
+import struct
+
 from common.directives import Directives
 from common.bytecode import Bytecode
 from common.operations import OpCode
 from common.operands import OpType
 from common.exceptions import *
+from vm.registers import RegisterFile
+from vm.operators import output_size, compile_table
+
+# The operand type of registers, as a plain integer which compares faster than the enumeration
+REGISTER = int(OpType.REGISTER)
 
 class VMachine(object):
     """The discrete classical virtual machine responsible for executing the bytecode.
     
     When given a bytecode, the virtual machine is reponsible for executing each instruction in it.
 
+    An apply instruction may name the same output register more than once. Outputs are written from the last
+    to the first, so the register ends up with the first of its outputs. A vector apply instruction writes its tuples
+    in order, each from its last output to its first. Every VM writes outputs in this order so that they all agree.
+
+    The MOV opcode is defined but no operand format was ever settled for it and the first version of the VM didn't execute it either.
+    It is intentionally unsupported: decoding it raises an UnsupportedInstructionError rather than reporting an unknown instruction.
+
     Attributes:
         bytecode(Bytecode): The bytecode to execute.
-        ip(int): Pointer to the instruction about to be executed.
+        ip(int): Pointer to the instruction about to be executed in the decoded program.
     """
     directives = None
     bytecode = None
     ip = 0
 
     # Private data that should never accessible outside of the VM
-    # A dictionary that maps register names to their values
-    _registers = {}
-    # A dictionary that maps operator indices to their input size and matrices
+    # The register file holding the value of each register, addressed by register index
+    _registers = None
+    # A dictionary that maps operator indices to their input size, output size, lookup table and matrix
     _operators = {}
+    # A dense array indexed by opcode byte that holds the method decoding each instruction
+    _decoders = []
+    # The decoded program: a list of instructions, each a handler and the operands to call it with
+    _program = []
+    # The offset of the first byte of the bytecode that wasn't decoded yet
+    _offset = 0
+    # The number of bytes of bytecode decoded at once, each time execution reaches the end of the decoded program
+    _window = 65536
+    # The layouts reading a given number of operand bytes straight from the bytecode, by number of bytes
+    _layouts = {}
+    # The instructions already decoded: print instructions by their two operand bytes,
+    # apply instructions by their operator and the tuple of their operand bytes
+    _decoded = {}
 
     def __init__(self, directives: Directives,  bytecode: Bytecode):
         self.directives = directives
         self.bytecode = bytecode
+        self.ip = 0
+        self._registers = None
+        self._operators = {}
+        self._decoders = []
+        self._program = []
+        self._offset = 0
+        self._layouts = {}
+        self._decoded = {}
 
         # We initialize the VM by allocating registers
         self.init()
 
     def init(self):
-        """Create an array of registers to be used by the VM and name them."""
+        """Create the register file to be used by the VM and resolve its operators and decoders.
+
+        The bytecode isn't decoded here but as execution reaches it, one window at a time,
+        so that a memory mapped program starts running right away whatever its size.
+        """
         # Make sure we have at least one register to work with
         if self.directives.regcount == 0:
             raise ValueError("The number of registers to initialize the VM with cannot be zero.")
 
-        # Initialize as many registers as there are regcount(s)
-        regindex = 1
-        while regindex <= self.directives.regcount:
-            self._registers["r" + str(regindex)] = None # None to be replaced with numpy vector
-            regindex = regindex + 1
+        # Initialize as many registers as there are regcount(s), all of them set to zero
+        self._registers = self._allocate(self.directives.regcount)
 
-        # Set operators by mapping their names to their input size and matrix
+        # Set operators by mapping their indices to their input size, output size, lookup table and matrix
         opindex = 0
         for opindex, opvalue in enumerate(self.directives.operators):
-            self._operators[opvalue.id] = (opvalue.size, opvalue.matrix)
+            self._operators[opvalue.id] = self._compile(opvalue)
+
+        # Resolve each opcode to its decoder once so that decoding an instruction is a single indexing operation
+        #   Every byte that is not a known opcode points to the decoder that reports the unknown instruction
+        self._decoders = [self._decode_unknown] * 256
+        for opcode, decoder in self._handlers().items():
+            self._decoders[opcode] = decoder
 
     def run(self):
-        """A big if...elif...else that fetches each instruction and performs the required side effect.
+        """Execute each instruction of the decoded program by calling its handler with its already resolved operands.
 
-        Note:
-            - In the future, explore the possibility of using a jump table or other ways to speed up execution.
+        The instruction pointer is moved to the next instruction before the handler runs
+        so that an instruction is free to point it elsewhere.
+        Each time execution reaches the end of the decoded program, the next window of the bytecode is decoded,
+        so a malformed instruction is only reported once execution reaches it.
         """
+        program = self._program
+
+        # If the instruction pointer points beyond the program boundaries and no bytecode is left to decode, we terminate execution
         while True:
-            instruction = self.bytecode.code[self.ip]
+            length = len(program)
+            while self.ip < length:
+                handler, operands = program[self.ip]
+                self.ip = self.ip + 1
+                handler(*operands)
 
-            if instruction == OpCode.PRINT:
-                self._run_print()
+            if self._decode_window() == False:
+                break
 
-            elif instruction == OpCode.APPLY:
-                self._run_apply()
+    def _allocate(self, count: int):
+        """Returns the register file holding <count> registers."""
+        return RegisterFile(count)
 
-            else:
-                raise RuntimeError("Unknown instruction found at offset <" + str(self.ip) + "> on line <" + str(self.bytecode.lines[self.ip]) + ">.")
+    def _compile(self, operator):
+        """Returns the input size, output size, lookup table and matrix of the given operator.
 
-            # If the instruction pointer points beyond the bytecode boundaries, we terminate execution
-            if self.ip == self.bytecode.length():
-                break
+        Deterministic operators are compiled into a lookup table, the others have a table of None and run through their matrix.
+        """
+        return (operator.size, output_size(operator.matrix), compile_table(operator.size, operator.matrix), operator.matrix)
+
+    def _handlers(self):
+        """Returns a dictionary that maps each supported opcode to the method that decodes it.
+
+        Supporting a new instruction only requires adding its decoder here.
+        MOV is mapped to a decoder that reports it as unsupported rather than as an unknown instruction.
+        """
+        return {
+            OpCode.PRINT: self._decode_print,
+            OpCode.MOV: self._decode_move,
+            OpCode.APPLY: self._decode_apply,
+            OpCode.VAPPLY: self._decode_vector_apply,
+        }
+
+    def _decode(self):
+        """Decode whatever is left of the bytecode and return the decoded program.
+
+        Each decoded instruction is a pair made of the bound method that executes it and the tuple of operands
+        to pass to that method, with operand kinds, register indices and operators already resolved.
+        """
+        while self._decode_window() == True:
+            pass
+
+        return self._program
+
+    def _decode_window(self):
+        """Decode the next window of the bytecode and append its instructions to the decoded program.
+
+        The instruction straddling the end of the window is decoded whole, the next window starting right after it.
+        Returns False if the whole bytecode was already decoded.
+        """
+        code = self.bytecode.code
+        decoders = self._decoders
+        offset = self._offset
+        end = min(offset + self._window, self.bytecode.length())
+        if offset >= end:
+            return False
+
+        append = self._program.append
+        while offset < end:
+            instruction, offset = decoders[code[offset]](offset)
+            append(instruction)
+
+        self._offset = offset
+        return True
+
+    def _fetch(self, offset: int, count: int, start: int = 1):
+        """Returns the <count> bytes found <start> bytes after the instruction byte at the given offset.
+
+        The bytes are unpacked straight from the bytecode, without copying them out of it first.
+
+        Raises:
+            ValueError: If the bytecode ends before all the bytes could be read.
+        """
+        try:
+            layout = self._layouts[count]
+        except KeyError:
+            layout = self._layouts[count] = struct.Struct(str(count) + "B")
+
+        try:
+            return layout.unpack_from(self.bytecode.code, offset + start)
+        except struct.error:
+            raise self._truncated(offset, start - 1 + count)
+
+    def _truncated(self, offset: int, count: int):
+        """Returns the error reporting that the instruction at the given offset doesn't have the <count> bytes it expects after the instruction byte."""
+        return ValueError("Truncated instruction at offset <" + str(offset) + ">. Expected <" + str(count) + "> bytes after the instruction byte.")
+
+    def _decode_unknown(self, offset: int):
+        """Report an instruction the VM doesn't know how to execute."""
+        raise RuntimeError("Unknown instruction <" + str(self.bytecode.code[offset]) + "> found at offset <" + str(offset) + ">.")
+
+    def _decode_move(self, offset: int):
+        """Report the MOV instruction, which the VM intentionally doesn't support.
+
+        Raises:
+            UnsupportedInstructionError: Always.
+        """
+        raise UnsupportedInstructionError("The MOV instruction found at offset <" + str(offset) + "> is not supported by the VM.")
 
-    def _run_print(self):
-        """Execute the print instruction to output the given value to standard output.
+    def _decode_print(self, offset: int):
+        """Decode the print instruction to output the given value to standard output.
 
         The print instruction expects the type of input as first byte after the instruction byte
         and the input value byte after the input type byte.
@@ -89,64 +221,175 @@ class VMachine(object):
         Format:
             instruction_byte[ip + 0] input_type[ip + 1] input_value[ip + 2]
         """
-        instruction = self.bytecode.code[self.ip]
-        input_type = self.bytecode.code[self.ip + 1]
-        input_value = self.bytecode.code[self.ip + 2]
+        operands = self._fetch(offset, 2)
+        instruction = self._decoded.get(operands)
+        if instruction is not None:
+            return instruction, offset + 3
 
         # If the value to print is inside a register, we fetch the value at the given register index
+        input_type, input_value = operands
         if input_type == OpType.REGISTER:
-            print("Printing value from register.")
+            if input_value >= self.directives.regcount:
+                raise ValueError("Register to print outside of VM register count. Byte at offset <" + str(offset + 2) + ">.")
+            instruction = (self._run_print_register, (input_value,))
 
         # If the value to print is binary literal, we print it directly
         elif input_type == OpType.BINARY:
-            print("Printing binary literal.")
+            instruction = (self._run_print_binary, (input_value,))
 
         # Anything else is an error
         else:
-            raise ValueError("Unexpected input type to be printed at offset <" + str(self.ip + 1) + ">.")
+            raise ValueError("Unexpected input type to be printed at offset <" + str(offset + 1) + ">.")
 
-        # Update the instruction pointer to the next instruction
-        self.ip = self.ip + 3
+        self._decoded[operands] = instruction
+        return instruction, offset + 3
 
-    def _run_apply(self):
-        """Execute the apply instruction which role is to perform a matrix multiplication (representing the operator) with the input.
+    def _decode_apply(self, offset: int):
+        """Decode the apply instruction which role is to perform a matrix multiplication (representing the operator) with the input.
 
-        The apply instruction needs to be aware of the input size and it fetches the same from the operator.
+        The apply instruction needs to be aware of the input and output sizes and it fetches the same from the operator.
         The complete format is found below with a simplified format of: instruction_byte > operator_byte > input_bytes > output_bytes.
         The operator_byte holds the operator ID that is used to fetch the operator to execute from the self._operators dictionary.
+        Operators with a lookup table are executed with a single read from the table, the others through their matrix.
 
         Format:
-            instruction_byte[ip + 0] operator_byte[ip + 1] input_bytes[2..n] output_bytes[n+1..n+2]
+            instruction_byte[ip + 0] operator_byte[ip + 1] input_bytes[2..n] output_bytes[n+1..m]
             input_bytes = input_type input_value
+            output_bytes = output_type output_value
         """
-        self.ip = self.ip + 1
-        operator_id = self.bytecode.code[self.ip]
-
-        # Fetch the operator details so we know two things: which operator to execute and how many bytes to read for the input
-        input_size, operator = self._operators[operator_id]
-        
-        # Read the input
-        inputs = []
-        input_index = 0
-        input_data = None
-        self.ip = self.ip + 2
-        while input_index < input_size:
-            input_data = (self.bytecode.code[self.ip + input_index], self.bytecode.code[self.ip + input_index + 1])
-
-        # Read the output
-        self.ip = self.ip + input_index + 1
-        output_data = (self.bytecode.code[self.ip], self.bytecode.code[self.ip + 1])
-
-        # Validate the output
-        # The output type must always be a register
-        if output_data[0] != OpType.REGISTER:
-            raise ValueError("Unexpected output operand at offset <" + str(self.bytecode.code[self.ip]) + ">. Expected a register.")
-        # The output register must be within the VM register count
-        if output_data[1] >= len(self._registers):
-            raise ValueError("Output register outside of VM register count. Byte at offset <" + str(self.bytecode.code[self.ip + 1]) + ">.")
-
-        # Execute the instruction
-        print("Executing the APPLY instruction.")
-
-        # Update the instruction pointer to the next instruction
-        self.ip = self.ip + 2
+        # Programs are mostly made of apply instructions so the operator and operands are read here rather than through _fetch
+        code = self.bytecode.code
+        try:
+            operator_id = code[offset + 1]
+            input_size, output_size, table, matrix = self._operators[operator_id]
+        except IndexError:
+            raise self._truncated(offset, 1)
+        except KeyError:
+            raise self._unknown_operator(operator_id, offset)
+
+        # Read the operands, each takes two bytes: its type and its value
+        count = input_size + output_size
+        try:
+            operands = self._layouts[2 * count].unpack_from(code, offset + 2)
+        except (KeyError, struct.error):
+            operands = self._fetch(offset, 2 * count, 2)
+
+        # Programs apply the same operators to the same registers over and over, so an instruction
+        # already decoded is shared rather than checked and built again
+        key = (operator_id, operands)
+        instruction = self._decoded.get(key)
+        if instruction is None:
+            registers = self._registers_of(offset, 2, operands)
+            inputs = registers[:input_size]
+            outputs = registers[input_size:]
+            if table is not None:
+                instruction = (self._run_apply, (table, inputs, outputs))
+            else:
+                instruction = (self._run_apply_matrix, (matrix, inputs, outputs))
+            self._decoded[key] = instruction
+
+        return instruction, offset + 2 + 2 * count
+
+    def _decode_vector_apply(self, offset: int):
+        """Decode the vector apply instruction which applies one operator to many tuples of registers at once.
+
+        The tuples are independent: every input register is read before any output register is written.
+        The count byte holds the number of tuples, each tuple having the operands of an apply instruction of the same operator.
+
+        Format:
+            instruction_byte[ip + 0] operator_byte[ip + 1] count_byte[ip + 2] tuple_bytes[3..n]
+            tuple_bytes = input_bytes output_bytes
+        """
+        operator_id, count = self._fetch(offset, 2)
+        input_size, output_size, table, matrix = self._operator(operator_id, offset)
+
+        size = input_size + output_size
+        registers = self._registers_of(offset, 3, self._fetch(offset, 2 * size * count, 3))
+
+        inputs = tuple(tuple(registers[start : start + input_size]) for start in range(0, len(registers), size))
+        outputs = tuple(tuple(registers[start + input_size : start + size]) for start in range(0, len(registers), size))
+        if table is not None:
+            instruction = (self._run_vector_apply, (table, inputs, outputs))
+        else:
+            instruction = (self._run_vector_apply_matrix, (matrix, inputs, outputs))
+
+        return instruction, offset + 3 + 2 * len(registers)
+
+    def _operator(self, operator_id: int, offset: int):
+        """Returns the input size, output size, lookup table and matrix of the operator with the given index.
+
+        We need them to know two things: which operator to execute and how many bytes to read for its operands.
+
+        Raises:
+            ValueError: If there is no such operator.
+        """
+        try:
+            return self._operators[operator_id]
+        except KeyError:
+            raise self._unknown_operator(operator_id, offset)
+
+    def _unknown_operator(self, operator_id: int, offset: int):
+        """Returns the error reporting the unknown operator of the instruction at the given offset."""
+        return ValueError("Unknown operator <" + str(operator_id) + "> at offset <" + str(offset + 1) + ">.")
+
+    def _registers_of(self, offset: int, start: int, operands: tuple):
+        """Returns the indices of the register operands whose bytes, found <start> bytes after the instruction byte at the given offset, are given.
+
+        Raises:
+            ValueError: If an operand is not a register within the VM register count.
+        """
+        registers = operands[1::2]
+        count = len(registers)
+
+        # Every operand is checked at once, the offending operand is only looked for when there is one
+        if count > 0 and (operands[0::2].count(REGISTER) != count or max(registers) >= self.directives.regcount):
+            for index in range(count):
+                operand_offset = offset + start + 2 * index
+                if operands[2 * index] != REGISTER:
+                    raise ValueError("Unexpected operand at offset <" + str(operand_offset) + ">. Expected a register.")
+                if registers[index] >= self.directives.regcount:
+                    raise ValueError("Register outside of VM register count. Byte at offset <" + str(operand_offset + 1) + ">.")
+
+        return registers
+
+    def _run_print_register(self, index: int):
+        """Execute the print instruction on the value held by the register at the given index."""
+        print(str(self._registers.read(index)) + "b")
+
+    def _run_print_binary(self, value: int):
+        """Execute the print instruction on a binary literal."""
+        print(str(value) + "b")
+
+    def _run_apply(self, table: tuple, inputs: tuple, outputs: tuple):
+        """Execute the apply instruction of a deterministic operator by reading the output for the input registers from its lookup table."""
+        registers = self._registers
+        registers.write_many(outputs, table[registers.read_many(inputs)])
+
+    def _run_apply_matrix(self, matrix: list, inputs: tuple, outputs: tuple):
+        """Execute the apply instruction by multiplying the matrix of the operator with the input registers.
+
+        The input registers hold a basis state so the product is the column of the matrix at that state.
+        Its entries are the weights of each possible output and the output written to the registers is drawn from them.
+        """
+        registers = self._registers
+        column = registers.read_many(inputs)
+        weights = [row[column] for row in matrix]
+        registers.write_many(outputs, random.choices(range(len(matrix)), weights)[0])
+
+    def _run_vector_apply(self, table: tuple, inputs: tuple, outputs: tuple):
+        """Execute the vector apply instruction of a deterministic operator.
+
+        The inputs of every tuple are gathered and looked up in the table before any output is scattered.
+        """
+        registers = self._registers
+        values = [table[registers.read_many(indices)] for indices in inputs]
+        for indices, value in zip(outputs, values):
+            registers.write_many(indices, value)
+
+    def _run_vector_apply_matrix(self, matrix: list, inputs: tuple, outputs: tuple):
+        """Execute the vector apply instruction by drawing the output of every tuple from the column of the matrix at its input."""
+        registers = self._registers
+        rows = range(len(matrix))
+        values = [random.choices(rows, [row[registers.read_many(indices)] for row in matrix])[0] for indices in inputs]
+        for indices, value in zip(outputs, values):
+            registers.write_many(indices, value)
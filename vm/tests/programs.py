@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+"""This module builds the programs the tests run, as the assembler would package them."""
+import io
+import contextlib
+
+from common.operations import OpCode
+from common.operands import OpType
+from common.directives import Directives, Operator
+from common.bytecode import Bytecode
+from vm.vmachine import VMachine
+
+# The operators of the VM: NOT, AND and FAN, which outputs its input followed by its negation
+NOT = 0
+AND = 1
+FAN = 2
+
+
+def make_directives(regcount: int = 4):
+    """Configure the VM with the given number of registers and the NOT and AND gates."""
+    directives = Directives()
+    directives.set_main("main")
+    directives.set_regcount(regcount)
+    directives.add_operator(Operator(NOT, "not", 1, [[0, 1], [1, 0]]))
+    directives.add_operator(Operator(AND, "and", 2, [[1, 1, 1, 0], [0, 0, 0, 1]]))
+    directives.add_operator(Operator(FAN, "fan", 1, [[0, 0], [1, 0], [0, 1], [0, 0]]))
+    return directives
+
+
+def make_bytecode(code: list):
+    """Returns the bytecode made of the given bytes."""
+    bytecode = Bytecode()
+    bytecode.code = bytearray(code)
+    return bytecode
+
+
+def apply(operator: int, inputs: list, outputs: list):
+    """Returns the bytes of the application of the given operator to the given registers."""
+    code = [OpCode.APPLY, operator]
+    for register in inputs + outputs:
+        code.extend([OpType.REGISTER, register])
+
+    return code
+
+
+def vector_apply(operator: int, inputs: list, outputs: list):
+    """Returns the bytes of the application of the given operator to each tuple of input registers and output registers."""
+    code = [OpCode.VAPPLY, operator, len(inputs)]
+    for tuple_inputs, tuple_outputs in zip(inputs, outputs):
+        for register in tuple_inputs + tuple_outputs:
+            code.extend([OpType.REGISTER, register])
+
+    return code
+
+
+def prints(count: int):
+    """Returns the bytes printing each of the first <count> registers."""
+    code = []
+    for register in range(count):
+        code.extend([OpCode.PRINT, OpType.REGISTER, register])
+
+    return code
+
+
+def initialized(bits: list):
+    """Returns the bytes setting the first registers, which start at 0, to the given bits by negating the ones set to 1."""
+    code = []
+    for register, bit in enumerate(bits):
+        if bit == 1:
+            code.extend(apply(NOT, [register], [register]))
+
+    return code
+
+
+def lanes(count: int):
+    """Returns one row per lane holding the bits of the lane number, the first register as most significant bit."""
+    return [[(lane >> (count - 1 - register)) & 1 for register in range(count)] for lane in range(1 << count)]
+
+
+def output(vmachine):
+    """Run the given VM and return what it printed."""
+    stream = io.StringIO()
+    with contextlib.redirect_stdout(stream):
+        vmachine.run()
+
+    return stream.getvalue()
+
+
+# The number of registers of the programs run over every initial assignment of their registers
+REGISTERS = 4
+
+# Programs writing the same register more than once in a single instruction, and one that doesn't
+REPEATED_OUTPUTS = [
+    apply(FAN, [0], [0, 0]),
+    apply(FAN, [0], [1, 1]),
+    apply(AND, [0, 1], [2]) + apply(FAN, [2], [3, 2]),
+    vector_apply(FAN, [[0], [1]], [[2, 2], [3, 3]]),
+    vector_apply(FAN, [[0], [1]], [[2, 3], [3, 2]]),
+    vector_apply(FAN, [[0], [1], [2]], [[1, 3], [0, 1], [3, 3]]),
+    vector_apply(NOT, [[0], [1], [2]], [[3], [3], [1]]),
+    vector_apply(AND, [[0, 1], [2, 3]], [[0], [1]]),
+]
+
+
+def final_states(code: list):
+    """Returns the final value of each register as the VM computes it from every initial assignment, one row per assignment."""
+    rows = []
+    for bits in lanes(REGISTERS):
+        printed = output(VMachine(make_directives(REGISTERS), make_bytecode(initialized(bits) + code + prints(REGISTERS))))
+        rows.append([int(value[0]) for value in printed.split()])
+
+    return rows
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import pytest
+
+from vm.batch import BatchVMachine
+from tests.programs import FAN, REGISTERS, REPEATED_OUTPUTS, make_directives, make_bytecode, apply, lanes, final_states
+
+@pytest.mark.parametrize("code", REPEATED_OUTPUTS)
+def test_batch_agrees_with_the_vm(code):
+    vmachine = BatchVMachine(make_directives(REGISTERS), make_bytecode(code), 1 << REGISTERS)
+    vmachine.load(lanes(REGISTERS))
+    vmachine.run()
+    assert vmachine.state().tolist() == final_states(code)
+
+
+def test_first_repeated_output_wins():
+    vmachine = BatchVMachine(make_directives(REGISTERS), make_bytecode(apply(FAN, [0], [1, 1])), 2)
+    vmachine.load([[0], [1]])
+    vmachine.run()
+    assert vmachine.state()[:, 1].tolist() == [0, 1]
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import pytest
+
+from vm.jit import JitVMachine
+from vm.bitslice import BitSliceVMachine, exhaustive_inputs, packed_inputs
+from tests.programs import FAN, REGISTERS, REPEATED_OUTPUTS, make_directives, make_bytecode, apply, prints, initialized, lanes, output, final_states
+
+
+def unpacked(values: list, count: int):
+    """Returns the bit-sliced register values as one row per lane."""
+    return [[(value >> lane) & 1 for value in values] for lane in range(count)]
+
+
+@pytest.mark.parametrize("code", REPEATED_OUTPUTS)
+def test_bitslice_agrees_with_the_vm(code):
+    vmachine = BitSliceVMachine(make_directives(REGISTERS), make_bytecode(code), 1 << REGISTERS)
+    vmachine.load(packed_inputs(lanes(REGISTERS), 1 << REGISTERS))
+    vmachine.run()
+    assert unpacked(vmachine.state(), 1 << REGISTERS) == final_states(code)
+
+
+@pytest.mark.parametrize("code", REPEATED_OUTPUTS)
+def test_compiled_program_agrees_with_the_vm(code):
+    rows = []
+    for bits in lanes(REGISTERS):
+        printed = output(JitVMachine(make_directives(REGISTERS), make_bytecode(initialized(bits) + code + prints(REGISTERS))))
+        rows.append([int(value[0]) for value in printed.split()])
+
+    assert rows == final_states(code)
+
+
+def test_first_repeated_output_wins():
+    vmachine = BitSliceVMachine(make_directives(REGISTERS), make_bytecode(apply(FAN, [0], [1, 1])), 2)
+    vmachine.load([0b10])
+    vmachine.run()
+    assert vmachine.state()[1] == 0b10
+
+
+def test_exhaustive_inputs_enumerate_every_assignment():
+    assert unpacked(exhaustive_inputs(REGISTERS), 1 << REGISTERS) == lanes(REGISTERS)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import pytest
+
+from common.operations import OpCode
+from common.bytecode import Bytecode
+
+
+def test_append():
+    bytecode = Bytecode()
+    bytecode.append(OpCode.PRINT)
+    bytecode.append(255)
+    assert bytes(bytecode.code) == b"\x00\xff"
+
+    with pytest.raises(ValueError, match = "not within bounds"):
+        bytecode.append(256)
+
+
+def test_load_part_of_a_file(tmp_path):
+    path = tmp_path / "program.kar"
+    path.write_bytes(b"\x01\x02\x03\x04")
+
+    bytecode = Bytecode()
+    bytecode.load(str(path), 1, 2)
+    assert bytecode.length() == 2
+    assert bytes(bytecode.code) == b"\x02\x03"
+
+    with pytest.raises(ValueError, match = "doesn't fit"):
+        Bytecode().load(str(path), 3, 2)
+
+
+def test_loaded_bytecode_cannot_be_appended_to(tmp_path):
+    path = tmp_path / "program.kar"
+    path.write_bytes(b"\x00\x01\x01")
+
+    bytecode = Bytecode()
+    bytecode.load(str(path))
+    with pytest.raises(ValueError, match = "Cannot append to the bytecode loaded from a file"):
+        bytecode.append(0)
+
+    assert bytes(bytecode.code) == b"\x00\x01\x01"
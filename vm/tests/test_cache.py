@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import os
+import marshal
+import importlib.util
+
+import pytest
+
+from vm.cache import CodeCache
+
+KEY = "0" * 64
+
+
+def entry(directory):
+    """Returns the path of the entry stored under the test key in the given directory."""
+    return os.path.join(str(directory), KEY + ".kjc")
+
+
+def test_stored_program_is_loaded(tmp_path):
+    cache = CodeCache(str(tmp_path), 1024 * 1024)
+    code = compile("def program(read, write, call):\n    return None\n", "<program>", "exec")
+    cache.store(KEY, code, True)
+
+    loaded, calls = cache.load(KEY)
+    assert loaded == code
+    assert calls == True
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    importlib.util.MAGIC_NUMBER[:2],
+    importlib.util.MAGIC_NUMBER,
+    b"\x00\x00\x00\x00\x01" + marshal.dumps(compile("x = 1", "<program>", "exec")),
+    importlib.util.MAGIC_NUMBER + b"\x00" + b"\xff\xff",
+    importlib.util.MAGIC_NUMBER + b"\x00" + marshal.dumps(42),
+])
+def test_bad_entry_is_a_miss_and_removed(tmp_path, data):
+    with open(entry(tmp_path), "wb") as entry_file:
+        entry_file.write(data)
+
+    assert CodeCache(str(tmp_path), 1024 * 1024).load(KEY) is None
+    assert os.path.exists(entry(tmp_path)) == False
+
+
+def test_missing_entry_is_a_miss(tmp_path):
+    assert CodeCache(str(tmp_path), 1024 * 1024).load(KEY) is None
+
+
+def test_least_recently_used_entries_evicted(tmp_path):
+    cache = CodeCache(str(tmp_path), 1)
+    cache.store(KEY, compile("x = 1", "<program>", "exec"), False)
+    assert cache.load(KEY) is None
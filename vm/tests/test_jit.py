@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import os
+
+from common.operations import OpCode
+from common.operands import OpType
+from vm.vmachine import VMachine
+from vm.jit import JitVMachine, VERSION
+from vm.cache import CodeCache
+from tests.programs import NOT, AND, make_directives, make_bytecode, apply, output
+
+
+def make_program(count: int):
+    """Returns the bytes of a program of <count> instructions cycling through NOT, AND and PRINT."""
+    pattern = apply(NOT, [0], [1]) + apply(AND, [1, 2], [3]) + [OpCode.PRINT, OpType.REGISTER, 3]
+    return pattern * (count // 3)
+
+
+def test_compiled_program_prints_what_the_vm_prints():
+    directives = make_directives()
+    bytecode = make_bytecode(make_program(300))
+
+    vmachine = JitVMachine(directives, bytecode)
+    assert vmachine.compiled == True
+    assert output(vmachine) == output(VMachine(directives, bytecode))
+
+
+def test_long_program_interpreted_without_cache():
+    directives = make_directives()
+    bytecode = make_bytecode(make_program(3 * JitVMachine.limit))
+
+    vmachine = JitVMachine(directives, bytecode)
+    assert vmachine.compiled == False
+    assert output(vmachine) == output(VMachine(directives, bytecode))
+
+    assert JitVMachine(directives, bytecode, limit = None).compiled == True
+
+
+def test_long_program_compiled_and_cached(tmp_path):
+    directives = make_directives()
+    bytecode = make_bytecode(make_program(3 * JitVMachine.limit))
+    cache = CodeCache(str(tmp_path), 64 * 1024 * 1024)
+
+    vmachine = JitVMachine(directives, bytecode, cache)
+    assert vmachine.compiled == True
+    assert len(os.listdir(str(tmp_path))) == 1
+    assert cache.load(cache.key(directives, bytecode, VERSION)) is not None
+
+    # The second run finds the compiled program in the cache
+    cached = JitVMachine(directives, bytecode, cache)
+    assert cached.compiled == True
+    assert output(cached) == output(VMachine(directives, bytecode))
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author          : Ntwali Bashige
+Copyright       : Copyright 2019 - Ntwali Bashige
+License         : MIT
+Version         : 0.0.1
+Maintainer      : Ntwali Bashige
+Email           : ntwali.bashige@gmail.com
+"""
+
+import pytest
+
+from common.operations import OpCode
+from common.operands import OpType
+from common.exceptions import RuntimeError, UnsupportedInstructionError
+from vm.vmachine import VMachine
+from tests.programs import NOT, AND, make_directives, make_bytecode, apply, output
+
+
+def test_apply_and_print():
+    code = apply(NOT, [0], [1]) + apply(AND, [1, 1], [2]) + [OpCode.PRINT, OpType.REGISTER, 2, OpCode.PRINT, OpType.BINARY, 0]
+    assert output(VMachine(make_directives(), make_bytecode(code))) == "1b\n0b\n"
+
+
+def test_move_is_unsupported():
+    code = [OpCode.PRINT, OpType.BINARY, 1, OpCode.MOV, OpType.REGISTER, 0, OpType.REGISTER, 1]
+    with pytest.raises(UnsupportedInstructionError, match = "MOV instruction found at offset <3>"):
+        VMachine(make_directives(), make_bytecode(code)).run()
+
+
+def test_unknown_instruction():
+    with pytest.raises(RuntimeError, match = "Unknown instruction <9> found at offset <0>"):
+        VMachine(make_directives(), make_bytecode([9])).run()
+
+
+def test_truncated_instruction():
+    with pytest.raises(ValueError, match = "Truncated instruction at offset <0>"):
+        VMachine(make_directives(), make_bytecode(apply(AND, [0, 1], [2])[:-2])).run()